@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Load report fonts/icons once per worker instead of on the first report.
+from core.reports import warm_asset_cache  # noqa: E402
+
+warm_asset_cache()
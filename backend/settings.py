@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 import environ
 
@@ -93,6 +94,24 @@ else:
     }
 
 
+# Cache
+# The default in-process cache is per worker; with several workers point
+# CACHE_URL at a shared backend (e.g. redis:// or memcache://) so cached
+# profile lists are invalidated everywhere when a baby changes.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Seconds a user's baby list stays cached between changes. Without a shared
+# CACHE_URL other workers only see a change once this expires, so keep it
+# short; views that write or render for the active baby re-check it anyway.
+PROFILE_CACHE_TIMEOUT = env.int("PROFILE_CACHE_TIMEOUT", default=30)
+
+# Most entries one POST to the bulk entry API may create
+API_BULK_MAX_ENTRIES = env.int("API_BULK_MAX_ENTRIES", default=100)
+
+# Days deletions are remembered for the sync feed; older sync tokens get a full resync
+SYNC_TOMBSTONE_DAYS = env.int("SYNC_TOMBSTONE_DAYS", default=90)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -146,6 +165,28 @@ LOGOUT_REDIRECT_URL = "home"
 
 USDA_API_KEY = env("USDA_API_KEY", default=None)
 
+# FoodData Central base URL (point at a FakeFoodDataServer for offline work)
+# and how long search results are reused
+USDA_API_URL = env("USDA_API_URL", default="https://api.nal.usda.gov/fdc/v1")
+USDA_CACHE_TTL = env.int("USDA_CACHE_TTL", default=60 * 60)
+USDA_CACHE_SIZE = env.int("USDA_CACHE_SIZE", default=256)
+
+# Upper bound (bytes) for the in-process cache of rendered report images
+REPORT_CACHE_MAX_BYTES = env.int("REPORT_CACHE_MAX_BYTES", default=32 * 1024 * 1024)
+
+# Processes used to render multi-day report exports (1 = render in the request).
+# Workers are spawned (not forked) on first use and then kept for the process.
+REPORT_RENDER_WORKERS = env.int("REPORT_RENDER_WORKERS", default=min(4, os.cpu_count() or 1))
+
+# Threads that run queued (?async=1) report renders in the web process;
+# 0 leaves them for `manage.py process_report_jobs`
+REPORT_JOB_THREADS = env.int("REPORT_JOB_THREADS", default=2)
+
+# Seconds a report job may wait or run before it is failed as stale (its
+# worker died or the process restarted), and hours finished jobs are kept
+REPORT_JOB_TIMEOUT = env.int("REPORT_JOB_TIMEOUT", default=300)
+REPORT_JOB_KEEP_HOURS = env.float("REPORT_JOB_KEEP_HOURS", default=24.0)
+
 # Active profile selection
 TEMPLATES[0]["OPTIONS"]["context_processors"] += [
     "core.context_processors.active_profile",
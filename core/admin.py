@@ -1,5 +1,19 @@
 from django.contrib import admin
-from .models import Baby, Allergy, FoodItem, FoodEntry, FoodCategory, CatalogFood, UserFood
+from django.db.models import Q
+from .models import Baby, Allergy, FoodItem, FoodEntry, FoodCategory, CatalogFood, UserFood, ReportJob, DailyNutritionSummary, Tombstone
+from .search import get_search_backend, search_terms
+
+
+class IndexedNameSearchMixin:
+    """Search name through core.search instead of icontains on search_fields."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_terms(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        match = get_search_backend().matching(queryset.model, search_term)
+        if search_term.strip().isdigit() and any(f == "fdc_id" for f in self.search_fields):
+            match |= Q(fdc_id=int(search_term))
+        return queryset.filter(match), False
 
 
 @admin.register(Baby)
@@ -10,8 +24,9 @@ class BabyAdmin(admin.ModelAdmin):
 
 
 @admin.register(FoodItem)
-class FoodItemAdmin(admin.ModelAdmin):
+class FoodItemAdmin(IndexedNameSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'category')
+    search_fields = ('name',)
 
 @admin.register(FoodCategory)
 class FoodCategoryAdmin(admin.ModelAdmin):
@@ -20,7 +35,7 @@ class FoodCategoryAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 @admin.register(CatalogFood)
-class CatalogFoodAdmin(admin.ModelAdmin):
+class CatalogFoodAdmin(IndexedNameSearchMixin, admin.ModelAdmin):
     list_display = ("name", "category", "calories_100g", "protein_100g", "carbs_100g", "fats_100g", "data_type", "is_active")
     list_filter = ("category", "is_active", "data_type")
     search_fields = ("name", "fdc_id")
@@ -36,3 +51,21 @@ class FoodEntryAdmin(admin.ModelAdmin):
     list_display = ('baby', 'food', 'portion_size', 'portion_unit', 'reaction', 'date', 'time')
     list_filter = ('baby', 'food', 'portion_unit', 'date')
     search_fields = ('baby__name', 'food__name', 'notes')
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('baby', 'report_date', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    exclude = ('result',)
+
+@admin.register(DailyNutritionSummary)
+class DailyNutritionSummaryAdmin(admin.ModelAdmin):
+    list_display = ('baby', 'date', 'calories', 'protein', 'carbs', 'fats', 'entry_count', 'skipped_entries')
+    list_filter = ('date',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'owner', 'baby_id', 'deleted_at')
+    list_filter = ('kind',)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+ALLERGEN_MAP_PATH = Path(__file__).resolve().parent / "static" / "core" / "data" / "allergens_map.json"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PARENTHETICAL_RE = re.compile(r"\([^)]*\)")
+
+
+def _stem(token: str) -> str:
+    # Light plural folding so "eggs" matches "egg" and "cookies" "cookie".
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """Lower-cased, plural-folded word tokens of text."""
+    return tuple(_stem(t) for t in _TOKEN_RE.findall((text or "").casefold()))
+
+
+def allergen_key(name: str) -> str:
+    """Comparable form of an allergen label ("Eggs" and "Egg" are the same)."""
+    key = " ".join(tokenize(name))
+    return ALLERGEN_ALIASES.get(key, key)
+
+
+# Allergen labels in allergens_map.json that mean the same as an Allergy name.
+ALLERGEN_ALIASES = {
+    "dairy": "milk",
+}
+
+# Extra words that indicate an allergen, on top of allergens_map.json and the
+# Allergy names themselves. Kept conservative: these raise warnings.
+ALLERGEN_SYNONYMS = {
+    "Milk": ["cheese", "yogurt", "yoghurt", "cream", "whey", "casein", "kefir", "ghee"],
+    "Eggs": ["egg", "omelet", "omelette", "mayonnaise", "meringue"],
+    "Peanut": ["peanut", "groundnut"],
+    "Tree Nut": ["almond", "cashew", "walnut", "pecan", "pistachio", "hazelnut",
+                 "macadamia", "pine nut", "brazil nut"],
+    "Soy": ["soy", "soya", "tofu", "edamame", "tempeh", "miso"],
+    "Wheat": ["wheat", "flour", "couscous", "semolina", "bulgur"],
+    "Fish": ["fish", "salmon", "tuna", "cod", "tilapia", "sardine", "anchovy", "trout"],
+    "Shellfish": ["shrimp", "prawn", "crab", "lobster", "crawfish", "scallop"],
+    "Sesame": ["sesame", "tahini"],
+}
+
+
+class AhoCorasick:
+    """
+    Word-level Aho-Corasick automaton. Patterns are token tuples; scan()
+    reports every pattern occurring in a token sequence in a single pass,
+    however many patterns there are.
+    """
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[frozenset] = [frozenset()]
+        self._built = False
+
+    def add(self, tokens: tuple[str, ...], values) -> None:
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+            node = nxt
+        self._out[node] = self._out[node] | frozenset(values)
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and fold outputs along them."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        for node in queue:
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] | self._out[self._fail[child]]
+        self._built = True
+
+    def scan(self, tokens) -> set:
+        if not self._built:
+            self.build()
+        found = set()
+        node = 0
+        for token in tokens:
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            if self._out[node]:
+                found.update(self._out[node])
+        return found
+
+
+class AllergenIndex:
+    """
+    Phrase index over allergens_map.json, ALLERGEN_SYNONYMS and any extra
+    phrases. A phrase matches any text that contains its words in order, so
+    "PEANUT BUTTER" flags "Peanut butter toast". Map keys with a
+    parenthetical ("SALMON (COOKED)") are also indexed without it.
+    """
+
+    def __init__(self, food_allergens: dict[str, list[str]], version: str):
+        self.version = version
+        self.phrases: dict[tuple[str, ...], list[str]] = {}
+        for food, allergens in food_allergens.items():
+            for variant in (food, _PARENTHETICAL_RE.sub(" ", food)):
+                self.add_phrase(variant, allergens)
+        for allergen, words in ALLERGEN_SYNONYMS.items():
+            for word in words:
+                self.add_phrase(word, [allergen])
+
+    def add_phrase(self, text: str, allergens) -> None:
+        tokens = tokenize(text)
+        if tokens:
+            merged = self.phrases.setdefault(tokens, [])
+            merged.extend(a for a in allergens if a not in merged)
+            self.__dict__.pop("_automaton", None)
+
+    @property
+    def automaton(self) -> AhoCorasick:
+        automaton = self.__dict__.get("_automaton")
+        if automaton is None:
+            automaton = AhoCorasick()
+            for tokens, allergens in self.phrases.items():
+                automaton.add(tokens, allergens)
+            automaton.build()
+            self.__dict__["_automaton"] = automaton
+        return automaton
+
+    def match(self, text: str) -> list[str]:
+        """Allergens of every phrase found in text, sorted and de-duplicated."""
+        return sorted(self.automaton.scan(tokenize(text)))
+
+    def match_keys(self, text: str) -> set[str]:
+        """allergen_key of every allergen found in text."""
+        return {allergen_key(a) for a in self.automaton.scan(tokenize(text))}
+
+    def scan_many(self, rows):
+        """
+        Scan (key, text) pairs lazily, yielding (key, allergens) for rows
+        with at least one hit. Suitable for whole-table scans.
+        """
+        automaton = self.automaton
+        for key, text in rows:
+            found = automaton.scan(tokenize(text))
+            if found:
+                yield key, sorted(found)
+
+    def warnings_for(self, text: str, baby_allergies) -> list[str]:
+        """The baby's allergies (as given) that text may contain."""
+        present = self.match_keys(text)
+        return [a for a in baby_allergies if allergen_key(a) in present]
+
+    def as_json(self) -> dict:
+        """Compact form for the tracker's client-side check."""
+        return {
+            "version": self.version,
+            "aliases": ALLERGEN_ALIASES,
+            "phrases": {" ".join(tokens): allergens for tokens, allergens in self.phrases.items()},
+        }
+
+
+@lru_cache(maxsize=1)
+def get_allergen_index() -> AllergenIndex:
+    """
+    Built once per process from static data only; version is a hash of the
+    map file and the synonym tables, so it can key a cache-forever URL.
+    """
+    try:
+        raw = ALLERGEN_MAP_PATH.read_bytes()
+        food_allergens = json.loads(raw.decode("utf-8"))
+    except (OSError, ValueError):
+        raw, food_allergens = b"", {}
+    digest = hashlib.sha256(raw)
+    digest.update(json.dumps([ALLERGEN_SYNONYMS, ALLERGEN_ALIASES], sort_keys=True).encode("utf-8"))
+    return AllergenIndex(food_allergens, digest.hexdigest()[:16])
+
+
+def get_allergen_scanner() -> AllergenIndex:
+    """
+    get_allergen_index plus every Allergy name as its own phrase, for
+    server-side checks and batch scans.
+
+    Allergy rows can change in any worker, so each call reads the names
+    (a handful of rows) and the scanner is cached on them: a change made
+    elsewhere gets a fresh scanner on the next call, with no signal needed.
+    """
+    from .models import Allergy
+
+    names = tuple(Allergy.objects.order_by("name").values_list("name", flat=True))
+    return _build_allergen_scanner(get_allergen_index().version, names)
+
+
+@lru_cache(maxsize=1)
+def _build_allergen_scanner(index_version: str, allergy_names: tuple[str, ...]) -> AllergenIndex:
+    base = get_allergen_index()
+    digest = hashlib.sha256(index_version.encode("utf-8"))
+    digest.update(json.dumps(allergy_names).encode("utf-8"))
+    scanner = AllergenIndex({}, digest.hexdigest()[:16])
+    scanner.phrases = {tokens: list(allergens) for tokens, allergens in base.phrases.items()}
+    for name in allergy_names:
+        scanner.add_phrase(name, [name])
+    return scanner
@@ -0,0 +1,331 @@
+"""
+JSON API for babies, foods and feeding entries.
+
+Session authenticated like the rest of the site (POSTs need the CSRF
+token). Lists are keyset paginated: {"results": [...], "next": url}.
+Errors are {"error": message} or, for invalid entries, {"errors": ...}.
+"""
+import datetime
+import functools
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_http_methods, require_POST
+
+from .allergens import get_allergen_scanner
+from .models import Baby, FoodEntry, FoodItem, get_or_create_food_item, normalize_food_name
+from .nutrition import refresh_daily_summary
+from .pagination import decode_cursor, keyset_page
+from .search import RANKED_ORDERING, get_search_backend
+from .sync import SyncTokenExpired, stamp_on_commit, sync_page
+
+API_PAGE_SIZE = 100
+FOOD_ORDERING = ("name", "id")
+ENTRY_ORDERING = ("-date", "-time", "-id")
+ENTRY_FIELDS = (
+    "id", "baby_id", "food_id", "food__name", "portion_size", "portion_unit",
+    "reaction", "notes", "date", "time", "updated_at",
+)
+FOOD_FIELDS = ("id", "name", "category", "catalog_food_id", "updated_at")
+
+
+def bulk_entry_limit() -> int:
+    return getattr(settings, "API_BULK_MAX_ENTRIES", 100)
+
+
+def _max_length(field: str) -> int:
+    return FoodItem._meta.get_field(field).max_length
+
+
+def _category(data: dict) -> str:
+    return str(data.get("category") or "").strip()
+
+
+def api_error(message: str, status: int = 400) -> JsonResponse:
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_login_required(view):
+    """login_required, but a 401 instead of a redirect to the login page."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_error("Authentication required.", status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b"null")
+    except ValueError:
+        raise ValueError("Request body is not valid JSON.")
+
+
+def _page_url(name, args, params, cursor):
+    if not cursor:
+        return None
+    return f"{reverse(name, args=args)}?{urlencode({**params, 'after': cursor})}"
+
+
+def _owned_baby(request, baby_id) -> Baby | None:
+    return Baby.objects.filter(id=baby_id, owner=request.user).first()
+
+
+def serialize_baby(baby: Baby) -> dict:
+    return {
+        "id": str(baby.id),
+        "name": baby.name,
+        "date_of_birth": timezone.localdate(baby.date_of_birth).isoformat() if baby.date_of_birth else None,
+        "allergies": [a.name for a in baby.allergies.all()],
+        "avatar_url": baby.avatar_list_url,
+        "updated_at": baby.updated_at.isoformat(),
+    }
+
+
+def entry_row(entry: FoodEntry) -> dict:
+    """An entry instance (with food loaded) in the shape of ENTRY_FIELDS."""
+    row = {field: getattr(entry, field) for field in ENTRY_FIELDS if field != "food__name"}
+    row["food__name"] = entry.food.name
+    return row
+
+
+def serialize_entry(row: dict) -> dict:
+    return {
+        "id": row["id"],
+        "baby": str(row["baby_id"]),
+        "food": row["food_id"],
+        "food_name": row["food__name"],
+        "portion_size": row["portion_size"],
+        "portion_unit": row["portion_unit"],
+        "reaction": row["reaction"],
+        "notes": row["notes"],
+        "date": row["date"].isoformat(),
+        "time": row["time"].isoformat(timespec="seconds"),
+        "updated_at": row["updated_at"].isoformat(),
+    }
+
+
+@api_login_required
+@require_http_methods(["GET"])
+def api_babies(request):
+    babies = Baby.objects.filter(owner=request.user).prefetch_related("allergies").order_by("name")
+    return JsonResponse({"results": [serialize_baby(b) for b in babies], "next": None})
+
+
+@api_login_required
+@require_http_methods(["GET", "POST"])
+def api_foods(request):
+    """
+    GET: FoodItems by name, or best match first for ?q=.
+    POST {"name", "category"?}: the food with that name, created if needed.
+    """
+    if request.method == "POST":
+        try:
+            data = _json_body(request)
+        except ValueError as e:
+            return api_error(str(e))
+        name = " ".join(str((data or {}).get("name") or "").split()) if isinstance(data, dict) else ""
+        if not name:
+            return api_error("name is required.")
+        if len(name) > _max_length("name"):
+            return api_error("name is too long.")
+        category = _category(data)
+        if len(category) > _max_length("category"):
+            return api_error("category is too long.")
+        food, created = get_or_create_food_item(name, category=category)
+        return JsonResponse(
+            {"id": food.id, "name": food.name, "category": food.category, "created": created},
+            status=201 if created else 200,
+        )
+
+    q = (request.GET.get("q") or "").strip()
+    if q:
+        # Best match first; search_rank is only there for the cursor.
+        foods = get_search_backend().ranked(FoodItem.objects.all(), q).values(*FOOD_FIELDS, "search_rank")
+        ordering, key_types = RANKED_ORDERING, (float, str, int)
+    else:
+        foods = FoodItem.objects.values(*FOOD_FIELDS)
+        ordering, key_types = FOOD_ORDERING, (str, int)
+    try:
+        after = decode_cursor(request.GET["after"], key_types) if request.GET.get("after") else None
+    except ValueError:
+        return api_error("Invalid cursor.")
+
+    rows, next_cursor = keyset_page(foods, ordering, after=after, limit=API_PAGE_SIZE)
+    for row in rows:
+        row.pop("search_rank", None)
+    return JsonResponse({
+        "results": rows,
+        "next": _page_url("api_foods", [], {"q": q} if q else {}, next_cursor),
+    })
+
+
+@api_login_required
+@require_http_methods(["GET"])
+def api_entries(request, baby_id):
+    """A baby's entries newest first; ?start= / ?end= limit the date range."""
+    baby = _owned_baby(request, baby_id)
+    if baby is None:
+        return api_error("Baby not found.", status=404)
+
+    filters = {}
+    try:
+        entries = FoodEntry.objects.filter(baby=baby)
+        for param, lookup in (("start", "date__gte"), ("end", "date__lte")):
+            if request.GET.get(param):
+                entries = entries.filter(**{lookup: datetime.date.fromisoformat(request.GET[param])})
+                filters[param] = request.GET[param]
+        after = None
+        if request.GET.get("after"):
+            after = decode_cursor(request.GET["after"], (datetime.date, datetime.time, int))
+    except ValueError:
+        return api_error("Invalid date or cursor.")
+
+    rows, next_cursor = keyset_page(
+        entries.values(*ENTRY_FIELDS), ENTRY_ORDERING, after=after, limit=API_PAGE_SIZE,
+    )
+    return JsonResponse({
+        "results": [serialize_entry(r) for r in rows],
+        "next": _page_url("api_entries", [baby.id], filters, next_cursor),
+    })
+
+
+def _is_id(value) -> bool:
+    return type(value) is int
+
+
+def _resolve_foods(items) -> dict:
+    """
+    The FoodItem each payload item refers to, by "food" id or by
+    "food_name": one query for all the ids, one lookup per distinct name.
+    Items with an over-long name or category resolve to nothing.
+    """
+    ids = {item["food"] for item in items if _is_id(item.get("food"))}
+    by_id = FoodItem.objects.in_bulk(ids)
+    by_name = {}
+    for item in items:
+        name = str(item.get("food_name") or "")
+        key = normalize_food_name(name)
+        category = _category(item)
+        if (key and "food" not in item and key not in by_name
+                and len(key) <= _max_length("name") and len(category) <= _max_length("category")):
+            by_name[key], _ = get_or_create_food_item(name, category=category)
+    return {"by_id": by_id, "by_name": by_name}
+
+
+@api_login_required
+@require_POST
+def api_entries_bulk(request, baby_id):
+    """
+    Create several entries at once: {"entries": [{"food": id | "food_name":
+    name, "portion_size", "portion_unit"?, "reaction"?, "notes"?}, ...]}.
+
+    Every item is validated first; if any fails nothing is written and the
+    response maps item index -> field errors. Otherwise all rows go in with
+    one bulk_create inside a transaction and the response lists their ids
+    in request order, plus allergen warnings keyed by item index.
+    """
+    baby = _owned_baby(request, baby_id)
+    if baby is None:
+        return api_error("Baby not found.", status=404)
+
+    try:
+        data = _json_body(request)
+    except ValueError as e:
+        return api_error(str(e))
+    items = data.get("entries") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return api_error("entries must be a non-empty list.")
+    if len(items) > bulk_entry_limit():
+        return api_error(f"At most {bulk_entry_limit()} entries per request.", status=413)
+    if not all(isinstance(item, dict) for item in items):
+        return api_error("Every entry must be an object.")
+
+    with transaction.atomic():
+        foods = _resolve_foods(items)
+        entries, errors = [], {}
+        for index, item in enumerate(items):
+            if "food" in item:
+                food = foods["by_id"].get(item["food"]) if _is_id(item["food"]) else None
+            else:
+                food = foods["by_name"].get(normalize_food_name(str(item.get("food_name") or "")))
+
+            entry = FoodEntry(
+                baby=baby,
+                food=food,
+                portion_size=item.get("portion_size"),
+                portion_unit=item.get("portion_unit") or "g",
+                reaction=item.get("reaction") or "",
+                notes=item.get("notes") or "",
+            )
+            item_errors = {}
+            if "food" not in item and len(_category(item)) > _max_length("category"):
+                item_errors["category"] = [f"At most {_max_length('category')} characters."]
+            elif food is None:
+                item_errors["food"] = ["Unknown food; give a valid food id or a food_name."]
+            try:
+                entry.full_clean(exclude=["baby", "food"])
+            except ValidationError as e:
+                item_errors.update(e.message_dict)
+            if item_errors:
+                errors[str(index)] = item_errors
+            entries.append(entry)
+
+        if errors:
+            transaction.set_rollback(True)
+            return JsonResponse({"errors": errors}, status=400)
+
+        FoodEntry.objects.bulk_create(entries)
+        # bulk_create sends no post_save either, which is what stamps sync changes.
+        stamp_on_commit(FoodEntry, [entry.pk for entry in entries])
+
+        # bulk_create sends no post_save, so refresh the days here instead.
+        for day in {entry.date for entry in entries}:
+            refresh_daily_summary(baby.id, day)
+
+    scanner = get_allergen_scanner()
+    allergies = list(baby.allergies.values_list("name", flat=True))
+    warnings = {}
+    if allergies:
+        for index, entry in enumerate(entries):
+            hits = scanner.warnings_for(entry.food.name, allergies)
+            if hits:
+                warnings[str(index)] = hits
+
+    return JsonResponse({"ids": [entry.id for entry in entries], "warnings": warnings}, status=201)
+
+
+@api_login_required
+@require_http_methods(["GET"])
+def api_sync(request):
+    """
+    One page of what changed for the user since ?token= (everything
+    without one): ids under "deleted" to drop, then babies, entries and
+    foods to upsert, applied in that order. While has_more is true, call
+    again with sync_token to get the rest of this cycle; after the last
+    page keep sync_token for the next sync. A token older than the
+    tombstone retention gets 410; sync again without one.
+    """
+    try:
+        page = sync_page(request.user, request.GET.get("token") or None)
+    except ValueError:
+        return api_error("Invalid sync token.")
+    except SyncTokenExpired:
+        return api_error("Sync token expired; sync again without a token.", status=410)
+
+    return JsonResponse({
+        "full": page["full"],
+        "deleted": page["deleted"],
+        "babies": [serialize_baby(b) for b in page["babies"]],
+        "entries": [serialize_entry(entry_row(e)) for e in page["entries"]],
+        "foods": [{f: getattr(food, f) for f in FOOD_FIELDS} for food in page["foods"]],
+        "has_more": page["has_more"],
+        "sync_token": page["sync_token"],
+    })
@@ -0,0 +1,77 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from core.models import Baby
+from core.reports import REPORT_SIZE, RESAMPLING, report_avatar_diameter
+
+AVATAR_DERIVATIVE_DIR = "profile_images/derived"
+
+# kind -> (square size in px, Pillow format, file extension), largest first.
+# "list" backs the 260px photo on the baby list and "nav" the 60px/30px
+# navbar circles, both at 2x for high-DPI screens. "report" matches the
+# avatar circle of a full-size daily report.
+AVATAR_DERIVATIVES = {
+    "list": (520, "WEBP", "webp"),
+    "report": (report_avatar_diameter(REPORT_SIZE[0] / 30), "PNG", "png"),
+    "nav": (120, "WEBP", "webp"),
+}
+
+
+def build_avatar_derivatives(baby: Baby) -> dict[str, str]:
+    """
+    Decode baby.image once and save a square, centre-cropped copy for each
+    AVATAR_DERIVATIVES kind. Returns kind -> storage name.
+    """
+    largest = max(size for size, _, _ in AVATAR_DERIVATIVES.values())
+
+    with baby.image.open("rb") as fh, Image.open(fh) as src:
+        # JPEGs decode straight to a reduced scale that still covers the
+        # largest derivative, instead of materialising the full photo.
+        src.draft("RGB", (largest, largest))
+        photo = ImageOps.exif_transpose(src)
+
+    mode = "RGBA" if photo.mode in ("RGBA", "LA", "P", "PA") else "RGB"
+    photo = photo.convert(mode)
+
+    w, h = photo.size
+    side = min(w, h)
+    left = (w - side) // 2
+    top = (h - side) // 2
+    photo = photo.crop((left, top, left + side, top + side))
+
+    stem = os.path.splitext(os.path.basename(baby.image.name))[0]
+    derivatives = {}
+    for kind, (size, fmt, ext) in AVATAR_DERIVATIVES.items():
+        photo = photo.resize((size, size), RESAMPLING) if photo.size[0] > size else photo
+
+        buf = BytesIO()
+        photo.save(buf, format=fmt)
+        name = f"{AVATAR_DERIVATIVE_DIR}/{baby.pk}/{stem}_{kind}.{ext}"
+        derivatives[kind] = default_storage.save(name, ContentFile(buf.getvalue()))
+
+    return derivatives
+
+
+def delete_avatar_derivatives(baby: Baby) -> None:
+    for name in (baby.avatar_derivatives or {}).values():
+        default_storage.delete(name)
+
+
+def refresh_avatar_derivatives(baby: Baby) -> None:
+    """Replace baby's stored derivatives to match its current image."""
+    delete_avatar_derivatives(baby)
+
+    derivatives = {}
+    if baby.image:
+        try:
+            derivatives = build_avatar_derivatives(baby)
+        except OSError:
+            # Unreadable upload: consumers fall back to the original file.
+            derivatives = {}
+
+    baby.avatar_derivatives = derivatives
+    baby.save(update_fields=["avatar_derivatives"])
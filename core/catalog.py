@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.utils import timezone
+
+from core.categories import category_registry, classify
+from core.models import CatalogFood, FoodCategory, FoodItem
+from core.sync import stamp_on_commit
+
+
+@transaction.atomic
+def promote_food_items(items, category: FoodCategory | None = None) -> dict[int, CatalogFood]:
+    """
+    Add FoodItems to the catalog and link them through FoodItem.catalog_food.
+
+    Each item goes under `category` if given, else under its own category
+    text when that names a FoodCategory, else wherever classify() puts its
+    name. A CatalogFood with the same name and category is reused.
+    A batch costs a fixed number of queries however many items it has.
+    Returns {food item id: catalog food}.
+    """
+    items = list(items)
+    if not items:
+        return {}
+
+    targets = {}
+    for item in items:
+        if category is not None:
+            target = category
+        else:
+            # FoodItem.category is free text; honour it when it is a real category.
+            target = (
+                category_registry.find(item.category)
+                or category_registry.get(classify("", item.name))
+            )
+        targets[item.id] = target
+
+    existing = {}
+    for food in CatalogFood.objects.filter(name__in={item.name for item in items}):
+        existing.setdefault((food.name, food.category_id), food)
+
+    new_foods = {}
+    for item in items:
+        key = (item.name, targets[item.id].id)
+        if key not in existing and key not in new_foods:
+            # We don't know per-100g nutrients for a custom FoodItem; zeros are editable later.
+            new_foods[key] = CatalogFood(
+                name=item.name,
+                category=targets[item.id],
+                fdc_id=None,
+                data_type="Custom/Manual",
+            )
+    if new_foods:
+        for food in CatalogFood.objects.bulk_create(new_foods.values()):
+            existing[(food.name, food.category_id)] = food
+
+    linked = {}
+    now = timezone.now()
+    for item in items:
+        item.catalog_food = existing[(item.name, targets[item.id].id)]
+        # bulk_update skips auto_now; the sync feed relies on it.
+        item.updated_at = now
+        linked[item.id] = item.catalog_food
+    FoodItem.objects.bulk_update(items, ["catalog_food", "updated_at"])
+    stamp_on_commit(FoodItem, linked)
+    return linked
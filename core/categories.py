@@ -0,0 +1,153 @@
+import re
+import threading
+from typing import Iterable
+
+from core.models import PYRAMID_MAP, FoodCategory
+
+# Checked in order: a keyword from an earlier group wins over any later one,
+# wherever either occurs in the text. Keywords match as plain substrings.
+CATEGORY_KEYWORDS: list[tuple[str, list[str]]] = [
+    ("Vegetables", [
+        "vegetable", "veg", "broccoli", "spinach", "carrot", "kale",
+        "lettuce", "pepper", "cabbage", "tomato",
+    ]),
+    ("Fruits", [
+        "fruit", "apple", "banana", "strawberry", "berries", "grape",
+        "orange", "pear", "peach",
+    ]),
+    ("Grains & Starches", [
+        "bread", "rice", "pasta", "oat", "cereal", "grain", "tortilla",
+        "noodle", "quinoa", "barley", "cracker",
+    ]),
+    ("Proteins", [
+        "chicken", "beef", "pork", "turkey", "fish", "egg", "tofu",
+        "bean", "lentil", "pea", "shrimp", "tuna", "salmon",
+    ]),
+    ("Dairy", [
+        "milk", "yogurt", "cheese", "cottage cheese", "kefir",
+    ]),
+    ("Fats & Oils", [
+        "oil", "butter", "olive", "avocado oil", "ghee", "shortening", "lard",
+    ]),
+    ("Sweets & Processed Foods", [
+        "cookie", "candy", "syrup", "brownie", "cake", "muffin",
+        "donut", "ice cream", "sweet", "soda", "fruit snacks",
+        "added sugar", "frosting", "sweetened", "juice",
+    ]),
+]
+
+DEFAULT_CATEGORY = "Grains & Starches"
+
+# FoodData Central food categories (food_category.csv, foodCategory in the
+# JSON exports) -> (category, *alternatives). The FDC category decides;
+# alternatives are only picked when the description has one of their
+# keywords (eggs among "Dairy and Egg Products"). FDC categories that are
+# not listed (baby foods, fast foods, branded categories, ...) are too mixed
+# to mean anything, so those foods are classified by description alone.
+FDC_CATEGORIES: dict[str, tuple[str, ...]] = {
+    "dairy and egg products": ("Dairy", "Proteins"),
+    "fats and oils": ("Fats & Oils",),
+    "poultry products": ("Proteins",),
+    "sausages and luncheon meats": ("Proteins",),
+    "breakfast cereals": ("Grains & Starches",),
+    "fruits and fruit juices": ("Fruits",),
+    "pork products": ("Proteins",),
+    "vegetables and vegetable products": ("Vegetables",),
+    "nut and seed products": ("Proteins",),
+    "beef products": ("Proteins",),
+    "beverages": ("Sweets & Processed Foods", "Dairy", "Fruits"),
+    "finfish and shellfish products": ("Proteins",),
+    "legumes and legume products": ("Proteins",),
+    "lamb, veal, and game products": ("Proteins",),
+    "baked products": ("Grains & Starches", "Sweets & Processed Foods"),
+    "sweets": ("Sweets & Processed Foods",),
+    "cereal grains and pasta": ("Grains & Starches",),
+}
+
+
+# One compiled alternation per group. re.search scans the text in C and,
+# unlike a single combined pattern, never misses a keyword that overlaps
+# another, so the result is exactly "first group with any keyword in text".
+_GROUP_PATTERNS: list[tuple[str, re.Pattern]] = [
+    (name, re.compile("|".join(map(re.escape, keywords))))
+    for name, keywords in CATEGORY_KEYWORDS
+]
+_PATTERNS_BY_NAME = dict(_GROUP_PATTERNS)
+
+
+def classify(usda_category: str | None, description: str | None) -> str:
+    """Category name for a USDA food, without touching the database."""
+    text = f"{usda_category or ''} {description or ''}".lower()
+    for name, pattern in _GROUP_PATTERNS:
+        if pattern.search(text):
+            return name
+    return DEFAULT_CATEGORY
+
+
+def classify_fdc(fdc_category: str | None, description: str | None) -> str:
+    """
+    Category name for a FoodData Central food: from FDC_CATEGORIES when its
+    FDC category is listed, else from the description alone. The FDC
+    category text is never keyword-matched ("Dairy and Egg Products" would
+    hit "egg").
+    """
+    choices = FDC_CATEGORIES.get(" ".join((fdc_category or "").split()).casefold())
+    if not choices:
+        return classify(None, description)
+    text = (description or "").lower()
+    for name in choices[1:]:
+        if _PATTERNS_BY_NAME[name].search(text):
+            return name
+    return choices[0]
+
+
+class CategoryRegistry:
+    """
+    In-process name -> FoodCategory map, loaded with one query on first use.
+    Missing default categories are created on demand. Cleared whenever a
+    category is saved or deleted (see core.signals).
+    """
+
+    def __init__(self):
+        self._by_name: dict[str, FoodCategory] | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, FoodCategory]:
+        by_name = self._by_name
+        if by_name is None:
+            with self._lock:
+                if self._by_name is None:
+                    self._by_name = {c.name: c for c in FoodCategory.objects.all()}
+                by_name = self._by_name
+        return by_name
+
+    def find(self, name: str) -> FoodCategory | None:
+        """The category called name, or None; never creates one."""
+        return self._load().get(name)
+
+    def get(self, name: str) -> FoodCategory:
+        by_name = self._load()
+        category = by_name.get(name)
+        if category is None:
+            category, _ = FoodCategory.objects.get_or_create(
+                name=name,
+                defaults={"pyramid_level": PYRAMID_MAP.get(name, 5)},
+            )
+            by_name[name] = category
+        return category
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_name = None
+
+
+category_registry = CategoryRegistry()
+
+
+def classify_many(rows: Iterable[tuple[str | None, str | None]], classifier=classify) -> list[FoodCategory]:
+    """
+    Categories for (usda_category, description) pairs, in order, named by
+    classifier (classify, or classify_fdc for FDC imports). Costs at most
+    one query for the whole batch once the registry is loaded.
+    """
+    return [category_registry.get(classifier(usda, desc)) for usda, desc in rows]
@@ -0,0 +1,234 @@
+"""
+Streaming readers for FoodData Central bulk downloads
+(https://fdc.nal.usda.gov/download-datasets) and the CatalogFood upsert used
+by `manage.py import_fdc`.
+
+Both formats are read in bounded memory: the JSON export one food at a
+time, and the CSV export by spilling the four catalog nutrients of each
+food to a temporary SQLite table that food.csv is then joined against.
+"""
+import csv
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Iterator
+
+from core.categories import classify_fdc, classify_many
+from core.models import CatalogFood
+
+# FDC nutrient ids. Energy falls back to the Atwater values that Foundation
+# foods report instead of 1008.
+ENERGY_IDS = (1008, 2047, 2048)
+PROTEIN_ID = 1003
+CARBS_ID = 1005
+FAT_ID = 1004
+_NUTRIENT_SLOTS = {PROTEIN_ID: 1, CARBS_ID: 2, FAT_ID: 3}
+
+NAME_MAX_LENGTH = CatalogFood._meta.get_field("name").max_length
+DATA_TYPE_MAX_LENGTH = CatalogFood._meta.get_field("data_type").max_length
+
+
+def iter_json_array(fp, chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Yield the items of the first JSON array in fp without loading it whole.
+    Works for FDC exports ({"FoundationFoods": [...]}) and bare arrays.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        start = buffer.find("[", pos)
+        if start != -1:
+            pos = start + 1
+            break
+        pos = len(buffer)
+        if not fill():
+            return
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError("unexpected end of file inside the food array")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof or not fill():
+                raise
+            continue
+        pos = end
+        yield item
+
+
+def _energy(values: dict) -> float:
+    for nutrient_id in ENERGY_IDS:
+        if values.get(nutrient_id) is not None:
+            return values[nutrient_id]
+    return 0.0
+
+
+def _row(fdc_id, description, data_type, category, nutrients: dict) -> dict:
+    return {
+        "fdc_id": int(fdc_id),
+        "name": (description or "Unknown").strip()[:NAME_MAX_LENGTH],
+        "data_type": (data_type or "")[:DATA_TYPE_MAX_LENGTH],
+        "category": category or "",
+        "calories_100g": _energy(nutrients),
+        "protein_100g": nutrients.get(PROTEIN_ID) or 0.0,
+        "carbs_100g": nutrients.get(CARBS_ID) or 0.0,
+        "fats_100g": nutrients.get(FAT_ID) or 0.0,
+    }
+
+
+def iter_json_foods(path: Path) -> Iterator[dict]:
+    wanted = set(ENERGY_IDS) | set(_NUTRIENT_SLOTS)
+    with open(path, encoding="utf-8") as fp:
+        for item in iter_json_array(fp):
+            nutrients = {}
+            for n in item.get("foodNutrients") or []:
+                nutrient_id = (n.get("nutrient") or {}).get("id")
+                if nutrient_id in wanted and n.get("amount") is not None:
+                    nutrients[nutrient_id] = float(n["amount"])
+
+            category = (
+                (item.get("foodCategory") or {}).get("description")
+                or item.get("brandedFoodCategory")
+                or (item.get("wweiaFoodCategory") or {}).get("wweiaFoodCategoryDescription")
+            )
+            yield _row(item["fdcId"], item.get("description"), item.get("dataType"),
+                       category, nutrients)
+
+
+_NUTRIENT_UPSERT = """
+    INSERT INTO nutrient (fdc_id, energy, energy_rank, protein, carbs, fat)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (fdc_id) DO UPDATE SET
+        energy = CASE WHEN excluded.energy_rank < energy_rank THEN excluded.energy ELSE energy END,
+        energy_rank = min(energy_rank, excluded.energy_rank),
+        protein = coalesce(excluded.protein, protein),
+        carbs = coalesce(excluded.carbs, carbs),
+        fat = coalesce(excluded.fat, fat)
+"""
+
+
+def _nutrient_rows(fp) -> Iterator[tuple]:
+    """(fdc_id, energy, energy rank, protein, carbs, fat) per catalog nutrient row."""
+    energy_rank = {nutrient_id: rank for rank, nutrient_id in enumerate(ENERGY_IDS)}
+    for row in csv.DictReader(fp):
+        nutrient_id = int(row["nutrient_id"])
+        if nutrient_id not in energy_rank and nutrient_id not in _NUTRIENT_SLOTS:
+            continue
+        if not row["amount"]:
+            continue
+        values = [int(row["fdc_id"]), None, len(ENERGY_IDS), None, None, None]
+        amount = float(row["amount"])
+        if nutrient_id in energy_rank:
+            values[1], values[2] = amount, energy_rank[nutrient_id]
+        else:
+            values[2 + _NUTRIENT_SLOTS[nutrient_id]] = amount
+        yield values
+
+
+def iter_csv_foods(directory: Path) -> Iterator[dict]:
+    """
+    Read food.csv, food_nutrient.csv and (if present) food_category.csv.
+    The Branded export has millions of foods, so the catalog nutrients of
+    food_nutrient.csv go to a temporary on-disk SQLite table keyed by
+    fdc_id (the lowest ranked energy id wins) and food.csv is streamed
+    with one keyed lookup per food.
+    """
+    categories = {}
+    category_path = directory / "food_category.csv"
+    if category_path.exists():
+        with open(category_path, newline="", encoding="utf-8") as fp:
+            categories = {row["id"]: row["description"] for row in csv.DictReader(fp)}
+
+    # An empty filename is a private temporary database, deleted on close.
+    with closing(sqlite3.connect("")) as db:
+        db.execute(
+            "CREATE TABLE nutrient (fdc_id INTEGER PRIMARY KEY, energy REAL,"
+            " energy_rank INTEGER, protein REAL, carbs REAL, fat REAL)"
+        )
+        with open(directory / "food_nutrient.csv", newline="", encoding="utf-8") as fp:
+            with db:
+                db.executemany(_NUTRIENT_UPSERT, _nutrient_rows(fp))
+
+        with open(directory / "food.csv", newline="", encoding="utf-8") as fp:
+            for row in csv.DictReader(fp):
+                fdc_id = int(row["fdc_id"])
+                found = db.execute(
+                    "SELECT energy, protein, carbs, fat FROM nutrient WHERE fdc_id = ?", (fdc_id,)
+                ).fetchone()
+                energy, protein, carbs, fat = found or (None,) * 4
+                yield _row(
+                    fdc_id,
+                    row.get("description"),
+                    row.get("data_type"),
+                    categories.get(row.get("food_category_id") or ""),
+                    {ENERGY_IDS[0]: energy, PROTEIN_ID: protein, CARBS_ID: carbs, FAT_ID: fat},
+                )
+
+
+def iter_fdc_foods(path: Path) -> Iterator[dict]:
+    """Catalog rows from an FDC JSON file, a CSV directory, or its food.csv."""
+    path = Path(path)
+    if path.is_dir():
+        return iter_csv_foods(path)
+    if path.suffix.lower() == ".csv":
+        return iter_csv_foods(path.parent)
+    return iter_json_foods(path)
+
+
+def upsert_catalog_foods(rows: list[dict], reclassify: bool = False) -> int:
+    """
+    Insert or update CatalogFood rows on fdc_id in one statement. Existing
+    rows keep their category (it may have been curated) unless reclassify
+    is set, and keep is_active either way.
+    """
+    by_id = {row["fdc_id"]: row for row in rows}  # last one wins within a batch
+    rows = list(by_id.values())
+    categories = classify_many(((row["category"], row["name"]) for row in rows), classifier=classify_fdc)
+
+    objs = [
+        CatalogFood(
+            fdc_id=row["fdc_id"],
+            name=row["name"],
+            category=category,
+            calories_100g=row["calories_100g"],
+            protein_100g=row["protein_100g"],
+            carbs_100g=row["carbs_100g"],
+            fats_100g=row["fats_100g"],
+            data_type=row["data_type"],
+            is_active=True,
+        )
+        for row, category in zip(rows, categories)
+    ]
+
+    update_fields = ["name", "calories_100g", "protein_100g", "carbs_100g", "fats_100g", "data_type"]
+    if reclassify:
+        update_fields.append("category")
+
+    CatalogFood.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["fdc_id"],
+        update_fields=update_fields,
+    )
+    return len(objs)
@@ -76,7 +76,7 @@ class FoodEntryForm(forms.ModelForm):
         model = FoodEntry
         fields = ['food', 'portion_size', 'portion_unit', 'reaction','notes']
         widgets = {
-            'food': forms.Select(attrs={'class': 'form-select'}),
+            'food': forms.HiddenInput(),  # set by the typeahead in tracker.html
             'portion_size': forms.NumberInput(attrs={'step': '0.01', 'class': 'form-control'}),
             'portion_unit': forms.Select(attrs={'class': 'form-select'}),
             'notes': forms.Textarea(attrs={'rows': 8, 'class': 'form-control'}),
@@ -85,8 +85,10 @@ class FoodEntryForm(forms.ModelForm):
 
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['food'].queryset = FoodItem.objects.all().order_by('name')
-        self.fields['food'].empty_label = "———"
+        # Only used to validate the submitted id (a single pk lookup); the
+        # options themselves come from the food_search endpoint.
+        self.fields['food'].queryset = FoodItem.objects.all()
+        self.fields['food'].error_messages['required'] = "Search for a food and pick it from the list."
 
 class AccountForm(forms.ModelForm):
     email = forms.EmailField(required=True)
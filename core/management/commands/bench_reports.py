@@ -0,0 +1,254 @@
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import date as Date, datetime, timezone as dt_timezone
+from io import BytesIO
+
+import PIL
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+
+from core import reports
+from core.avatars import refresh_avatar_derivatives
+from core.models import Baby, FoodEntry, FoodItem, normalize_food_name
+
+# Stage name -> core.reports function whose calls are timed as that stage.
+# Whatever generate_report_image spends outside them is reported as "layout".
+STAGE_FUNCTIONS = {
+    "fetch": "load_report_data",
+    "avatar": "paste_circular_photo",
+    "reactions": "draw_reaction",
+    "encode": "encode_report_image",
+}
+
+AVATAR_KINDS = ("stock", "upload", "upload-derived")
+FONT_KINDS = ("present", "missing")
+
+UPLOAD_SIZE = (4000, 3000)
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def instrument_report_stages(timings: dict[str, float]):
+    """Accumulate time spent in each STAGE_FUNCTIONS function into timings."""
+    originals = {}
+
+    def timed(stage, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[stage] += time.perf_counter() - start
+        return wrapper
+
+    for stage, name in STAGE_FUNCTIONS.items():
+        originals[name] = getattr(reports, name)
+        setattr(reports, name, timed(stage, originals[name]))
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(reports, name, func)
+
+
+@contextmanager
+def missing_fonts():
+    """Point the renderer at an empty font directory."""
+    original = reports.FONT_DIR
+    with tempfile.TemporaryDirectory() as empty:
+        reports.FONT_DIR = empty
+        reports.load_fonts.cache_clear()
+        try:
+            yield
+        finally:
+            reports.FONT_DIR = original
+            reports.load_fonts.cache_clear()
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _summary(samples: list[float]) -> dict:
+    ms = [s * 1000 for s in samples]
+    return {
+        "median": round(statistics.median(ms), 3),
+        "mean": round(statistics.fmean(ms), 3),
+        "min": round(min(ms), 3),
+        "max": round(max(ms), 3),
+    }
+
+
+def _upload_photo() -> bytes:
+    gradient = Image.linear_gradient("L").resize(UPLOAD_SIZE)
+    photo = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_180), gradient))
+    buf = BytesIO()
+    photo.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark daily report rendering per stage (fetch, layout, avatar, "
+        "reactions, encode) and print the results as JSON. Seeded data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entries", default="0,5,25",
+                            help="Comma-separated entry counts per report day.")
+        parser.add_argument("--avatars", default=",".join(AVATAR_KINDS),
+                            help=f"Comma-separated avatar kinds: {', '.join(AVATAR_KINDS)}.")
+        parser.add_argument("--fonts", default=",".join(FONT_KINDS),
+                            help=f"Comma-separated font setups: {', '.join(FONT_KINDS)}.")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Timed renders per scenario.")
+        parser.add_argument("--warmup", type=int, default=1,
+                            help="Untimed renders per scenario before measuring.")
+        parser.add_argument("--output", help="Write JSON here instead of stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            entry_counts = [int(n) for n in options["entries"].split(",") if n.strip()]
+        except ValueError:
+            raise CommandError("--entries must be comma-separated integers.")
+        avatars = [a.strip() for a in options["avatars"].split(",") if a.strip()]
+        fonts = [f.strip() for f in options["fonts"].split(",") if f.strip()]
+        for kind in avatars:
+            if kind not in AVATAR_KINDS:
+                raise CommandError(f"Unknown avatar kind: {kind}")
+        for kind in fonts:
+            if kind not in FONT_KINDS:
+                raise CommandError(f"Unknown font setup: {kind}")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        results = []
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            try:
+                with transaction.atomic():
+                    babies = self._seed(entry_counts, avatars)
+                    for font_kind in fonts:
+                        for (count, avatar_kind), baby in babies.items():
+                            results.append(self._run_scenario(
+                                baby, count, avatar_kind, font_kind,
+                                options["repeat"], options["warmup"],
+                            ))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        report = {
+            "meta": {
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "pillow": PIL.__version__,
+                "database": connection.vendor,
+                "report_size": list(reports.REPORT_SIZE),
+                "repeat": options["repeat"],
+                "warmup": options["warmup"],
+            },
+            "results": results,
+        }
+        payload = json.dumps(report, indent=2, sort_keys=True)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+            self.stderr.write(f"Wrote {len(results)} scenario(s) to {options['output']}")
+        else:
+            self.stdout.write(payload)
+
+    def _seed(self, entry_counts, avatars) -> dict[tuple[int, str], Baby]:
+        owner = get_user_model().objects.create(username="__bench_reports__")
+        foods = FoodItem.objects.bulk_create(
+            FoodItem(name=name, normalized_name=normalize_food_name(name))
+            for name in (f"Bench food {i}" for i in range(max(entry_counts, default=0)))
+        )
+        photo = _upload_photo() if any(a.startswith("upload") for a in avatars) else b""
+        reactions = [choice for choice, _ in FoodEntry.REACTION_CHOICES] + [""]
+
+        babies = {}
+        for count in entry_counts:
+            for avatar_kind in avatars:
+                baby = Baby.objects.create(
+                    owner=owner,
+                    name=f"Bench {count} {avatar_kind}",
+                    date_of_birth=datetime(2024, 1, 1, tzinfo=dt_timezone.utc),
+                    stock_avatar="core/img/stock-avatars/tomato.png",
+                )
+                if avatar_kind.startswith("upload"):
+                    baby.stock_avatar = ""
+                    baby.image.save("bench.jpg", ContentFile(photo), save=True)
+                if avatar_kind == "upload-derived":
+                    refresh_avatar_derivatives(baby)
+
+                FoodEntry.objects.bulk_create(
+                    FoodEntry(
+                        baby=baby,
+                        food=foods[i],
+                        portion_size=i + 1,
+                        portion_unit="g",
+                        reaction=reactions[i % len(reactions)],
+                    )
+                    for i in range(count)
+                )
+                babies[(count, avatar_kind)] = baby
+        return babies
+
+    def _run_scenario(self, baby, count, avatar_kind, font_kind, repeat, warmup) -> dict:
+        report_date = FoodEntry.objects.filter(baby=baby).values_list("date", flat=True).first() or Date.today()
+        samples = {stage: [] for stage in (*STAGE_FUNCTIONS, "layout", "total")}
+        queries = 0
+        size = 0
+
+        fonts_ctx = missing_fonts() if font_kind == "missing" else nullcontext()
+        with fonts_ctx:
+            for _ in range(warmup):
+                reports.generate_report_image(baby, report_date)
+
+            for _ in range(repeat):
+                timings = dict.fromkeys(STAGE_FUNCTIONS, 0.0)
+                with instrument_report_stages(timings), CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    png_bytes = reports.generate_report_image(baby, report_date)
+                    total = time.perf_counter() - start
+
+                for stage, spent in timings.items():
+                    samples[stage].append(spent)
+                samples["layout"].append(max(0.0, total - sum(timings.values())))
+                samples["total"].append(total)
+                queries = len(ctx.captured_queries)
+                size = len(png_bytes)
+
+        return {
+            "scenario": f"entries={count} avatar={avatar_kind} fonts={font_kind}",
+            "entries": count,
+            "avatar": avatar_kind,
+            "fonts": font_kind,
+            "queries": queries,
+            "bytes": size,
+            "stages_ms": {stage: _summary(values) for stage, values in samples.items()},
+        }
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.avatars import refresh_avatar_derivatives
+from core.models import Baby
+
+
+class Command(BaseCommand):
+    help = "Generate resized avatar copies for babies with an uploaded photo."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Rebuild every baby, not only those missing derivatives.")
+
+    def handle(self, *args, **options):
+        babies = Baby.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            babies = babies.filter(avatar_derivatives={})
+
+        count = 0
+        for baby in babies.iterator():
+            refresh_avatar_derivatives(baby)
+            count += 1
+
+        self.stdout.write(f"Built avatar derivatives for {count} baby profile(s).")
@@ -0,0 +1,79 @@
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.fdc_import import iter_fdc_foods, upsert_catalog_foods
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a downloaded FoodData Central export (JSON file, or CSV folder / "
+        "food.csv) into the catalog, upserting on fdc_id. Interrupted imports "
+        "resume after the last committed batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="FDC JSON file, CSV directory or its food.csv.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--reclassify", action="store_true",
+                            help="Also overwrite the category of foods already in the catalog.")
+        parser.add_argument("--restart", action="store_true",
+                            help="Ignore saved progress and start from the first row.")
+        parser.add_argument("--state", help="Progress file (default: <path>.import-state.json).")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        state_path = Path(options["state"] or f"{path.resolve()}.import-state.json")
+        source = self._source_signature(path)
+        skip = 0
+        if not options["restart"] and state_path.exists():
+            state = json.loads(state_path.read_text())
+            if state.get("source") == source:
+                skip = state["rows"]
+                self.stdout.write(f"Resuming after {skip:,} row(s).")
+
+        rows = iter_fdc_foods(path)
+        if skip:
+            rows = islice(rows, skip, None)
+
+        done = skip
+        imported = 0
+        started = last_report = time.perf_counter()
+        while True:
+            batch = list(islice(rows, options["batch_size"]))
+            if not batch:
+                break
+
+            with transaction.atomic():
+                upsert_catalog_foods(batch, reclassify=options["reclassify"])
+            done += len(batch)
+            imported += len(batch)
+            state_path.write_text(json.dumps({"source": source, "rows": done}))
+
+            now = time.perf_counter()
+            if now - last_report >= 2:
+                last_report = now
+                self.stdout.write(f"{done:,} row(s) ({imported / (now - started):,.0f} rows/s)")
+
+        state_path.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Imported {imported:,} row(s) in {elapsed:.1f}s ({rate:,.0f} rows/s); {done:,} in total."
+        )
+
+    @staticmethod
+    def _source_signature(path: Path) -> dict:
+        # Saved progress only applies to the same, unchanged export.
+        main = path / "food.csv" if path.is_dir() else path
+        stat = main.stat()
+        return {"path": str(main.resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
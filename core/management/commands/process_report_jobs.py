@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.report_jobs import finished_job_retention, purge_finished_jobs, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Render queued daily reports (ReportJob) outside the web process."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the queue once and exit instead of polling.")
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--keep-hours", type=float, default=None,
+                            help="Delete finished jobs older than this many hours "
+                                 "(default: REPORT_JOB_KEEP_HOURS).")
+
+    def handle(self, *args, **options):
+        if options["keep_hours"] is None:
+            keep = finished_job_retention()
+        else:
+            keep = timedelta(hours=options["keep_hours"])
+
+        while True:
+            ran = run_pending_jobs()
+            if ran:
+                self.stdout.write(f"Rendered {ran} report job(s).")
+
+            purged = purge_finished_jobs(keep)
+            if purged:
+                self.stdout.write(f"Purged {purged} finished job(s).")
+
+            if options["once"]:
+                return
+            if not ran:
+                time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.nutrition import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute DailyNutritionSummary rows from food entries in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--baby", action="append", dest="babies",
+                            help="Only this baby id (repeatable).")
+        parser.add_argument("--since", help="Only days on or after this date (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since must be a YYYY-MM-DD date.")
+
+        started = time.perf_counter()
+        written = rebuild_summaries(baby_ids=options["babies"], since=since)
+        self.stdout.write(
+            f"Rebuilt {written} daily summary row(s) in {time.perf_counter() - started:.1f}s."
+        )
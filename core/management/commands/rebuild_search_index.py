@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Create the food name search index if needed and refill it from the tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        backend = get_search_backend(alias)
+        backend.install(connections[alias], rebuild=True)
+        self.stdout.write(f"Rebuilt search index ({backend.__class__.__name__}).")
@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.allergens import allergen_key, get_allergen_scanner
+from core.models import Baby, CatalogFood, FoodEntry, FoodItem
+
+CHUNK_SIZE = 2000
+TARGETS = ("foods", "catalog", "entries")
+
+
+class Command(BaseCommand):
+    help = (
+        "Scan food names and entry notes for allergens. 'foods' and 'catalog' "
+        "list every flagged name; 'entries' lists logged entries containing "
+        "something the baby is allergic to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("targets", nargs="*",
+                            help=f"What to scan: {', '.join(TARGETS)} (default: all).")
+        parser.add_argument("--baby", help="Only scan entries of the baby with this id.")
+
+    def handle(self, *args, **options):
+        targets = options["targets"] or TARGETS
+        unknown = set(targets) - set(TARGETS)
+        if unknown:
+            raise CommandError(f"Unknown target(s): {', '.join(sorted(unknown))}")
+        scanner = get_allergen_scanner()
+
+        for target in targets:
+            started = time.perf_counter()
+            if target == "foods":
+                rows = FoodItem.objects.values_list("pk", "name")
+                scanned, flagged = self._report_names("food", scanner, rows)
+            elif target == "catalog":
+                rows = CatalogFood.objects.values_list("pk", "name")
+                scanned, flagged = self._report_names("catalog", scanner, rows)
+            else:
+                scanned, flagged = self._report_entries(scanner, options["baby"])
+
+            elapsed = time.perf_counter() - started
+            rate = scanned / elapsed if elapsed else 0
+            self.stdout.write(
+                f"{target}: {flagged} of {scanned} row(s) flagged ({rate:,.0f} rows/s)."
+            )
+
+    def _report_names(self, label, scanner, rows):
+        scanned = 0
+
+        def counted():
+            nonlocal scanned
+            for row in rows.iterator(chunk_size=CHUNK_SIZE):
+                scanned += 1
+                yield row
+
+        flagged = 0
+        for pk, allergens in scanner.scan_many(counted()):
+            flagged += 1
+            self.stdout.write(f"{label} {pk}: {', '.join(allergens)}")
+        return scanned, flagged
+
+    def _report_entries(self, scanner, baby_id):
+        allergies = {}
+        through = Baby.allergies.through.objects.values_list("baby_id", "allergy__name")
+        if baby_id is not None:
+            through = through.filter(baby_id=baby_id)
+        for owner, name in through:
+            allergies.setdefault(owner, {})[allergen_key(name)] = name
+
+        entries = (
+            FoodEntry.objects
+            .filter(baby_id__in=allergies)
+            .order_by()
+            .values_list("pk", "baby_id", "date", "food_id", "food__name", "notes")
+        )
+
+        # Most entries reuse a handful of foods; scan each name once.
+        food_keys = {}
+        scanned = flagged = 0
+        for pk, owner, day, food_id, food_name, notes in entries.iterator(chunk_size=CHUNK_SIZE):
+            scanned += 1
+            present = food_keys.get(food_id)
+            if present is None:
+                present = food_keys[food_id] = scanner.match_keys(food_name)
+            if notes:
+                present = present | scanner.match_keys(notes)
+
+            hits = [name for key, name in allergies[owner].items() if key in present]
+            if hits:
+                flagged += 1
+                self.stdout.write(
+                    f"entry {pk} (baby {owner}, {day:%Y-%m-%d}, {food_name}): {', '.join(hits)}"
+                )
+        return scanned, flagged
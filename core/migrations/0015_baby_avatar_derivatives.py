@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='baby',
+            name='avatar_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_baby_avatar_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='name',
+            field=models.CharField(db_index=True, max_length=127),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def normalize(name):
+    # Frozen copy of core.models.normalize_food_name.
+    return " ".join((name or "").split()).casefold()
+
+
+def backfill_and_merge(apps, schema_editor):
+    """
+    Fill FoodItem.normalized_name and fold items that only differ by case or
+    whitespace into the oldest one, repointing their entries first.
+    """
+    FoodItem = apps.get_model("core", "FoodItem")
+    FoodEntry = apps.get_model("core", "FoodEntry")
+
+    groups = {}
+    for item in FoodItem.objects.order_by("id"):
+        groups.setdefault(normalize(item.name), []).append(item)
+
+    for normalized, items in groups.items():
+        keeper, duplicates = items[0], items[1:]
+
+        if duplicates:
+            duplicate_ids = [item.id for item in duplicates]
+            FoodEntry.objects.filter(food_id__in=duplicate_ids).update(food_id=keeper.id)
+
+            for item in duplicates:
+                if not keeper.category and item.category:
+                    keeper.category = item.category
+                if keeper.catalog_food_id is None and item.catalog_food_id is not None:
+                    keeper.catalog_food_id = item.catalog_food_id
+            FoodItem.objects.filter(id__in=duplicate_ids).delete()
+
+        keeper.normalized_name = normalized
+        keeper.save(update_fields=["normalized_name", "category", "catalog_food"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_fooditem_normalized_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_and_merge, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def clear_duplicate_fdc_ids(apps, schema_editor):
+    """
+    Keep fdc_id only on the oldest CatalogFood for each id, so it can be made
+    unique. The other rows stay in the catalog as manual entries.
+    """
+    CatalogFood = apps.get_model("core", "CatalogFood")
+
+    seen = set()
+    duplicates = []
+    rows = (
+        CatalogFood.objects
+        .filter(fdc_id__isnull=False)
+        .order_by("id")
+        .values_list("id", "fdc_id")
+    )
+    for pk, fdc_id in rows:
+        if fdc_id in seen:
+            duplicates.append(pk)
+        seen.add(fdc_id)
+
+    if duplicates:
+        CatalogFood.objects.filter(id__in=duplicates).update(fdc_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_alter_fooditem_normalized_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_fdc_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_clear_duplicate_catalog_fdc_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='catalogfood',
+            name='fdc_id',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
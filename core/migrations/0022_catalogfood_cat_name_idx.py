@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_catalogfood_unique_fdc_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogfood',
+            index=models.Index(fields=['category', 'name', 'id'], name='catalogfood_cat_name_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_catalogfood_cat_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodentry',
+            index=models.Index(fields=['baby', 'date', 'time'], name='foodentry_baby_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodentry',
+            index=models.Index(fields=['baby', 'food', 'date'], name='foodentry_baby_food_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_foodentry_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutritionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('calories', models.FloatField(default=0)),
+                ('protein', models.FloatField(default=0)),
+                ('carbs', models.FloatField(default=0)),
+                ('fats', models.FloatField(default=0)),
+                ('grams', models.FloatField(default=0)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('skipped_entries', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('baby', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nutrition_summaries', to='core.baby')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('baby', 'date'), name='unique_nutrition_summary_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:08
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_reportjob_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogFoodNameIndex',
+            fields=[
+                ('food', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.catalogfood')),
+                ('name', core.models.FullTextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_catalogfood_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='FoodItemNameIndex',
+            fields=[
+                ('item', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='core.fooditem')),
+                ('name', core.models.FullTextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_fooditem_fts',
+                'managed': False,
+            },
+        ),
+    ]
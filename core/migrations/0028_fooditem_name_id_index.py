@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_search_index_views'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='name',
+            field=models.CharField(max_length=127),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['name', 'id'], name='fooditem_name_id_idx'),
+        ),
+    ]
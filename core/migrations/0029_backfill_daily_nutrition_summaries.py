@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    0024 created DailyNutritionSummary empty, and the signals only keep it
+    current for entries saved since. Rebuild it from every existing entry
+    (same as `manage.py rebuild_nutrition_summaries`).
+    """
+    from core.nutrition import write_summaries
+
+    FoodEntry = apps.get_model("core", "FoodEntry")
+    DailyNutritionSummary = apps.get_model("core", "DailyNutritionSummary")
+
+    DailyNutritionSummary.objects.all().delete()
+    write_summaries(FoodEntry.objects.all(), DailyNutritionSummary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_fooditem_name_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,8 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.templatetags.static import static
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError
 
 class Allergy(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -34,6 +36,9 @@ class Baby(models.Model):
 
     stock_avatar = models.CharField(max_length=255, blank=True)
 
+    # kind -> storage name of the resized copies of image (see core.avatars)
+    avatar_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
     allergies = models.ManyToManyField(Allergy, blank=True, related_name='allergies')
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
@@ -55,10 +60,31 @@ class Baby(models.Model):
             return static(self.stock_avatar)
 
         return static("core/img/stock-avatars/tomato.png")
+
+    def derived_avatar_url(self, kind):
+        name = (self.avatar_derivatives or {}).get(kind) if self.image else None
+        if name:
+            return default_storage.url(name)
+        return self.avatar_url
+
+    @property
+    def avatar_nav_url(self):
+        return self.derived_avatar_url("nav")
+
+    @property
+    def avatar_list_url(self):
+        return self.derived_avatar_url("list")
     
 
+def normalize_food_name(name: str) -> str:
+    """Lookup key for FoodItem names: case-folded with whitespace collapsed."""
+    return " ".join((name or "").split()).casefold()
+
+
 class FoodItem(models.Model):
     name = models.CharField(max_length=127)
+    # Set from name on save; the unique index makes lookups and dedup exact.
+    normalized_name = models.CharField(max_length=255, unique=True, editable=False)
     category = models.CharField(max_length=127, blank=True)
     catalog_food = models.ForeignKey(
         "CatalogFood",
@@ -67,13 +93,59 @@ class FoodItem(models.Model):
         on_delete=models.SET_NULL,
         related_name="food_items",
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Keyset pages of the foods API (name, id); lookups by name go
+            # through normalized_name instead.
+            models.Index(fields=['name', 'id'], name='fooditem_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        super().clean()
+        normalized = normalize_food_name(self.name)
+        if FoodItem.objects.filter(normalized_name=normalized).exclude(pk=self.pk).exists():
+            raise ValidationError({"name": f"A food named “{self.name}” already exists."})
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_food_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # Every save is a change the sync feed has to report.
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+            if "name" in update_fields:
+                kwargs["update_fields"].add("normalized_name")
+        super().save(*args, **kwargs)
+
+
+def get_or_create_food_item(name: str, **defaults) -> tuple[FoodItem, bool]:
+    """
+    The one way to look up or add a FoodItem by name. Matching ignores case
+    and extra whitespace, and goes through the normalized_name index.
+
+    Safe under concurrent requests: if another request inserts the same name
+    first, the unique index rejects our insert and we return theirs.
+    """
+    from django.db import IntegrityError, transaction
+
+    name = " ".join(name.split())
+    normalized = normalize_food_name(name)
+    try:
+        return FoodItem.objects.get(normalized_name=normalized), False
+    except FoodItem.DoesNotExist:
+        pass
+
+    try:
+        with transaction.atomic():
+            return FoodItem.objects.create(name=name, **defaults), True
+    except IntegrityError:
+        return FoodItem.objects.get(normalized_name=normalized), False
+
 
 class FoodEntry(models.Model):
     baby = models.ForeignKey('Baby', on_delete=models.CASCADE, related_name='food_entries')
@@ -116,8 +188,17 @@ class FoodEntry(models.Model):
     date = models.DateField(auto_now_add=True)
     time = models.TimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     class Meta:
         ordering = ['-date', '-time']
+        indexes = [
+            # Recent entries, per-day reports and the feeding history (keyset on date, time, id).
+            models.Index(fields=['baby', 'date', 'time'], name='foodentry_baby_date_time_idx'),
+            # First-tried lookups: a baby's entries of one food before a date.
+            models.Index(fields=['baby', 'food', 'date'], name='foodentry_baby_food_date_idx'),
+            # The sync feed: a baby's entries changed since a token.
+            models.Index(fields=['baby', 'updated_at'], name='foodentry_baby_updated_idx'),
+        ]
 
 
 
@@ -154,68 +235,11 @@ def map_usda_to_category(usda_category: str | None, description: str | None) ->
     """
     Light heuristic text-matching to place USDA foods into a category.
     Still works perfectly even without showing the numbers in frontend.
+    See core.categories; use classify_many() there for batches.
     """
-    text = f"{usda_category or ''} {description or ''}".lower()
-
-    def pick(label: str) -> "FoodCategory":
-        level = PYRAMID_MAP.get(label, 5)
-        obj, _ = FoodCategory.objects.get_or_create(name=label, defaults={"pyramid_level": level})
-        return obj
-
-    # Veg
-    if any(k in text for k in [
-        "vegetable", "veg", "broccoli", "spinach", "carrot", "kale",
-        "lettuce", "pepper", "cabbage", "tomato"
-    ]):
-        return pick("Vegetables")
-
-    # Fruits
-    if any(k in text for k in [
-        "fruit", "apple", "banana", "strawberry", "berries", "grape",
-        "orange", "pear", "peach"
-    ]):
-        return pick("Fruits")
-
-    # Grains
-    if any(k in text for k in [
-        "bread", "rice", "pasta", "oat", "cereal", "grain", "tortilla",
-        "noodle", "quinoa", "barley", "cracker"
-    ]):
-        return pick("Grains & Starches")
-
-    # Protein
-    if any(k in text for k in [
-        "chicken", "beef", "pork", "turkey", "fish", "egg", "tofu",
-        "bean", "lentil", "pea", "shrimp", "tuna", "salmon"
-    ]):
-        return pick("Proteins")
-
-    # Dairy
-    if any(k in text for k in [
-        "milk", "yogurt", "cheese", "cottage cheese", "kefir"
-    ]):
-        return pick("Dairy")
-
-    # Fats
-    if any(k in text for k in [
-        "oil", "butter", "olive", "avocado oil", "ghee", "shortening", "lard"
-    ]):
-        return pick("Fats & Oils")
-
-    # Sweets
-    if any(k in text for k in [
-        "cookie", "candy", "syrup", "brownie", "cake", "muffin",
-        "donut", "ice cream", "sweet", "soda", "fruit snacks",
-        "added sugar", "frosting", "sweetened"
-    ]):
-        return pick("Sweets & Processed Foods")
-
-    # Juice-ish default
-    if "juice" in text or "sweet" in text or "syrup" in text:
-        return pick("Sweets & Processed Foods")
-
-    # Fallback
-    return pick("Grains & Starches")
+    from .categories import category_registry, classify
+
+    return category_registry.get(classify(usda_category, description))
 
 
 # -----------------------------
@@ -266,7 +290,8 @@ class CatalogFood(models.Model):
     carbs_100g = models.FloatField(default=0)
     fats_100g = models.FloatField(default=0)
 
-    fdc_id = models.BigIntegerField(null=True, blank=True)
+    # FoodData Central id; unique so imports can upsert on it
+    fdc_id = models.BigIntegerField(null=True, blank=True, unique=True)
     data_type = models.CharField(max_length=50, blank=True)
 
     is_active = models.BooleanField(default=True)
@@ -274,6 +299,153 @@ class CatalogFood(models.Model):
 
     class Meta:
         ordering = ['category__name', 'name']
+        indexes = [
+            # Per-category keyset pages of the catalog page (name, id).
+            models.Index(fields=['category', 'name', 'id'], name='catalogfood_cat_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.category})"
+
+# -----------------------------
+# Name search index (SQLite FTS5 tables, see core.search)
+# -----------------------------
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class FullTextField(models.TextField):
+    pass
+
+
+FullTextField.register_lookup(FullTextMatch)
+
+
+class FoodItemNameIndex(models.Model):
+    """
+    Read-only view of the FTS5 table core.search keeps for FoodItem, so a
+    ranked search can join it and order by its bm25 rank.
+    """
+    item = models.OneToOneField(FoodItem, primary_key=True, db_column="rowid", db_constraint=False,
+                                on_delete=models.DO_NOTHING, related_name="search_index")
+    name = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "core_fooditem_fts"
+
+
+class CatalogFoodNameIndex(models.Model):
+    """Same as FoodItemNameIndex, for CatalogFood."""
+    food = models.OneToOneField(CatalogFood, primary_key=True, db_column="rowid", db_constraint=False,
+                                on_delete=models.DO_NOTHING, related_name="search_index")
+    name = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "core_catalogfood_fts"
+
+
+# -----------------------------
+# ReportJob (queued report renders)
+# -----------------------------
+class ReportJob(models.Model):
+    """A daily report render queued from report_image (see core.report_jobs)."""
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    baby = models.ForeignKey('Baby', on_delete=models.CASCADE, related_name='report_jobs')
+    report_date = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+
+    etag = models.CharField(max_length=66, blank=True)
+    result = models.BinaryField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Report for {self.baby.name} on {self.report_date} ({self.status})"
+
+
+# -----------------------------
+# DailyNutritionSummary (per-day rollup)
+# -----------------------------
+class DailyNutritionSummary(models.Model):
+    """
+    Calories and macros a baby ate on one day, kept current as entries change
+    (see core.nutrition). Entries whose food has no catalog nutrition or whose
+    portion cannot be converted to grams count in skipped_entries only.
+    """
+    baby = models.ForeignKey('Baby', on_delete=models.CASCADE, related_name='nutrition_summaries')
+    date = models.DateField()
+
+    calories = models.FloatField(default=0)
+    protein = models.FloatField(default=0)
+    carbs = models.FloatField(default=0)
+    fats = models.FloatField(default=0)
+    grams = models.FloatField(default=0)
+
+    entry_count = models.PositiveIntegerField(default=0)
+    skipped_entries = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['baby', 'date'], name='unique_nutrition_summary_per_day'),
+        ]
+
+    def __str__(self):
+        return f"Nutrition for {self.baby.name} on {self.date}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted Baby, FoodEntry or FoodItem, so the sync feed can
+    tell clients to drop their copy. Kept for SYNC_TOMBSTONE_DAYS (see the
+    prune_tombstones command); older sync tokens must resync from scratch.
+    """
+    KIND_BABY = "baby"
+    KIND_ENTRY = "entry"
+    KIND_FOOD = "food"
+    KIND_CHOICES = [
+        (KIND_BABY, "Baby"),
+        (KIND_ENTRY, "Food entry"),
+        (KIND_FOOD, "Food item"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64)
+    # Who may see it: babies by owner, entries by baby; foods are shared.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    baby_id = models.UUIDField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
 
     def __str__(self):
-        return f"{self.name} ({self.category})"
\ No newline at end of file
+        return f"{self.kind} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,115 @@
+import math
+from datetime import date as Date
+
+from django.db import transaction
+
+from core.models import DailyNutritionSummary, FoodEntry
+from core.portions import to_grams
+
+# What summarize() needs from each entry, as one values_list() row.
+ENTRY_NUTRITION_FIELDS = (
+    "food__name",
+    "portion_size",
+    "portion_unit",
+    "food__catalog_food__calories_100g",
+    "food__catalog_food__protein_100g",
+    "food__catalog_food__carbs_100g",
+    "food__catalog_food__fats_100g",
+)
+
+
+def summarize(rows) -> dict:
+    """Totals for DailyNutritionSummary from ENTRY_NUTRITION_FIELDS rows."""
+    totals = {
+        "calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0, "grams": 0.0,
+        "entry_count": 0, "skipped_entries": 0,
+    }
+    if not rows:
+        return totals
+
+    names, sizes, units, *_ = zip(*rows)
+    for grams, (*_, calories, protein, carbs, fats) in zip(to_grams(names, sizes, units), rows):
+        totals["entry_count"] += 1
+        if math.isnan(grams) or calories is None:
+            totals["skipped_entries"] += 1
+            continue
+        scale = grams / 100
+        totals["grams"] += grams
+        totals["calories"] += calories * scale
+        totals["protein"] += protein * scale
+        totals["carbs"] += carbs * scale
+        totals["fats"] += fats * scale
+    return totals
+
+
+def refresh_daily_summary(baby_id, day: Date) -> DailyNutritionSummary | None:
+    """
+    Recompute one (baby, day) row from that day's entries: one indexed read
+    and one write, called whenever an entry of that day changes.
+    """
+    rows = list(
+        FoodEntry.objects
+        .filter(baby_id=baby_id, date=day)
+        .values_list(*ENTRY_NUTRITION_FIELDS)
+    )
+    if not rows:
+        DailyNutritionSummary.objects.filter(baby_id=baby_id, date=day).delete()
+        return None
+
+    summary, _ = DailyNutritionSummary.objects.update_or_create(
+        baby_id=baby_id,
+        date=day,
+        defaults=summarize(rows),
+    )
+    return summary
+
+
+@transaction.atomic
+def rebuild_summaries(baby_ids=None, since: Date | None = None, batch_size: int = 1000) -> int:
+    """
+    Replace the summaries (optionally of some babies / from a date on) with
+    totals recomputed from every entry in one streamed pass, written with
+    bulk_create. Returns the number of summary rows written.
+    """
+    entries = FoodEntry.objects.all()
+    summaries = DailyNutritionSummary.objects.all()
+    if baby_ids is not None:
+        entries = entries.filter(baby_id__in=baby_ids)
+        summaries = summaries.filter(baby_id__in=baby_ids)
+    if since is not None:
+        entries = entries.filter(date__gte=since)
+        summaries = summaries.filter(date__gte=since)
+    summaries.delete()
+    return write_summaries(entries, DailyNutritionSummary, batch_size)
+
+
+def write_summaries(entries, summary_model, batch_size: int = 1000) -> int:
+    """
+    bulk_create one summary_model row per (baby, day) of the entries
+    queryset. Takes the models as arguments so migrations can pass their
+    historical ones. Returns the number of rows written.
+    """
+    written = 0
+    batch = []
+    current, rows = None, []
+
+    def flush_day():
+        if current is not None:
+            batch.append(summary_model(baby_id=current[0], date=current[1], **summarize(rows)))
+
+    entries = entries.order_by("baby_id", "date").values_list("baby_id", "date", *ENTRY_NUTRITION_FIELDS)
+    for baby_id, day, *row in entries.iterator(chunk_size=5000):
+        if (baby_id, day) != current:
+            flush_day()
+            current, rows = (baby_id, day), []
+            if len(batch) >= batch_size:
+                summary_model.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        rows.append(row)
+    flush_day()
+
+    if batch:
+        summary_model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
@@ -0,0 +1,80 @@
+import base64
+import datetime
+import json
+import math
+
+from django.db.models import Q
+
+
+def encode_cursor(values) -> str:
+    """Opaque, URL-safe token for the sort key of the last row on a page."""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, types) -> tuple:
+    """
+    Inverse of encode_cursor; types converts each value back (e.g.
+    (str, int) or (datetime.date, datetime.time, int)). Raises ValueError
+    for anything malformed, whatever the token holds.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("invalid cursor")
+
+    converted = []
+    try:
+        for value, kind in zip(values, types):
+            if kind in (datetime.date, datetime.time, datetime.datetime):
+                value = kind.fromisoformat(value)
+            else:
+                value = kind(value)
+            if isinstance(value, float) and not math.isfinite(value):
+                raise ValueError("invalid cursor")
+            converted.append(value)
+    except (ValueError, TypeError, KeyError, OverflowError) as e:
+        raise ValueError("invalid cursor") from e
+    return tuple(converted)
+
+
+def keyset_filter(ordering, after) -> Q:
+    """
+    Rows strictly after `after` in `ordering` ("name", "-date", ...), as
+    the expanded comparison (a > x) OR (a = x AND b > y) OR ... rather than
+    a SQL row value, since each column may sort in its own direction.
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip("-")
+        op = "lt" if field.startswith("-") else "gt"
+        step = Q(**{f"{name}__{op}": after[i]})
+        for prev, value in zip(ordering[:i], after[:i]):
+            step &= Q(**{prev.lstrip("-"): value})
+        condition = step if i == 0 else condition | step
+    return condition
+
+
+def keyset_page(queryset, ordering, after=None, limit=50):
+    """
+    One page of queryset in `ordering`, which must end in a unique column.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    qs = queryset.order_by(*ordering)
+    if after is not None:
+        qs = qs.filter(keyset_filter(ordering, after))
+
+    rows = list(qs[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    key = [
+        (last[f.lstrip("-")] if isinstance(last, dict) else getattr(last, f.lstrip("-")))
+        for f in ordering
+    ]
+    return rows, encode_cursor(key)
@@ -0,0 +1,144 @@
+"""
+Portion size -> grams.
+
+Mass units convert exactly. Volume units need the food's density (g/ml)
+from DENSITIES and count units ("whole", "slice", ...) a weight from
+PIECE_WEIGHTS; a food in neither table is left unconverted rather than
+guessed at, since a cup of puffs weighs a fraction of a cup of purée.
+
+Conversion is batched: the grams-per-unit factor is resolved once per
+distinct (food, unit) and then applied to a whole column of sizes in one
+pass. Unconvertible rows come back as NaN rather than being branched on.
+"""
+import hashlib
+import json
+import math
+import unicodedata
+from functools import lru_cache
+from operator import mul
+
+from core.allergens import tokenize
+
+MASS_UNITS = {
+    "g": 1.0,
+    "oz": 28.349523125,
+}
+
+VOLUME_UNITS_ML = {
+    "ml": 1.0,
+    "tsp": 4.92892159375,
+    "tbsp": 14.78676478125,
+    "fl oz": 29.5735295625,
+    "cup": 236.5882365,
+}
+
+# Count units resolve to PIECE_WEIGHTS[food][unit]; "half" is half a whole.
+COUNT_UNITS = {"piece", "whole", "slice", "serving", "half"}
+
+# g/ml, keyed by a word or phrase of the food name (tokenized, plurals folded).
+DENSITIES = {
+    "milk": 1.03,
+    "breast milk": 1.03,
+    "formula": 1.03,
+    "yogurt": 1.05,
+    "applesauce": 1.06,
+    "puree": 1.04,
+    "mash": 1.0,
+    "mashed": 1.0,
+    "juice": 1.04,
+    "water": 1.0,
+    "soup": 1.0,
+    "broth": 1.0,
+    "smoothie": 1.05,
+    "sauce": 1.05,
+    "oatmeal": 0.95,
+    "rice cereal": 0.9,
+    "rice": 0.85,
+    "pasta": 0.6,
+    "pea": 0.65,
+    "blueberry": 0.6,
+    "cheese": 0.45,
+    "oil": 0.92,
+    "butter": 0.96,
+    "peanut butter": 1.08,
+    "honey": 1.42,
+}
+
+# grams per count unit, keyed like DENSITIES
+PIECE_WEIGHTS = {
+    "banana": {"whole": 118, "piece": 20, "slice": 8},
+    "apple": {"whole": 182, "slice": 20, "piece": 15},
+    "pear": {"whole": 178, "slice": 20, "piece": 15},
+    "avocado": {"whole": 150, "slice": 15, "piece": 15},
+    "egg": {"whole": 50, "piece": 50},
+    "bread": {"slice": 28, "piece": 28},
+    "toast": {"slice": 28, "piece": 28},
+    "pancake": {"whole": 38, "piece": 38},
+    "strawberry": {"whole": 12, "piece": 12, "slice": 3},
+    "blueberry": {"piece": 1.5, "whole": 1.5},
+    "grape": {"piece": 5, "whole": 5},
+    "carrot": {"whole": 61, "piece": 10, "slice": 3},
+    "broccoli": {"piece": 10},
+    "cheese": {"slice": 21, "piece": 10},
+    "cracker": {"piece": 3, "whole": 3},
+    "puff": {"piece": 0.5},
+    "pouch": {"whole": 113, "serving": 113},
+    "jar": {"whole": 113, "serving": 113},
+}
+
+# Feeds report fingerprints, so editing a table re-renders cached reports.
+TABLE_VERSION = hashlib.sha256(
+    json.dumps([MASS_UNITS, VOLUME_UNITS_ML, DENSITIES, PIECE_WEIGHTS], sort_keys=True).encode()
+).hexdigest()[:12]
+
+
+def _phrases(table: dict) -> dict[tuple[str, ...], str]:
+    return {tokenize(key): key for key in table}
+
+
+_DENSITY_PHRASES = _phrases(DENSITIES)
+_PIECE_PHRASES = _phrases(PIECE_WEIGHTS)
+
+
+def _lookup(name: str, phrases: dict[tuple[str, ...], str]) -> str | None:
+    # Longest phrase in the name wins ("peanut butter" over "butter").
+    # Fold accents so "purée" finds "puree".
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    tokens = tokenize(name)
+    for length in range(len(tokens), 0, -1):
+        for i in range(len(tokens) - length + 1):
+            key = phrases.get(tokens[i:i + length])
+            if key is not None:
+                return key
+    return None
+
+
+@lru_cache(maxsize=4096)
+def grams_per_unit(food_name: str, unit: str) -> float:
+    """Grams in one `unit` of food_name, or NaN when there is no conversion."""
+    if unit in MASS_UNITS:
+        return MASS_UNITS[unit]
+
+    if unit in VOLUME_UNITS_ML:
+        key = _lookup(food_name, _DENSITY_PHRASES)
+        return VOLUME_UNITS_ML[unit] * DENSITIES[key] if key else math.nan
+
+    if unit in COUNT_UNITS:
+        key = _lookup(food_name, _PIECE_PHRASES)
+        weights = PIECE_WEIGHTS.get(key, {})
+        if unit == "half":
+            return weights["whole"] / 2 if "whole" in weights else math.nan
+        return float(weights[unit]) if unit in weights else math.nan
+
+    return math.nan
+
+
+def to_grams(food_names, sizes, units) -> list[float]:
+    """
+    Convert parallel columns of food names, portion sizes and units to
+    grams. Each distinct (food, unit) is resolved once; the sizes are then
+    scaled in one pass. Unconvertible rows (and missing sizes) are NaN.
+    """
+    factors = {key: grams_per_unit(*key) for key in set(zip(food_names, units))}
+    column = [factors[key] for key in zip(food_names, units)]
+    return list(map(mul, (math.nan if s is None else s for s in sizes), column))
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Baby
+
+
+def _profiles_cache_key(user_id) -> str:
+    return f"babybites:profiles:{user_id}"
+
+
+def get_profiles(request) -> list[Baby]:
+    """
+    The user's babies ordered by name. Memoised on the request and cached
+    per user across requests until a Baby is saved or deleted (see
+    core.signals).
+    """
+    if not request.user.is_authenticated:
+        return []
+
+    profiles = getattr(request, "_babybites_profiles", None)
+    if profiles is None:
+        key = _profiles_cache_key(request.user.pk)
+        profiles = cache.get(key)
+        if profiles is None:
+            profiles = list(Baby.objects.filter(owner=request.user).order_by('name'))
+            cache.set(key, profiles, settings.PROFILE_CACHE_TIMEOUT)
+        request._babybites_profiles = profiles
+    return profiles
+
+
+def get_active_profile(request, verify: bool = False) -> Baby | None:
+    """
+    The baby selected in the session, defaulting to the first profile. The
+    session is only written when the selection actually changes.
+
+    The profile list may come from a cache that another worker's change has
+    not reached yet. Views that write for the baby or render its data pass
+    verify=True, which re-reads the baby (and its owner) from the database
+    and rebuilds the list if the baby is gone.
+    """
+    active = _active_profile(request)
+    if not verify or active is None or getattr(request, "_babybites_profile_verified", False):
+        return active
+
+    current = Baby.objects.filter(pk=active.pk, owner=request.user).first()
+    if current is None:
+        # Deleted or reassigned elsewhere: drop the stale list and choose again.
+        invalidate_profiles(request.user.pk)
+        del request._babybites_profiles, request._babybites_active_profile
+        current = _active_profile(request)
+    elif current.updated_at != active.updated_at:
+        # Renamed or otherwise edited elsewhere; the next request reloads the list.
+        invalidate_profiles(request.user.pk)
+
+    request._babybites_profile_verified = True
+    request._babybites_active_profile = current
+    return current
+
+
+def _active_profile(request) -> Baby | None:
+    if hasattr(request, "_babybites_active_profile"):
+        return request._babybites_active_profile
+
+    profiles = get_profiles(request)
+    active = None
+
+    if profiles:
+        profile_id = request.session.get('active_profile')
+        active = next((p for p in profiles if str(p.id) == str(profile_id)), profiles[0])
+        if str(active.id) != profile_id:
+            request.session['active_profile'] = str(active.id)
+    elif request.user.is_authenticated and 'active_profile' in request.session:
+        request.session.pop('active_profile', None)
+
+    request._babybites_active_profile = active
+    return active
+
+
+def invalidate_profiles(user_id) -> None:
+    cache.delete(_profiles_cache_key(user_id))
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class RenderedReportCache:
+    """
+    In-process LRU of rendered report images keyed by their content
+    fingerprint (see core.reports.report_fingerprint).
+
+    Bounded by the total size of the stored bytes rather than the number of
+    entries, since a report can be anything from a small preview to a
+    multi-page export. Safe to share between request threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+            self._items[key] = data
+            self._size += len(data)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+report_cache = RenderedReportCache(
+    getattr(settings, "REPORT_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+)
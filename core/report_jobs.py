@@ -0,0 +1,232 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as Date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Baby, ReportJob
+from core.report_cache import report_cache
+from core.reports import (
+    generate_report_image,
+    get_render_pool,
+    load_report_data,
+    report_fingerprint,
+)
+
+_job_executor: ThreadPoolExecutor | None = None
+_job_executor_lock = threading.Lock()
+
+
+def get_job_executor() -> ThreadPoolExecutor | None:
+    """
+    Threads that pick up jobs inside the web process as soon as they are
+    queued. Returns None when REPORT_JOB_THREADS is 0, in which case jobs
+    wait for `manage.py process_report_jobs`.
+    """
+    global _job_executor
+
+    threads = getattr(settings, "REPORT_JOB_THREADS", 2)
+    if threads <= 0:
+        return None
+
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(
+                max_workers=threads,
+                thread_name_prefix="report-job",
+            )
+            # Jobs queued before a restart have no thread waiting on them.
+            _job_executor.submit(_drain_in_thread)
+        return _job_executor
+
+
+def job_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, "REPORT_JOB_TIMEOUT", 300))
+
+
+def finished_job_retention() -> timedelta:
+    return timedelta(hours=getattr(settings, "REPORT_JOB_KEEP_HOURS", 24.0))
+
+
+def stale_jobs(now=None):
+    """
+    Jobs that will never finish: pending or running for longer than
+    REPORT_JOB_TIMEOUT, e.g. because the process that owned their thread
+    restarted or the thread died.
+    """
+    cutoff = (now or timezone.now()) - job_timeout()
+    return ReportJob.objects.filter(
+        Q(status=ReportJob.STATUS_PENDING, created_at__lt=cutoff)
+        | Q(status=ReportJob.STATUS_RUNNING, started_at__lt=cutoff)
+    )
+
+
+def expire_stale_jobs() -> int:
+    """Fail stale jobs so pollers stop waiting and enqueue_report starts afresh."""
+    now = timezone.now()
+    return stale_jobs(now).update(
+        status=ReportJob.STATUS_FAILED,
+        error="Report job timed out.",
+        finished_at=now,
+    )
+
+
+_last_housekeeping = 0.0
+_housekeeping_lock = threading.Lock()
+HOUSEKEEPING_INTERVAL = 60.0
+
+
+def housekeeping(force: bool = False) -> None:
+    """
+    Expire stale jobs and purge old finished ones (and their blobs), at
+    most once a minute per process. Called from the web process so neither
+    depends on `manage.py process_report_jobs` running.
+    """
+    global _last_housekeeping
+
+    with _housekeeping_lock:
+        now = time.monotonic()
+        if not force and now - _last_housekeeping < HOUSEKEEPING_INTERVAL:
+            return
+        _last_housekeeping = now
+
+    expire_stale_jobs()
+    purge_finished_jobs(finished_job_retention())
+
+
+def enqueue_report(baby: Baby, report_date: Date) -> ReportJob:
+    """
+    Queue a render of baby's report for report_date and return its job.
+
+    An unfailed, unstale job for identical content is reused, and content already in
+    report_cache produces a job that is done immediately.
+    """
+    housekeeping()
+
+    data = load_report_data(baby, report_date)
+    etag = f'"{report_fingerprint(baby, report_date, data)}"'
+
+    job = (
+        ReportJob.objects
+        .filter(baby=baby, etag=etag)
+        .exclude(status=ReportJob.STATUS_FAILED)
+        .exclude(pk__in=stale_jobs().values("pk"))
+        .defer("result")
+        .order_by("-created_at")
+        .first()
+    )
+    if job:
+        return job
+
+    png_bytes = report_cache.get(etag)
+    if png_bytes is not None:
+        return ReportJob.objects.create(
+            baby=baby,
+            report_date=report_date,
+            etag=etag,
+            status=ReportJob.STATUS_DONE,
+            result=png_bytes,
+            finished_at=timezone.now(),
+        )
+
+    job = ReportJob.objects.create(baby=baby, report_date=report_date, etag=etag)
+
+    executor = get_job_executor()
+    if executor is not None:
+        transaction.on_commit(lambda: executor.submit(_run_in_thread, job.pk))
+    return job
+
+
+def claim_job(job_id) -> bool:
+    """Atomically move a pending job to running; False if someone else has it."""
+    claimed = (
+        ReportJob.objects
+        .filter(pk=job_id, status=ReportJob.STATUS_PENDING)
+        .update(status=ReportJob.STATUS_RUNNING, started_at=timezone.now())
+    )
+    return claimed == 1
+
+
+def run_report_job(job_id) -> None:
+    if not claim_job(job_id):
+        return
+
+    job = ReportJob.objects.select_related("baby").defer("result").get(pk=job_id)
+    try:
+        # Re-read the data: entries may have changed since the job was queued.
+        data = load_report_data(job.baby, job.report_date)
+        etag = f'"{report_fingerprint(job.baby, job.report_date, data)}"'
+
+        png_bytes = report_cache.get(etag)
+        if png_bytes is None:
+            pool = get_render_pool()
+            if pool is not None:
+                png_bytes = pool.submit(generate_report_image, job.baby, job.report_date, data).result()
+            else:
+                png_bytes = generate_report_image(job.baby, job.report_date, data)
+            report_cache.set(etag, png_bytes)
+    except Exception as exc:
+        job.status = ReportJob.STATUS_FAILED
+        job.error = str(exc) or exc.__class__.__name__
+        job.result = None
+    else:
+        job.status = ReportJob.STATUS_DONE
+        job.etag = etag
+        job.result = png_bytes
+
+    job.finished_at = timezone.now()
+    # Only while still ours: expire_stale_jobs may have failed it meanwhile.
+    ReportJob.objects.filter(pk=job.pk, status=ReportJob.STATUS_RUNNING).update(
+        status=job.status, etag=job.etag, result=job.result,
+        error=job.error, finished_at=job.finished_at,
+    )
+
+
+def _run_in_thread(job_id) -> None:
+    try:
+        run_report_job(job_id)
+    finally:
+        connection.close()
+
+
+def _drain_in_thread() -> None:
+    try:
+        run_pending_jobs()
+    finally:
+        connection.close()
+
+
+def run_pending_jobs(limit: int | None = None) -> int:
+    """Run queued jobs oldest first in this process; returns how many ran."""
+    expire_stale_jobs()
+    pending = (
+        ReportJob.objects
+        .filter(status=ReportJob.STATUS_PENDING)
+        .order_by("created_at")
+        .values_list("pk", flat=True)
+    )
+    if limit:
+        pending = pending[:limit]
+
+    count = 0
+    for job_id in list(pending):
+        run_report_job(job_id)
+        count += 1
+    return count
+
+
+def purge_finished_jobs(older_than: timedelta) -> int:
+    cutoff = timezone.now() - older_than
+    deleted, _ = (
+        ReportJob.objects
+        .filter(
+            status__in=[ReportJob.STATUS_DONE, ReportJob.STATUS_FAILED],
+            finished_at__lt=cutoff,
+        )
+        .delete()
+    )
+    return deleted
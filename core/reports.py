@@ -1,11 +1,25 @@
+import hashlib
+import math
+import multiprocessing
 import os
+import threading
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from io import BytesIO
-from datetime import date as Date
+from datetime import date as Date, timedelta
 
+import django
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Min
 from PIL import Image, ImageDraw, ImageFont, ImageColor
 
 from core.models import Baby, FoodEntry
+from core.portions import TABLE_VERSION as PORTION_TABLE_VERSION, to_grams
+from core.report_cache import report_cache
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FONT_DIR = os.path.join(BASE_DIR, "static", "core", "fonts")
@@ -13,6 +27,29 @@ FONT_DIR = os.path.join(BASE_DIR, "static", "core", "fonts")
 RESAMPLING = Image.Resampling.LANCZOS
 
 EMOJI_FONT_FILE = "NotoColorEmoji-Regular.ttf"
+STYLED_FONT_FILE = "Grandstander-Bold.ttf"
+
+REPORT_SIZE = (1200, 1552)
+
+# Scales the report can be rendered at, relative to REPORT_SIZE. Kept to a
+# fixed set so fonts, masks and cached renders stay reusable.
+REPORT_SCALES = (0.25, 0.5, 0.75, 1.0)
+
+# format name -> (Pillow encoder, content type, default quality)
+REPORT_FORMATS = {
+    "png": ("PNG", "image/png", None),
+    "webp": ("WEBP", "image/webp", 80),
+    "jpeg": ("JPEG", "image/jpeg", 85),
+}
+
+# Bump whenever the report layout changes so previously cached renders and
+# ETags stop matching.
+REPORT_RENDER_VERSION = 2
+
+# Upper bound for each of the per-process asset caches below (fonts, icons,
+# masks, resolved static paths). functools.lru_cache is thread-safe, so the
+# caches can be shared by every request thread in a worker.
+ASSET_CACHE_SIZE = 64
 
 REACTION_ICON_MAP = {
     "love": "core/img/reactions/love.png",
@@ -23,6 +60,7 @@ REACTION_ICON_MAP = {
 }
 
 
+@lru_cache(maxsize=ASSET_CACHE_SIZE * 4)
 def abs_static(path: str) -> str | None:
     if not path:
         return None
@@ -48,6 +86,12 @@ def abs_static(path: str) -> str | None:
 
 def resolve_baby_image(baby: Baby) -> str | None:
     if baby.image:
+        derived = (baby.avatar_derivatives or {}).get("report")
+        if derived:
+            try:
+                return default_storage.path(derived)
+            except NotImplementedError:
+                pass
         try:
             return baby.image.path
         except (ValueError, AttributeError):
@@ -61,6 +105,24 @@ def resolve_baby_image(baby: Baby) -> str | None:
     return abs_static("core/img/stock-avatars/tomato.png")
 
 
+MASK_SUPERSAMPLE = 4
+
+
+@lru_cache(maxsize=ASSET_CACHE_SIZE)
+def circle_mask(diam: int) -> Image.Image:
+    """
+    Anti-aliased circular "L" mask for a diam x diam tile.
+
+    The ellipse is drawn at MASK_SUPERSAMPLE times the size and box-filtered
+    down, so edge pixels get fractional coverage instead of a hard 0/255 step.
+    Cached per diameter; callers must treat the returned image as read-only.
+    """
+    big = diam * MASK_SUPERSAMPLE
+    mask = Image.new("L", (big, big), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, big - 1, big - 1), fill=255)
+    return mask.resize((diam, diam), Image.Resampling.BOX)
+
+
 def paste_circular_photo(image: Image.Image,
                          circle_bbox: list[float],
                          photo_path: str) -> None:
@@ -78,46 +140,26 @@ def paste_circular_photo(image: Image.Image,
     diam = int(circle_bbox[2] - circle_bbox[0])
     avatar = avatar.resize((diam, diam), RESAMPLING)
 
-    r, g, b, a = avatar.split()
-    white_bg = Image.new("RGBA", (diam, diam), (255, 255, 255, 255))
-    composite = Image.composite(avatar, white_bg, a)
-    avatar_flat = composite.convert("RGB")
-
-    mask = Image.new("L", (diam, diam), 0)
-    mask_draw = ImageDraw.Draw(mask)
-    mask_draw.ellipse((0, 0, diam, diam), fill=255)
+    # Flatten transparent avatars onto white, then blend the result onto a
+    # white tile through the circle mask. Pasting the tile in one go also
+    # clears whatever was under the bounding box outside the circle.
+    white_bg = Image.new("RGB", (diam, diam), (255, 255, 255))
+    white_bg.paste(avatar, (0, 0), avatar)
 
-    x0 = int(circle_bbox[0])
-    y0 = int(circle_bbox[1])
+    tile = Image.new("RGB", (diam, diam), (255, 255, 255))
+    tile.paste(white_bg, (0, 0), circle_mask(diam))
 
-    image.paste(avatar_flat, (x0, y0), mask)
+    image.paste(tile, (int(circle_bbox[0]), int(circle_bbox[1])))
 
-    bg_r, bg_g, bg_b = (255, 255, 255)
-    pixels = image.load()
-    W, H = image.size
 
-    cx = (circle_bbox[0] + circle_bbox[2]) / 2.0
-    cy = (circle_bbox[1] + circle_bbox[3]) / 2.0
-    radius = (circle_bbox[2] - circle_bbox[0]) / 2.0
-
-    clean_margin = 2
-    ix0 = max(0, x0 - clean_margin)
-    iy0 = max(0, y0 - clean_margin)
-    ix1 = min(W - 1, x0 + diam + clean_margin)
-    iy1 = min(H - 1, y0 + diam + clean_margin)
-
-    r2 = (radius - 0.5) ** 2
-
-    for y in range(iy0, iy1 + 1):
-        for x in range(ix0, ix1 + 1):
-            dx = (x + 0.5) - cx
-            dy = (y + 0.5) - cy
-            if dx * dx + dy * dy > r2:
-                pixels[x, y] = (bg_r, bg_g, bg_b)
+@lru_cache(maxsize=ASSET_CACHE_SIZE)
+def get_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
 
 
+@lru_cache(maxsize=8)
 def load_fonts(base: float):
-    styled_path = os.path.join(FONT_DIR, "Grandstander-Bold.ttf")
+    styled_path = os.path.join(FONT_DIR, STYLED_FONT_FILE)
     emoji_path = os.path.join(FONT_DIR, EMOJI_FONT_FILE)
 
     title_size = int(base * 2.4)
@@ -126,41 +168,78 @@ def load_fonts(base: float):
     info_size = int(base * 0.8)
     emoji_size = info_size
 
-    title_font = ImageFont.truetype(styled_path, title_size)
-    user_font = ImageFont.truetype(styled_path, user_size)
-    meta_font = ImageFont.truetype(styled_path, meta_size)
-    info_font = ImageFont.truetype(styled_path, info_size)
+    sizes = (title_size, user_size, meta_size, info_size)
+    try:
+        title_font, user_font, meta_font, info_font = (
+            get_font(styled_path, size) for size in sizes
+        )
+    except OSError:
+        # Bundled font missing: fall back to Pillow's built-in scalable font.
+        title_font, user_font, meta_font, info_font = (
+            ImageFont.load_default(size) for size in sizes
+        )
 
     try:
-        emoji_font = ImageFont.truetype(emoji_path, emoji_size)
+        emoji_font = get_font(emoji_path, emoji_size)
     except OSError:
         emoji_font = info_font
 
     return title_font, user_font, meta_font, info_font, emoji_font
 
 
+@lru_cache(maxsize=ASSET_CACHE_SIZE)
+def reaction_icon(reaction: str, size: int) -> Image.Image | None:
+    """
+    Decoded RGBA reaction icon thumbnailed to fit size x size, or None when
+    the reaction has no icon on disk. Shared between renders; read-only.
+    """
+    icon_path = abs_static(REACTION_ICON_MAP.get(reaction, ""))
+    if not icon_path:
+        return None
+    try:
+        with Image.open(icon_path) as src:
+            icon = src.convert("RGBA")
+    except OSError:
+        return None
+    icon.thumbnail((size, size), RESAMPLING)
+    return icon
+
+
+def report_avatar_diameter(base: float) -> int:
+    return int(base * 2.2) * 2
+
+
+def warm_asset_cache() -> None:
+    """
+    Pre-load the fonts, reaction icons and avatar masks used by reports at
+    every REPORT_SCALES size so the first render in a fresh worker does no
+    extra file I/O.
+    """
+    for scale in REPORT_SCALES:
+        base = REPORT_SIZE[0] * scale / 30
+        try:
+            fonts = load_fonts(base)
+        except OSError:
+            return
+        emoji_font = fonts[4]
+        for reaction in REACTION_ICON_MAP:
+            reaction_icon(reaction, int(emoji_font.size * 1.25))
+        circle_mask(report_avatar_diameter(base))
+
+
 def draw_reaction(image: Image.Image,
                   center_x: int,
                   y: int,
                   reaction: str,
                   emoji_font: ImageFont.FreeTypeFont,
                   info_font: ImageFont.FreeTypeFont) -> None:
-    icon_rel = REACTION_ICON_MAP.get(reaction)
-    if icon_rel:
-        icon_path = abs_static(icon_rel)
-        if icon_path and os.path.exists(icon_path):
-            try:
-                icon = Image.open(icon_path).convert("RGBA")
-                size = int(emoji_font.size * 1.25)
-                icon.thumbnail((size, size), RESAMPLING)
-
-                x_left = int(center_x - size // 2)
-
-                y_top = int(y - size * 0.20)
-                image.paste(icon, (x_left, y_top), icon)
-                return
-            except OSError:
-                pass
+    size = int(emoji_font.size * 1.25)
+    icon = reaction_icon(reaction, size)
+    if icon is not None:
+        x_left = int(center_x - size // 2)
+        y_top = int(y - size * 0.20)
+        image.paste(icon, (x_left, y_top), icon)
+        return
 
     reaction_map = {
         "love": "❤️",
@@ -178,9 +257,167 @@ def draw_reaction(image: Image.Image,
                   font=emoji_font)
 
 
-def generate_report_image(baby: Baby, report_date: Date) -> bytes:
-    W, H = 1200, 1552
+def load_report_range_data(baby: Baby, start: Date, end: Date) -> dict[Date, dict]:
+    """
+    Report data (see load_report_data) for every day from start to end
+    inclusive, keyed by date. Two queries for the whole range: one for the
+    entries and one grouped query for first-time foods.
+    """
+    days: dict[Date, dict] = {}
+    for offset in range((end - start).days + 1):
+        days[start + timedelta(days=offset)] = {"entries": [], "milestones": []}
+
+    entries = (
+        FoodEntry.objects
+        .filter(baby=baby, date__range=(start, end))
+        .select_related("food")
+        .order_by("date", "id")
+    )
+    food_ids = set()
+    for entry in entries:
+        days[entry.date]["entries"].append(entry)
+        food_ids.add(entry.food_id)
+
+    # A food is a milestone on the day of the baby's earliest entry for it.
+    if food_ids:
+        first_tries = (
+            FoodEntry.objects
+            .filter(baby=baby, food_id__in=food_ids, date__lte=end)
+            .values("food_id", "food__name")
+            .annotate(first_date=Min("date"))
+            .filter(first_date__gte=start)
+            .values_list("first_date", "food__name")
+        )
+        for first_date, name in first_tries:
+            days[first_date]["milestones"].append(name)
+
+    for data in days.values():
+        data["milestones"] = sorted(set(data["milestones"]))
+
+    return days
+
+
+def load_report_data(baby: Baby, report_date: Date) -> dict:
+    """
+    Everything generate_report_image draws that comes from the database:
+    the day's entries (oldest first) and the sorted names of foods tried
+    for the first time on that day. Always two queries, however busy the day.
+    """
+    return load_report_range_data(baby, report_date, report_date)[report_date]
+
+
+def feeding_totals(entries) -> list[str]:
+    """
+    "Total feeding" lines, one per food in name order. A food whose portions
+    all convert to grams gets a single gram total (with the logged amounts
+    alongside when they were not all grams); otherwise its amounts are
+    summed per unit as logged.
+    """
+    names = [getattr(entry.food, "name", str(entry.food)) for entry in entries]
+    units = [entry.portion_unit or "" for entry in entries]
+    sizes = [entry.portion_size or 0.0 for entry in entries]
+    grams = to_grams(names, sizes, units)
+
+    per_food: dict[str, dict[str, float]] = {}
+    grams_per_food: dict[str, float] = {}
+    for name, unit, size, g in zip(names, units, sizes, grams):
+        amounts = per_food.setdefault(name, {})
+        amounts[unit] = amounts.get(unit, 0.0) + size
+        grams_per_food[name] = grams_per_food.get(name, 0.0) + g
+
+    lines = []
+    for name, amounts in sorted(per_food.items()):
+        logged = [f"{amt:g} {unit}".strip() for unit, amt in sorted(amounts.items())]
+        total = grams_per_food[name]
+        if math.isnan(total):
+            lines.extend(f"{amount} {name}" for amount in logged)
+        elif set(amounts) == {"g"}:
+            lines.append(f"{total:g} g {name}")
+        else:
+            lines.append(f"{total:.0f} g {name} ({' + '.join(logged)})")
+    return lines
+
+
+def report_fingerprint(baby: Baby,
+                       report_date: Date,
+                       data: dict,
+                       scale: float = 1.0,
+                       fmt: str = "png",
+                       quality: int | None = None) -> str:
+    """
+    Content hash of every input that affects the rendered report: the baby's
+    name and avatar, the date, the day's entries and milestones, the output
+    scale/format/quality, REPORT_RENDER_VERSION and the portion conversion
+    tables behind the feeding totals. Two requests with the
+    same fingerprint produce byte-identical images, so it doubles as a
+    strong ETag.
+    """
+    avatar_name = baby.image.name if baby.image else ""
+    parts = [
+        f"v{REPORT_RENDER_VERSION}",
+        PORTION_TABLE_VERSION,
+        str(baby.pk),
+        baby.name,
+        avatar_name,
+        baby.stock_avatar,
+        baby.updated_at.isoformat() if baby.updated_at else "",
+        report_date.isoformat(),
+        f"{scale:g}|{fmt}|{quality or ''}",
+    ]
+    for entry in data["entries"]:
+        parts.append(
+            f"{entry.pk}|{entry.food.name}|{entry.portion_size!r}|"
+            f"{entry.portion_unit}|{entry.reaction}"
+        )
+    parts.extend(data["milestones"])
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def encode_report_image(image: Image.Image, fmt: str = "png", quality: int | None = None) -> bytes:
+    """
+    Encode a rendered report. WebP and JPEG use their quality setting (or the
+    REPORT_FORMATS default); PNG ignores it.
+    """
+    encoder, _, default_quality = REPORT_FORMATS[fmt]
+    # PNG keeps Pillow's default zlib level: optimize=True saves only a few
+    # percent on these mostly-white pages for roughly triple the encode time.
+    options: dict = {}
+    if encoder == "WEBP":
+        options["quality"] = quality or default_quality
+        options["method"] = 4
+    elif encoder == "JPEG":
+        options["quality"] = quality or default_quality
+        options["optimize"] = True
+        options["progressive"] = True
+
+    buf = BytesIO()
+    image.save(buf, format=encoder, **options)
+    return buf.getvalue()
+
+
+def generate_report_image(baby: Baby,
+                          report_date: Date,
+                          data: dict | None = None,
+                          scale: float = 1.0,
+                          fmt: str = "png",
+                          quality: int | None = None) -> bytes:
+    """
+    Render the daily report directly at REPORT_SIZE * scale (every size in
+    the layout is derived from the canvas width) and encode it as fmt.
+    """
+    if data is None:
+        data = load_report_data(baby, report_date)
+    entries = data["entries"]
+    milestones = data["milestones"]
+
+    W, H = int(REPORT_SIZE[0] * scale), int(REPORT_SIZE[1] * scale)
     base = W / 30
+    rule_width = max(1, round(2 * scale))
 
     pad = int(base * 2.0)
     line_gap = int(base * 1.3)
@@ -206,7 +443,7 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
     date_y = pad + t_h + int(base * 0.5)
     draw.text(((W - d_w) / 2, date_y), date_str, fill=color, font=meta_font)
 
-    circle_radius = int(base * 2.2)
+    circle_radius = report_avatar_diameter(base) // 2
     cx = W / 2
     cy = date_y + d_h + int(base * 2.5)
     circle_bbox = [cx - circle_radius, cy - circle_radius,
@@ -216,7 +453,7 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
     if avatar_path:
         paste_circular_photo(image, circle_bbox, avatar_path)
 
-    draw.ellipse(circle_bbox, outline=color, width=4)
+    draw.ellipse(circle_bbox, outline=color, width=rule_width * 2)
 
     baby_line = baby.name
     b_x0, b_y0, b_x1, b_y1 = draw.textbbox((0, 0), baby_line, font=user_font)
@@ -228,13 +465,6 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
     left_x = pad + int(base * 0.5)
     right_x = W - pad - int(base * 4.5)
 
-    day_entries = (
-        FoodEntry.objects
-        .filter(baby=baby, date=report_date)
-        .select_related("food")
-        .order_by("id")
-    )
-
     feeding_heading = "Daily Feeding"
     f_x0, f_y0, f_x1, f_y1 = draw.textbbox((0, 0), feeding_heading, font=meta_font)
     f_w = f_x1 - f_x0
@@ -243,7 +473,7 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
         (left_x, current_y + (f_y1 - f_y0) + underline_gap,
          left_x + f_w, current_y + (f_y1 - f_y0) + underline_gap),
         fill=color,
-        width=2,
+        width=rule_width,
     )
 
     reactions_heading = "Reactions"
@@ -254,15 +484,15 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
         (right_x, current_y + (r_y1 - r_y0) + underline_gap,
          right_x + r_w, current_y + (r_y1 - r_y0) + underline_gap),
         fill=color,
-        width=2,
+        width=rule_width,
     )
 
     reactions_center_x = right_x + (r_w // 2)
 
     current_y += (f_y1 - f_y0) + underline_gap + section_gap
 
-    if day_entries.exists():
-        for entry in day_entries:
+    if entries:
+        for entry in entries:
             food_name = getattr(entry.food, "name", str(entry.food))
             amt = entry.portion_size
             unit = entry.portion_unit or ""
@@ -295,20 +525,12 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
         (left_x, current_y + (t2_y1 - t2_y0) + underline_gap,
          left_x + t2_w, current_y + (t2_y1 - t2_y0) + underline_gap),
         fill=color,
-        width=2,
+        width=rule_width,
     )
     current_y += (t2_y1 - t2_y0) + underline_gap + section_gap
 
-    if day_entries.exists():
-        totals: dict[tuple[str, str], float] = {}
-        for entry in day_entries:
-            name = getattr(entry.food, "name", str(entry.food))
-            unit = entry.portion_unit or ""
-            key = (name, unit)
-            totals[key] = totals.get(key, 0.0) + (entry.portion_size or 0.0)
-
-        for (name, unit), amt in sorted(totals.items()):
-            line = f"{amt:g} {unit} {name}".strip()
+    if entries:
+        for line in feeding_totals(entries):
             draw.text((left_x, current_y), line, fill=color, font=info_font)
             current_y += line_gap
     else:
@@ -327,22 +549,12 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
         (left_x, current_y + (m_y1 - m_y0) + underline_gap,
          left_x + m_w, current_y + (m_y1 - m_y0) + underline_gap),
         fill=color,
-        width=2,
+        width=rule_width,
     )
     current_y += (m_y1 - m_y0) + underline_gap + section_gap
 
-    milestone_foods = set()
-    for entry in day_entries:
-        prior = FoodEntry.objects.filter(
-            baby=baby,
-            food=entry.food,
-            date__lt=report_date,
-        ).exists()
-        if not prior:
-            milestone_foods.add(entry.food.name)
-
-    if milestone_foods:
-        for name in sorted(milestone_foods):
+    if milestones:
+        for name in milestones:
             draw.text((left_x, current_y),
                       f"• First time trying {name}!",
                       fill=color, font=info_font)
@@ -353,6 +565,138 @@ def generate_report_image(baby: Baby, report_date: Date) -> bytes:
                   fill=color, font=info_font)
         current_y += line_gap
 
+    return encode_report_image(image, fmt, quality)
+
+
+# -----------------------------
+# Multi-day exports
+# -----------------------------
+MAX_REPORT_RANGE_DAYS = 31
+
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor | None:
+    """
+    Shared process pool for rendering report pages, created on first use.
+    Returns None when REPORT_RENDER_WORKERS is 1 or less (render inline).
+
+    Workers are spawned, not forked: the pool is created lazily from a
+    request thread, and forking a threaded process can copy locks held by
+    other threads (database, logging) into the child.
+    """
+    global _render_pool
+
+    workers = getattr(settings, "REPORT_RENDER_WORKERS", 1)
+    if workers <= 1:
+        return None
+
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                # Spawned workers start bare; this module (and its models)
+                # can only be imported once Django is set up.
+                initializer=django.setup,
+            )
+        return _render_pool
+
+
+def _reset_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+def iter_report_range(baby: Baby, start: Date, end: Date) -> Iterator[tuple[Date, bytes]]:
+    """
+    (day, PNG bytes) for each day from start to end inclusive, in date
+    order, yielded as each page is ready.
+
+    Data for the whole range is loaded and the pages missing from
+    report_cache are submitted to the render pool before this returns, so
+    the database is not touched while the pages are consumed. Without a
+    pool (or with only one page to draw) pages render inline as they are
+    reached.
+    """
+    days = load_report_range_data(baby, start, end)
+    keys = {day: f'"{report_fingerprint(baby, day, data)}"' for day, data in days.items()}
+    cached = {day: report_cache.get(key) for day, key in keys.items()}
+    missing = [day for day, png_bytes in cached.items() if png_bytes is None]
+
+    futures = {}
+    pool = get_render_pool() if len(missing) > 1 else None
+    if pool is not None:
+        try:
+            futures = {day: pool.submit(generate_report_image, baby, day, days[day]) for day in missing}
+        except BrokenProcessPool:
+            _reset_render_pool()
+            futures = {}
+    return _collect_report_pages(baby, days, keys, cached, futures)
+
+
+def _collect_report_pages(baby, days, keys, cached, futures) -> Iterator[tuple[Date, bytes]]:
+    for day, data in days.items():
+        png_bytes = cached[day]
+        if png_bytes is None:
+            future = futures.get(day)
+            if future is not None:
+                try:
+                    png_bytes = future.result()
+                except BrokenProcessPool:
+                    _reset_render_pool()
+                    futures = {}
+            if png_bytes is None:
+                png_bytes = generate_report_image(baby, day, data)
+            report_cache.set(keys[day], png_bytes)
+        yield day, png_bytes
+
+
+def render_report_range(baby: Baby, start: Date, end: Date) -> list[tuple[Date, bytes]]:
+    """iter_report_range, all pages at once (the PDF needs every page)."""
+    return list(iter_report_range(baby, start, end))
+
+
+def report_pages_to_pdf(pages: list[tuple[Date, bytes]]) -> bytes:
+    images = [Image.open(BytesIO(png_bytes)).convert("RGB") for _, png_bytes in pages]
     buf = BytesIO()
-    image.save(buf, format="PNG")
+    images[0].save(buf, format="PDF", save_all=True,
+                   append_images=images[1:], resolution=150)
     return buf.getvalue()
+
+
+class _ChunkBuffer:
+    """Write-only file object that hands its contents to a generator."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_report_pages_zip(pages: Iterable[tuple[Date, bytes]], prefix: str) -> Iterator[bytes]:
+    """
+    Stream the pages as a ZIP archive, one PNG per day. Give it
+    iter_report_range() so each page is sent as soon as it is rendered.
+    """
+    buf = _ChunkBuffer()
+    # PNGs are already deflated, so storing them is as small and much cheaper.
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for day, png_bytes in pages:
+            archive.writestr(f"{prefix}_{day.isoformat()}.png", png_bytes)
+            yield buf.drain()
+    yield buf.drain()
@@ -0,0 +1,261 @@
+"""
+Name search for CatalogFood and FoodItem.
+
+Every backend matches the same way: each term of the query (lower-cased,
+with a trailing plural "s" dropped) must occur somewhere in the name, so
+"nan" finds "Banana" and "bananas" finds it too. They differ only in how
+that is indexed and ranked. SQLite uses an FTS5 trigram index ranked by
+bm25; terms shorter than three characters cannot use trigrams and fall
+back to LIKE. PostgreSQL uses a pg_trgm index for ILIKE, ranked by
+ts_rank plus word similarity. Anything else scans with icontains and
+ranks prefix matches first. Set SEARCH_BACKEND to a dotted class path to
+choose one explicitly.
+
+ranked() annotates `search_rank` (lower is better) so results can be
+keyset paginated on RANKED_ORDERING.
+
+The index structures live outside the model migrations because they are
+vendor specific. They are created (and repaired after SQLite table
+rebuilds) on post_migrate, and `manage.py rebuild_search_index` refills
+them.
+"""
+import logging
+import re
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import BooleanField, Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODELS = ("core.CatalogFood", "core.FoodItem")
+SEARCH_FIELD = "name"
+RANKED_ORDERING = ("search_rank", SEARCH_FIELD, "id")
+
+_TERM_RE = re.compile(r"[^\W_]+")
+
+
+def _fold(term: str) -> str:
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def search_terms(query: str) -> list[str]:
+    return [_fold(t) for t in _TERM_RE.findall((query or "").casefold())]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchBackend:
+    """Unindexed fallback: substring scan, prefix matches first."""
+
+    def install(self, connection, rebuild: bool = False) -> None:
+        pass
+
+    def matching(self, model, query: str) -> Q:
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(**{f"{SEARCH_FIELD}__icontains": term})
+        return condition
+
+    def filter(self, queryset, query: str):
+        """queryset restricted to rows matching query; order untouched."""
+        if not search_terms(query):
+            return queryset
+        return queryset.filter(self.matching(queryset.model, query))
+
+    def rank(self, model, query: str):
+        terms = search_terms(query)
+        return Case(
+            When(**{f"{SEARCH_FIELD}__istartswith": terms[0]}, then=Value(0.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+
+    def ranked(self, queryset, query: str):
+        """Matching rows annotated with search_rank, best match first."""
+        if not search_terms(query):
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).order_by(*RANKED_ORDERING)
+        return (
+            self.filter(queryset, query)
+            .annotate(search_rank=self.rank(queryset.model, query))
+            .order_by(*RANKED_ORDERING)
+        )
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """FTS5 trigram external-content tables kept in sync by triggers."""
+
+    TOKENIZER = "trigram"
+
+    @staticmethod
+    def index_table(model) -> str:
+        return f"{model._meta.db_table}_fts"
+
+    @staticmethod
+    def indexed_terms(query: str) -> list[str]:
+        return [term for term in search_terms(query) if len(term) >= 3]
+
+    @classmethod
+    def match_expression(cls, query: str) -> str:
+        # Quoted terms are ANDed; each matches as a substring.
+        return " ".join(f'"{term}"' for term in cls.indexed_terms(query))
+
+    def install(self, connection, rebuild: bool = False) -> None:
+        with connection.cursor() as cursor:
+            existing = dict(cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'trigger')"
+            ).fetchall())
+            for label in SEARCH_MODELS:
+                model = apps.get_model(label)
+                table = model._meta.db_table
+                if table not in existing:
+                    continue
+
+                fts = self.index_table(model)
+                triggers = {f"{fts}_ai", f"{fts}_ad", f"{fts}_au"}
+                if fts in existing and self.TOKENIZER not in (existing[fts] or ""):
+                    # Built with an older tokenizer: start over.
+                    for name in (*triggers, fts):
+                        kind = "TABLE" if name == fts else "TRIGGER"
+                        cursor.execute(f'DROP {kind} IF EXISTS "{name}"')
+                        existing.pop(name, None)
+                needs_rebuild = rebuild or fts not in existing or not triggers <= existing.keys()
+
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5('
+                    f'{SEARCH_FIELD}, content="{table}", content_rowid="id", '
+                    f"tokenize='{self.TOKENIZER}')"
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN '
+                    f'INSERT INTO "{fts}"(rowid, {SEARCH_FIELD}) VALUES (new.id, new.{SEARCH_FIELD}); END'
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN '
+                    f'INSERT INTO "{fts}"("{fts}", rowid, {SEARCH_FIELD}) '
+                    f"VALUES ('delete', old.id, old.{SEARCH_FIELD}); END"
+                )
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF {SEARCH_FIELD} ON "{table}" BEGIN '
+                    f'INSERT INTO "{fts}"("{fts}", rowid, {SEARCH_FIELD}) '
+                    f"VALUES ('delete', old.id, old.{SEARCH_FIELD}); "
+                    f'INSERT INTO "{fts}"(rowid, {SEARCH_FIELD}) VALUES (new.id, new.{SEARCH_FIELD}); END'
+                )
+                # Rows written while the triggers were missing (e.g. a
+                # migration rebuilt the table) are only picked up by a rebuild.
+                if needs_rebuild:
+                    cursor.execute(f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')')
+
+    def matching(self, model, query: str) -> Q:
+        condition = Q()
+        if self.indexed_terms(query):
+            fts = self.index_table(model)
+            condition &= Q(pk__in=RawSQL(
+                f'SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s',
+                [self.match_expression(query)],
+            ))
+        # Too short for a trigram; LIKE over the (already narrowed) rows.
+        for term in search_terms(query):
+            if len(term) < 3:
+                condition &= Q(**{f"{SEARCH_FIELD}__icontains": term})
+        return condition
+
+    def ranked(self, queryset, query: str):
+        if not self.indexed_terms(query):
+            return super().ranked(queryset, query)
+        # Join the index (FoodItemNameIndex / CatalogFoodNameIndex) so one
+        # MATCH both finds the rows and gives their bm25 rank.
+        short = Q()
+        for term in search_terms(query):
+            if len(term) < 3:
+                short &= Q(**{f"{SEARCH_FIELD}__icontains": term})
+        return (
+            queryset
+            .filter(short, search_index__name__match=self.match_expression(query))
+            .annotate(search_rank=F("search_index__rank"))
+            .order_by(*RANKED_ORDERING)
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """pg_trgm GIN index for the substring match; ts_rank + similarity to rank."""
+
+    @staticmethod
+    def tsquery(query: str) -> str:
+        return " | ".join(f"{term}:*" for term in search_terms(query))
+
+    @staticmethod
+    def _vector(model) -> str:
+        return f"to_tsvector('english', COALESCE(\"{model._meta.db_table}\".\"{SEARCH_FIELD}\", ''))"
+
+    def install(self, connection, rebuild: bool = False) -> None:
+        # GIN indexes stay current by themselves; rebuild has nothing to do.
+        with connection.cursor() as cursor:
+            try:
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except DatabaseError:
+                logger.warning("pg_trgm is unavailable; name search will not be indexed.")
+                return
+
+            for label in SEARCH_MODELS:
+                table = apps.get_model(label)._meta.db_table
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{table}_{SEARCH_FIELD}_trgm" ON "{table}" '
+                    f'USING gin ("{SEARCH_FIELD}" gin_trgm_ops)'
+                )
+
+    def matching(self, model, query: str) -> Q:
+        # ILIKE on the bare column so the trigram index applies; Django's
+        # icontains wraps it in UPPER(::text), which the index doesn't cover.
+        column = f'"{model._meta.db_table}"."{SEARCH_FIELD}"'
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(RawSQL(
+                f"{column} ILIKE %s", [f"%{_escape_like(term)}%"], output_field=BooleanField(),
+            ))
+        return condition
+
+    def rank(self, model, query: str):
+        column = f'"{model._meta.db_table}"."{SEARCH_FIELD}"'
+        return RawSQL(
+            f"-(ts_rank({self._vector(model)}, to_tsquery('english', %s)) "
+            f"+ word_similarity(%s, {column}))",
+            [self.tsquery(query), query.strip()],
+            output_field=FloatField(),
+        )
+
+
+def _sqlite_has_fts5(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(option == "ENABLE_FTS5" for (option,) in cursor.fetchall())
+
+
+@lru_cache(maxsize=None)
+def get_search_backend(alias: str = "default") -> SearchBackend:
+    path = getattr(settings, "SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+
+    connection = connections[alias]
+    # The trigram tokenizer arrived in SQLite 3.34.
+    if (connection.vendor == "sqlite" and connection.Database.sqlite_version_info >= (3, 34)
+            and _sqlite_has_fts5(connection)):
+        return SQLiteFTS5Backend()
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SearchBackend()
+
+
+def install_search_index(sender=None, using="default", **kwargs) -> None:
+    """post_migrate receiver (see CoreConfig.ready)."""
+    get_search_backend(using).install(connections[using])
@@ -0,0 +1,77 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .categories import category_registry
+from .models import Baby, FoodCategory, FoodEntry, FoodItem, Tombstone
+from .nutrition import refresh_daily_summary
+from .profiles import invalidate_profiles
+from .sync import record_tombstone, stamp_on_commit
+
+
+@receiver(post_save, sender=Baby)
+@receiver(post_delete, sender=Baby)
+def baby_changed(sender, instance, **kwargs):
+    invalidate_profiles(instance.owner_id)
+
+
+@receiver(post_save, sender=Baby)
+@receiver(post_save, sender=FoodEntry)
+@receiver(post_save, sender=FoodItem)
+def stamp_sync_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stamp_on_commit(sender, [instance.pk])
+
+
+@receiver(post_save, sender=FoodCategory)
+@receiver(post_delete, sender=FoodCategory)
+def category_changed(sender, **kwargs):
+    category_registry.clear()
+
+
+
+@receiver(pre_save, sender=FoodEntry)
+def remember_entry_day(sender, instance, **kwargs):
+    # An edit can move the entry to another day or baby; that day needs a refresh too.
+    instance._previous_day = None
+    if instance.pk:
+        instance._previous_day = (
+            FoodEntry.objects.filter(pk=instance.pk).values_list("baby_id", "date").first()
+        )
+
+
+@receiver(post_save, sender=FoodEntry)
+def entry_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    day = (instance.baby_id, instance.date)
+    refresh_daily_summary(*day)
+    previous = getattr(instance, "_previous_day", None)
+    if previous and previous != day:
+        refresh_daily_summary(*previous)
+    if previous and previous[0] != instance.baby_id:
+        # Moved to another baby: to syncs of the old one it is gone. Written
+        # once the save has gone through, so a failed save leaves none.
+        record_tombstone(kind=Tombstone.KIND_ENTRY, object_id=str(instance.pk), baby_id=previous[0])
+
+
+@receiver(post_delete, sender=FoodEntry)
+def entry_deleted(sender, instance, **kwargs):
+    refresh_daily_summary(instance.baby_id, instance.date)
+
+
+@receiver(post_delete, sender=Baby)
+def baby_deleted(sender, instance, **kwargs):
+    record_tombstone(kind=Tombstone.KIND_BABY, object_id=str(instance.pk), owner_id=instance.owner_id)
+
+
+@receiver(post_delete, sender=FoodEntry)
+def entry_tombstone(sender, instance, origin=None, **kwargs):
+    # A deleted baby's tombstone already covers its entries.
+    if isinstance(origin, Baby):
+        return
+    record_tombstone(kind=Tombstone.KIND_ENTRY, object_id=str(instance.pk), baby_id=instance.baby_id)
+
+
+@receiver(post_delete, sender=FoodItem)
+def food_deleted(sender, instance, **kwargs):
+    record_tombstone(kind=Tombstone.KIND_FOOD, object_id=str(instance.pk))
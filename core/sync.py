@@ -0,0 +1,186 @@
+"""
+Delta sync: what changed for a user since a sync token, a page at a time.
+
+Changes are found through updated_at (Baby, FoodEntry, FoodItem) and
+deletions through Tombstone rows.
+
+Commit-time stamps. auto_now stamps a row when it is saved, which can be
+long before its transaction commits, and a sync running in between would
+skip it for good. So every change made inside a transaction is stamped
+again right after the commit (stamp_on_commit). updated_at and deleted_at
+then trail the commit by microseconds, and SYNC_OVERLAP only has to cover
+that gap and clock jitter between workers.
+
+Cycles and pages. A sync cycle covers (since - SYNC_OVERLAP, until]: until
+is fixed when the cycle's first page is served, and later pages keep it,
+so the cycle is a consistent window however long the client takes. Pages
+walk the phases in PHASES order (deletions first, so a client that
+applies each page in order never drops a row it was just sent), keyset by
+(timestamp, id) within a phase. The token handed out with the last page
+starts the next cycle at since = until. Clients upsert by id, so rows
+seen twice across the overlap are harmless. Tokens whose cycle started
+more than SYNC_TOMBSTONE_DAYS ago get SyncTokenExpired, because the
+tombstones they need may have been pruned.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Baby, FoodEntry, FoodItem, Tombstone
+from .pagination import decode_cursor, encode_cursor, keyset_filter
+
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+SYNC_PAGE_SIZE = 500
+
+PHASES = ("deleted", "babies", "entries", "foods")
+TOMBSTONE_KEYS = {
+    Tombstone.KIND_BABY: "babies",
+    Tombstone.KIND_ENTRY: "entries",
+    Tombstone.KIND_FOOD: "foods",
+}
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def tombstone_retention() -> datetime.timedelta:
+    return datetime.timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", 90))
+
+
+def stamp_on_commit(model, pks, field: str = "updated_at") -> None:
+    """
+    Re-stamp `field` of these rows with the time their transaction
+    committed (see the module docstring). Outside a transaction the save
+    itself was the commit and the stamp is already right.
+    """
+    pks = list(pks)
+    if not pks or not connection.in_atomic_block:
+        return
+    transaction.on_commit(
+        lambda: model.objects.filter(pk__in=pks).update(**{field: timezone.now()})
+    )
+
+
+def record_tombstone(**fields) -> Tombstone:
+    tombstone = Tombstone.objects.create(**fields)
+    stamp_on_commit(Tombstone, [tombstone.pk], field="deleted_at")
+    return tombstone
+
+
+def _dt(value: str) -> datetime.datetime | None:
+    if not value:
+        return None
+    at = datetime.datetime.fromisoformat(value)
+    if timezone.is_naive(at):
+        raise ValueError("invalid sync token")
+    return at
+
+
+def encode_sync_token(since, until, phase: int = 0, after=None) -> str:
+    after_at, after_id = after or ("", "")
+    return encode_cursor([
+        since.isoformat() if since else "",
+        until.isoformat() if until else "",
+        phase,
+        after_at.isoformat() if after_at else "",
+        str(after_id),
+    ])
+
+
+def decode_sync_token(token: str) -> dict:
+    """Raises ValueError for anything that is not a token we issued."""
+    since, until, phase, after_at, after_id = decode_cursor(token, (str, str, int, str, str))
+    if not 0 <= phase < len(PHASES):
+        raise ValueError("invalid sync token")
+    after = (_dt(after_at), after_id) if after_at else None
+    return {"since": _dt(since), "until": _dt(until), "phase": phase, "after": after}
+
+
+def _phase_queryset(phase: str, user, baby_ids):
+    """(queryset, timestamp field) of one phase, before the time window."""
+    if phase == "deleted":
+        return Tombstone.objects.filter(
+            Q(kind=Tombstone.KIND_BABY, owner=user)
+            | Q(kind=Tombstone.KIND_ENTRY, baby_id__in=baby_ids)
+            | Q(kind=Tombstone.KIND_FOOD)
+        ), "deleted_at"
+    if phase == "babies":
+        return Baby.objects.filter(id__in=baby_ids).prefetch_related("allergies"), "updated_at"
+    if phase == "entries":
+        return FoodEntry.objects.filter(baby_id__in=baby_ids).select_related("food"), "updated_at"
+    return FoodItem.objects.all(), "updated_at"
+
+
+def sync_page(user, token: str | None = None, limit: int = SYNC_PAGE_SIZE) -> dict:
+    """
+    One page of the user's changes. Returns {"full", "deleted", "babies",
+    "entries", "foods", "has_more", "sync_token"}: deleted maps babies /
+    entries / foods to ids; the other three are lists of model instances
+    to upsert. With has_more, call again with sync_token
+    to continue this cycle; otherwise keep sync_token for the next one.
+    Raises ValueError for a bad token and SyncTokenExpired for an old one.
+    """
+    state = decode_sync_token(token) if token else {"since": None, "until": None, "phase": 0, "after": None}
+    now = timezone.now()
+    since = state["since"]
+    if since is not None and since < now - tombstone_retention():
+        raise SyncTokenExpired
+    # Never earlier than since, so tokens only move forward.
+    until = state["until"] or (max(now, since) if since else now)
+
+    baby_ids = list(Baby.objects.filter(owner=user).values_list("id", flat=True))
+    result = {
+        "full": since is None,
+        "deleted": {"babies": [], "entries": [], "foods": []},
+        "babies": [],
+        "entries": [],
+        "foods": [],
+        "has_more": False,
+    }
+
+    remaining = limit
+    phase, after = state["phase"], state["after"]
+    while phase < len(PHASES):
+        name = PHASES[phase]
+        if name == "deleted" and since is None:
+            phase, after = phase + 1, None
+            continue
+
+        qs, field = _phase_queryset(name, user, baby_ids)
+        qs = qs.filter(**{f"{field}__lte": until})
+        if since is not None:
+            qs = qs.filter(**{f"{field}__gt": since - SYNC_OVERLAP})
+        ordering = (field, "pk")
+        if after is not None:
+            qs = qs.filter(keyset_filter(ordering, after))
+        rows = list(qs.order_by(*ordering)[:remaining + 1])
+
+        more = len(rows) > remaining
+        rows = rows[:remaining]
+        if name == "deleted":
+            for tombstone in rows:
+                key = TOMBSTONE_KEYS[tombstone.kind]
+                result["deleted"][key].append(
+                    tombstone.object_id if key == "babies" else int(tombstone.object_id)
+                )
+        else:
+            result[name] = rows
+        remaining -= len(rows)
+
+        if more or (remaining == 0 and phase + 1 < len(PHASES)):
+            if more:
+                last = rows[-1]
+                next_after = (getattr(last, field), last.pk)
+            else:
+                phase, next_after = phase + 1, None
+            result["has_more"] = True
+            result["sync_token"] = encode_sync_token(since, until, phase, next_after)
+            return result
+        phase, after = phase + 1, None
+
+    result["sync_token"] = encode_sync_token(until, None)
+    return result
@@ -1,3 +1,1337 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import math
+import shutil
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .allergens import AhoCorasick, AllergenIndex, get_allergen_index, get_allergen_scanner, tokenize
+from .avatars import AVATAR_DERIVATIVES, delete_avatar_derivatives, refresh_avatar_derivatives
+from .categories import DEFAULT_CATEGORY, category_registry, classify, classify_fdc, classify_many
+from .fdc_import import upsert_catalog_foods
+from .models import (
+    Allergy, Baby, CatalogFood, DailyNutritionSummary, FoodCategory, FoodEntry, FoodItem, ReportJob, Tombstone,
+    get_or_create_food_item,
+)
+from .nutrition import rebuild_summaries
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .portions import grams_per_unit, to_grams
+from .profiles import get_active_profile, get_profiles
+from .report_jobs import claim_job, enqueue_report, expire_stale_jobs, run_report_job
+from .reports import REPORT_SIZE, iter_report_pages_zip, iter_report_range, load_report_data, report_fingerprint
+from .search import SearchBackend, SQLiteFTS5Backend, get_search_backend, install_search_index, search_terms
+from .sync import encode_sync_token, sync_page
+from .usda import FakeFoodDataServer, FoodDataClient, USDAError, get_usda_client
+
+
+class BabyBitesTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("parent", password="secret")
+        self.baby = Baby.objects.create(owner=self.user, name="Ada", date_of_birth=timezone.now())
+        self.client.force_login(self.user)
+
+
+class ReportImageTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.food = FoodItem.objects.create(name="Banana")
+        FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=40, portion_unit="g")
+        self.url = reverse("report_image") + f"?date={timezone.localdate().isoformat()}"
+
+    def test_fingerprint_tracks_data_and_variant(self):
+        today = timezone.localdate()
+        data = load_report_data(self.baby, today)
+        fingerprint = report_fingerprint(self.baby, today, data)
+
+        self.assertEqual(fingerprint, report_fingerprint(self.baby, today, load_report_data(self.baby, today)))
+        self.assertNotEqual(fingerprint, report_fingerprint(self.baby, today, data, fmt="webp"))
+        self.assertNotEqual(fingerprint, report_fingerprint(self.baby, today, data, scale=2))
+
+        FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=10, portion_unit="g")
+        self.assertNotEqual(fingerprint, report_fingerprint(self.baby, today, load_report_data(self.baby, today)))
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_new_entry_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=1, portion_unit="whole")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_repeat_request_is_served_from_the_cache(self):
+        first = self.client.get(self.url)
+        with mock.patch("core.views.generate_report_image") as render:
+            second = self.client.get(self.url)
+        render.assert_not_called()
+        self.assertEqual(second.content, first.content)
+
+
+class ReportVariantTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        FoodEntry.objects.create(baby=self.baby, food=FoodItem.objects.create(name="Pear"), portion_size=20)
+
+    def get(self, **params):
+        return self.client.get(reverse("report_image"), params)
+
+    def test_scale_and_format(self):
+        for params, content_type, encoder in [
+            ({}, "image/png", "PNG"),
+            ({"format": "webp", "scale": "0.5"}, "image/webp", "WEBP"),
+            ({"format": "jpg", "scale": "0.25", "quality": "60"}, "image/jpeg", "JPEG"),
+        ]:
+            with self.subTest(**params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], content_type)
+                image = Image.open(io.BytesIO(response.content))
+                scale = float(params.get("scale", 1))
+                self.assertEqual(image.format, encoder)
+                self.assertEqual(image.size, (round(REPORT_SIZE[0] * scale), round(REPORT_SIZE[1] * scale)))
+
+    def test_variants_have_their_own_etags(self):
+        etags = {self.get(**params)["ETag"] for params in (
+            {}, {"scale": "0.5"}, {"format": "webp"}, {"format": "webp", "quality": "50"},
+        )}
+        self.assertEqual(len(etags), 4)
+
+    def test_bad_variants_are_rejected(self):
+        for params in ({"scale": "3"}, {"scale": "x"}, {"format": "gif"}, {"format": "jpeg", "quality": "0"}):
+            with self.subTest(**params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+
+@override_settings(REPORT_RENDER_WORKERS=1)
+class ReportRangeExportTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        FoodEntry.objects.create(baby=self.baby, food=FoodItem.objects.create(name="Pear"), portion_size=20)
+        self.end = timezone.localdate()
+        self.start = self.end - datetime.timedelta(days=2)
+
+    def export(self, **params):
+        return self.client.get(reverse("report_image"), {
+            "start": self.start.isoformat(), "end": self.end.isoformat(), **params,
+        })
+
+    def test_pdf_has_a_page_per_day(self):
+        response = self.export(format="pdf")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response.content.startswith(b"%PDF"))
+        self.assertEqual(response.content.count(b"/Type /Page\n"), 3)
+
+    def test_zip_has_a_png_per_day(self):
+        response = self.export(format="zip")
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        days = [self.start + datetime.timedelta(days=i) for i in range(3)]
+        self.assertEqual(archive.namelist(), [f"daily_report_Ada_{day}.png" for day in days])
+        self.assertTrue(all(archive.read(name).startswith(b"\x89PNG") for name in archive.namelist()))
+
+    def test_zip_sends_pages_as_they_render(self):
+        with mock.patch("core.reports.generate_report_image", return_value=b"png") as render:
+            chunks = iter_report_pages_zip(iter_report_range(self.baby, self.start, self.end), "r")
+            next(chunks)
+            self.assertEqual(render.call_count, 1)
+            list(chunks)
+            self.assertEqual(render.call_count, 3)
+
+    def test_range_is_validated(self):
+        self.assertEqual(self.export(format="gif").status_code, 400)
+        self.start = self.end - datetime.timedelta(days=40)
+        self.assertEqual(self.export().status_code, 400)
+        self.start, self.end = self.end, self.start
+        self.assertEqual(self.export().status_code, 400)
+
+
+@override_settings(REPORT_JOB_THREADS=0, REPORT_RENDER_WORKERS=1)
+class ReportJobTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        FoodEntry.objects.create(baby=self.baby, food=FoodItem.objects.create(name="Pear"), portion_size=20)
+
+    def test_identical_content_reuses_the_job(self):
+        job = enqueue_report(self.baby, self.today)
+        self.assertEqual(job.status, ReportJob.STATUS_PENDING)
+        self.assertEqual(enqueue_report(self.baby, self.today).pk, job.pk)
+
+        FoodEntry.objects.create(baby=self.baby, food=FoodItem.objects.get(name="Pear"), portion_size=5)
+        self.assertNotEqual(enqueue_report(self.baby, self.today).pk, job.pk)
+
+    def test_job_is_claimed_once(self):
+        job = enqueue_report(self.baby, self.today)
+        self.assertTrue(claim_job(job.pk))
+        self.assertFalse(claim_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_RUNNING)
+        self.assertIsNotNone(job.started_at)
+
+    def test_stale_jobs_expire_and_are_not_reused(self):
+        job = enqueue_report(self.baby, self.today)
+        claim_job(job.pk)
+        ReportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - datetime.timedelta(hours=1))
+
+        self.assertEqual(expire_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+        self.assertNotEqual(enqueue_report(self.baby, self.today).pk, job.pk)
+
+    def test_endpoint_reports_status_then_serves_the_png(self):
+        job = enqueue_report(self.baby, self.today)
+        url = reverse("report_job", args=[job.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], ReportJob.STATUS_PENDING)
+
+        run_report_job(job.pk)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["ETag"], job.etag)
+
+    def test_endpoint_hides_other_users_jobs(self):
+        job = enqueue_report(self.baby, self.today)
+        self.client.force_login(User.objects.create_user("other"))
+        self.assertEqual(self.client.get(reverse("report_job", args=[job.pk])).status_code, 404)
+
+    @override_settings(REPORT_JOB_KEEP_HOURS=1)
+    def test_command_purges_by_the_setting(self):
+        old = ReportJob.objects.create(
+            baby=self.baby, report_date=self.today, status=ReportJob.STATUS_DONE,
+            finished_at=timezone.now() - datetime.timedelta(hours=2),
+        )
+        pending = enqueue_report(self.baby, self.today)
+
+        call_command("process_report_jobs", "--once", stdout=io.StringIO())
+        self.assertFalse(ReportJob.objects.filter(pk=old.pk).exists())
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, ReportJob.STATUS_DONE)
+
+
+class AvatarDerivativeTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, size=(800, 600), fmt="JPEG"):
+        buf = io.BytesIO()
+        Image.new("RGB", size, "orange").save(buf, format=fmt)
+        self.baby.image = SimpleUploadedFile("photo.jpg", buf.getvalue())
+        self.baby.save()
+
+    def test_builds_a_square_copy_per_kind(self):
+        self.upload()
+        refresh_avatar_derivatives(self.baby)
+        self.baby.refresh_from_db()
+
+        self.assertEqual(set(self.baby.avatar_derivatives), set(AVATAR_DERIVATIVES))
+        for kind, (size, fmt, _) in AVATAR_DERIVATIVES.items():
+            with default_storage.open(self.baby.avatar_derivatives[kind]) as fh, Image.open(fh) as image:
+                self.assertEqual((image.format, image.size), (fmt, (size, size)))
+
+    def test_small_photos_are_not_upscaled(self):
+        self.upload(size=(100, 80))
+        refresh_avatar_derivatives(self.baby)
+        with default_storage.open(self.baby.avatar_derivatives["list"]) as fh, Image.open(fh) as image:
+            self.assertEqual(image.size, (80, 80))
+
+    def test_urls_prefer_derivatives(self):
+        self.upload()
+        self.assertEqual(self.baby.avatar_nav_url, self.baby.image.url)
+
+        refresh_avatar_derivatives(self.baby)
+        self.assertEqual(self.baby.avatar_nav_url, default_storage.url(self.baby.avatar_derivatives["nav"]))
+        self.assertEqual(self.baby.avatar_list_url, default_storage.url(self.baby.avatar_derivatives["list"]))
+
+    def test_unreadable_upload_falls_back_to_the_original(self):
+        self.baby.image = SimpleUploadedFile("photo.jpg", b"not an image")
+        self.baby.save()
+        refresh_avatar_derivatives(self.baby)
+        self.assertEqual(self.baby.avatar_derivatives, {})
+        self.assertEqual(self.baby.avatar_list_url, self.baby.image.url)
+
+    def test_delete_removes_the_files(self):
+        self.upload()
+        refresh_avatar_derivatives(self.baby)
+        names = list(self.baby.avatar_derivatives.values())
+        delete_avatar_derivatives(self.baby)
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+
+class FoodItemNameTests(TestCase):
+    def test_get_or_create_ignores_case_and_spacing(self):
+        food, created = get_or_create_food_item("  Sweet   Potato ")
+        self.assertTrue(created)
+        self.assertEqual((food.name, food.normalized_name), ("Sweet Potato", "sweet potato"))
+        self.assertEqual(get_or_create_food_item("SWEET potato"), (food, False))
+
+    def test_losing_a_create_race_returns_the_winner(self):
+        winner = FoodItem.objects.create(name="Pear")
+        with mock.patch.object(FoodItem.objects, "get", side_effect=[FoodItem.DoesNotExist, winner]):
+            self.assertEqual(get_or_create_food_item("pear"), (winner, False))
+        self.assertEqual(FoodItem.objects.count(), 1)
+
+    def test_clean_rejects_a_duplicate_name(self):
+        FoodItem.objects.create(name="Pear")
+        with self.assertRaises(ValidationError):
+            FoodItem(name=" PEAR").full_clean()
+
+class AllergenIndexPayloadTests(TestCase):
+    def test_version_is_a_content_hash(self):
+        index = get_allergen_index()
+        self.assertRegex(index.version, r"^[0-9a-f]{16}$")
+        get_allergen_index.cache_clear()
+        self.assertEqual(get_allergen_index().version, index.version)
+
+    def test_payload_is_served_at_the_versioned_url(self):
+        index = get_allergen_index()
+        response = self.client.get(reverse("allergen_index", args=[index.version]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+        payload = response.json()
+        self.assertEqual(payload["version"], index.version)
+        self.assertEqual(payload["aliases"], {"dairy": "milk"})
+        self.assertEqual(payload["phrases"]["peanut butter"], ["Peanut"])
+        self.assertIn("Milk", payload["phrases"]["cheese"])
+
+    def test_stale_version_redirects(self):
+        response = self.client.get(reverse("allergen_index", args=["0123456789abcdef"]))
+        self.assertRedirects(
+            response, reverse("allergen_index", args=[get_allergen_index().version]),
+            fetch_redirect_response=False,
+        )
+
+    def test_phrases_are_tokenized_like_the_client(self):
+        self.assertEqual(tokenize("Scrambled EGGS (soft)"), ("scrambled", "egg", "soft"))
+        index = AllergenIndex({"SALMON (COOKED)": ["Fish"]}, "v")
+        self.assertIn(("salmon",), index.phrases)
+        self.assertIn(("salmon", "cooked"), index.phrases)
+
+
+class AllergenScannerTests(TestCase):
+    def test_automaton_finds_overlapping_phrases(self):
+        automaton = AhoCorasick()
+        automaton.add(("peanut", "butter"), ["Peanut"])
+        automaton.add(("butter",), ["Milk"])
+        automaton.add(("butter", "cookie"), ["Wheat"])
+        automaton.add(("almond",), ["Tree Nut"])
+        self.assertEqual(automaton.scan(tokenize("Peanut butter cookies")), {"Peanut", "Milk", "Wheat"})
+        self.assertEqual(automaton.scan(tokenize("peanut brittle")), set())
+        self.assertEqual(automaton.scan(tokenize("almond")), {"Tree Nut"})
+
+    def test_phrases_match_whole_words_in_order(self):
+        index = AllergenIndex({"PEANUT BUTTER": ["Peanut"], "HOT DOG": ["Pork"]}, "v")
+        self.assertEqual(index.match("Peanut butter toast"), ["Peanut"])
+        self.assertEqual(index.match("Hot dogs"), ["Pork"])
+        self.assertEqual(index.match("Dog treats, served hot"), [])
+        self.assertEqual(index.match("Codfish"), [])
+        self.assertEqual(index.match("Baked cod"), ["Fish"])
+
+    def test_warnings_use_the_babys_labels_and_aliases(self):
+        index = AllergenIndex({"YOGURT": ["Dairy"]}, "v")
+        self.assertEqual(index.warnings_for("Greek yogurt", ["Milk", "Peanut"]), ["Milk"])
+        self.assertEqual(index.warnings_for("Scrambled eggs", ["Egg"]), ["Egg"])
+
+    def test_scan_many_yields_only_hits(self):
+        index = AllergenIndex({}, "v")
+        rows = [(1, "Banana"), (2, "Tofu bites"), (3, "Pear")]
+        self.assertEqual(list(index.scan_many(rows)), [(2, ["Soy"])])
+
+    def test_scanner_follows_allergy_rows_without_signals(self):
+        self.assertEqual(get_allergen_scanner().match("Kiwi slices"), [])
+        # Written by another worker: no signal reaches this process.
+        Allergy.objects.bulk_create([Allergy(name="Kiwi")])
+        scanner = get_allergen_scanner()
+        self.assertEqual(scanner.match("Kiwi slices"), ["Kiwi"])
+        self.assertIs(get_allergen_scanner(), scanner)
+        self.assertNotEqual(scanner.version, get_allergen_index().version)
+
+
+class CategoryClassifierTests(TestCase):
+    def setUp(self):
+        category_registry.clear()
+        self.addCleanup(category_registry.clear)
+
+    def test_earlier_group_wins_wherever_it_occurs(self):
+        cases = {
+            "Carrot cake": "Vegetables",
+            "Banana bread": "Fruits",
+            "Cheese crackers": "Grains & Starches",
+            "Egg noodles": "Grains & Starches",
+            "Chicken and cheese": "Proteins",
+            "Butter milk": "Dairy",
+            "Olive oil": "Fats & Oils",
+            "Chocolate chip cookie": "Sweets & Processed Foods",
+        }
+        for description, expected in cases.items():
+            with self.subTest(description):
+                self.assertEqual(classify(None, description), expected)
+
+    def test_category_text_counts_and_case_is_ignored(self):
+        self.assertEqual(classify("Fruits and Fruit Juices", "Dried plums"), "Fruits")
+        self.assertEqual(classify(None, "SPINACH"), "Vegetables")
+
+    def test_no_keyword_falls_back_to_the_default(self):
+        self.assertEqual(classify(None, "Water"), DEFAULT_CATEGORY)
+        self.assertEqual(classify(None, None), DEFAULT_CATEGORY)
+
+    def test_classify_many_returns_categories_in_order(self):
+        rows = [(None, "Apple"), (None, "Tofu"), (None, "Apple slices")]
+        categories = classify_many(rows)
+        self.assertEqual([c.name for c in categories], ["Fruits", "Proteins", "Fruits"])
+        self.assertIs(categories[0], categories[2])
+        with self.assertNumQueries(0):
+            classify_many(rows)
+
+    def test_registry_reloads_after_a_category_changes(self):
+        fruits = category_registry.get("Fruits")
+        FoodCategory.objects.filter(pk=fruits.pk).update(pyramid_level=9)
+        self.assertNotEqual(category_registry.get("Fruits").pyramid_level, 9)
+
+        FoodCategory.objects.create(name="Snacks")
+        self.assertEqual(category_registry.get("Fruits").pyramid_level, 9)
+        self.assertEqual(category_registry.find("Snacks").name, "Snacks")
+
+
+FDC_FOODS = [
+    {"fdcId": 1, "description": "Apple, raw", "foodNutrients": [
+        {"nutrientName": "Energy", "nutrientNumber": "208", "value": 52},
+        {"nutrientName": "Protein", "value": 0.3},
+        {"nutrientNumber": "1005", "value": 13.8},
+    ]},
+    {"fdcId": 2, "description": "Applesauce", "foodNutrients": []},
+    {"fdcId": 3, "description": "Pear, raw", "foodNutrients": []},
+]
+
+
+class FoodDataClientTests(TestCase):
+    def setUp(self):
+        self.fake = FakeFoodDataServer(FDC_FOODS).start()
+        self.addCleanup(self.fake.stop)
+
+    def client_for(self, **kwargs):
+        return FoodDataClient("key", base_url=self.fake.url, **kwargs)
+
+    def test_search_parses_the_catalog_fields(self):
+        foods = self.client_for().search("apple")
+        self.assertEqual([f["fdcId"] for f in foods], [1, 2])
+        self.assertEqual(
+            {k: foods[0][k] for k in ("description", "calories", "protein", "carbs", "fats")},
+            {"description": "Apple, raw", "calories": 52.0, "protein": 0.3, "carbs": 13.8, "fats": 0.0},
+        )
+
+    def test_normalized_queries_share_a_cache_entry(self):
+        client = self.client_for()
+        first = client.search("Apple")
+        self.assertEqual(client.search("  APPLE "), first)
+        self.assertEqual(self.fake.request_count, 1)
+        client.search("apple", page_size=1)
+        self.assertEqual(self.fake.request_count, 2)
+
+    def test_entries_expire_after_the_ttl(self):
+        client = self.client_for(cache_ttl=60)
+        with mock.patch("core.usda.time.monotonic", return_value=1000.0):
+            client.search("pear")
+            client.search("pear")
+        self.assertEqual(self.fake.request_count, 1)
+        with mock.patch("core.usda.time.monotonic", return_value=1061.0):
+            client.search("pear")
+        self.assertEqual(self.fake.request_count, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        client = self.client_for(cache_size=2)
+        client.search("apple")
+        client.search("pear")
+        client.search("apple")
+        client.search("sauce")  # evicts pear
+        client.search("apple")
+        self.assertEqual(self.fake.request_count, 3)
+        client.search("pear")
+        self.assertEqual(self.fake.request_count, 4)
+
+    def test_concurrent_identical_searches_share_one_request(self):
+        self.fake.delay = 0.3
+        client = self.client_for()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(client.search("pear"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.fake.request_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    def test_failures_raise_and_are_not_cached(self):
+        down = FakeFoodDataServer([]).start()
+        url = down.url
+        down.stop()
+        client = FoodDataClient("key", base_url=url, timeout=1)
+        for _ in range(2):
+            with self.assertRaises(USDAError):
+                client.search("apple")
+        self.assertEqual(client._cache, {})
+
+    def test_shared_client_follows_settings(self):
+        with override_settings(USDA_API_KEY=""):
+            self.assertIsNone(get_usda_client())
+        with override_settings(USDA_API_KEY="key", USDA_API_URL=self.fake.url):
+            client = get_usda_client()
+            self.assertIs(get_usda_client(), client)
+            self.assertEqual(client.search("pear")[0]["fdcId"], 3)
+        with override_settings(USDA_API_KEY="other", USDA_API_URL=self.fake.url):
+            self.assertIsNot(get_usda_client(), client)
+
+
+def fdc_json_food(fdc_id, description, category, energy=None, protein=None):
+    nutrients = [
+        {"nutrient": {"id": nutrient_id}, "amount": amount}
+        for nutrient_id, amount in ((1008, energy), (1003, protein)) if amount is not None
+    ]
+    return {
+        "fdcId": fdc_id, "description": description, "dataType": "Foundation",
+        "foodCategory": {"description": category}, "foodNutrients": nutrients,
+    }
+
+
+class ImportFDCTests(TestCase):
+    def setUp(self):
+        category_registry.clear()
+        self.addCleanup(category_registry.clear)
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def write_json(self, foods):
+        path = self.dir / "foundation.json"
+        path.write_text(json.dumps({"FoundationFoods": foods}))
+        return path
+
+    def write_csv(self):
+        (self.dir / "food_category.csv").write_text('id,description\n1,"Dairy and Egg Products"\n2,Beverages\n')
+        (self.dir / "food.csv").write_text(
+            "fdc_id,data_type,description,food_category_id\n"
+            '10,sr_legacy_food,"Milk, whole",1\n'
+            '11,sr_legacy_food,"Egg, whole, raw",1\n'
+            '12,sr_legacy_food,"Water, tap",2\n'
+        )
+        (self.dir / "food_nutrient.csv").write_text(
+            "id,fdc_id,nutrient_id,amount\n"
+            "1,10,2047,64\n2,10,1008,61\n3,10,1003,3.2\n4,11,1004,9.5\n5,12,1008,0\n6,10,1093,43\n"
+        )
+        return self.dir
+
+    def run_import(self, path, *args):
+        out = io.StringIO()
+        call_command("import_fdc", str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def foods(self):
+        return {
+            food.fdc_id: food
+            for food in CatalogFood.objects.select_related("category").filter(fdc_id__isnull=False)
+        }
+
+    def test_json_export(self):
+        self.run_import(self.write_json([
+            fdc_json_food(1, "Milk, whole", "Dairy and Egg Products", energy=61, protein=3.2),
+            fdc_json_food(2, "Bologna, beef", "Sausages and Luncheon Meats", energy=310),
+        ]))
+        foods = self.foods()
+        self.assertEqual(foods[1].category.name, "Dairy")
+        self.assertEqual((foods[1].calories_100g, foods[1].protein_100g), (61, 3.2))
+        self.assertEqual(foods[2].category.name, "Proteins")
+
+    def test_csv_export(self):
+        self.run_import(self.write_csv())
+        foods = self.foods()
+        self.assertEqual({i: f.category.name for i, f in foods.items()},
+                         {10: "Dairy", 11: "Proteins", 12: "Sweets & Processed Foods"})
+        # 1008 outranks the Atwater energy ids.
+        self.assertEqual((foods[10].calories_100g, foods[10].protein_100g), (61, 3.2))
+        self.assertEqual(foods[11].fats_100g, 9.5)
+
+    def test_food_csv_path_reads_its_folder(self):
+        self.run_import(self.write_csv() / "food.csv")
+        self.assertEqual(set(self.foods()), {10, 11, 12})
+
+    def test_upsert_updates_values_but_keeps_curated_categories(self):
+        path = self.write_json([fdc_json_food(1, "Milk, whole", "Dairy and Egg Products", energy=61)])
+        self.run_import(path)
+        sweets = category_registry.get("Sweets & Processed Foods")
+        CatalogFood.objects.filter(fdc_id=1).update(category=sweets, is_active=False)
+
+        path = self.write_json([fdc_json_food(1, "Milk, whole, 3.25%", "Dairy and Egg Products", energy=62)])
+        self.run_import(path)
+        food = self.foods()[1]
+        self.assertEqual((food.name, food.calories_100g, food.category, food.is_active),
+                         ("Milk, whole, 3.25%", 62, sweets, False))
+        self.assertEqual(CatalogFood.objects.filter(fdc_id=1).count(), 1)
+
+        self.run_import(path, "--reclassify")
+        self.assertEqual(self.foods()[1].category.name, "Dairy")
+
+    def test_interrupted_import_resumes_after_the_last_batch(self):
+        path = self.write_json([fdc_json_food(i, f"Food {i}", "Fruits and Fruit Juices") for i in range(1, 6)])
+        batches = []
+
+        def upsert_then_fail(rows, **kwargs):
+            if len(batches) == 2:
+                raise RuntimeError("interrupted")
+            batches.append([row["fdc_id"] for row in rows])
+            return upsert_catalog_foods(rows, **kwargs)
+
+        with mock.patch("core.management.commands.import_fdc.upsert_catalog_foods", side_effect=upsert_then_fail):
+            with self.assertRaises(RuntimeError):
+                self.run_import(path, "--batch-size", "2")
+        self.assertEqual(set(self.foods()), {1, 2, 3, 4})
+
+        with mock.patch("core.management.commands.import_fdc.upsert_catalog_foods",
+                        side_effect=upsert_catalog_foods) as upsert:
+            output = self.run_import(path, "--batch-size", "2")
+        self.assertIn("Resuming after 4 row(s).", output)
+        self.assertEqual([[row["fdc_id"] for row in call.args[0]] for call in upsert.call_args_list], [[5]])
+        self.assertEqual(set(self.foods()), {1, 2, 3, 4, 5})
+        self.assertFalse(Path(f"{path.resolve()}.import-state.json").exists())
+
+    def test_fdc_category_is_not_keyword_matched(self):
+        self.assertEqual(classify_fdc("Dairy and Egg Products", "Milk, whole"), "Dairy")
+        self.assertEqual(classify_fdc("Dairy and Egg Products", "Cheese, pepper jack"), "Dairy")
+        self.assertEqual(classify_fdc("Beverages", "Apple juice"), "Fruits")
+        self.assertEqual(classify_fdc("Baby Foods", "Babyfood, carrots"), "Vegetables")
+        self.assertEqual(classify_fdc(None, "Banana"), "Fruits")
+
+
+class SearchBackendTests(TestCase):
+    def setUp(self):
+        get_search_backend.cache_clear()
+        self.addCleanup(get_search_backend.cache_clear)
+        self.backend = get_search_backend()
+        self.fruits = FoodCategory.objects.get(name="Fruits")
+        for name in ("Banana", "Bananas, dried", "Plantain (green banana)", "Pear", "Pea soup", "Kiwi"):
+            CatalogFood.objects.create(category=self.fruits, name=name)
+
+    def names(self, query, model=CatalogFood):
+        return list(self.backend.ranked(model.objects.all(), query).values_list("name", flat=True))
+
+    def test_sqlite_uses_fts5_trigram_index(self):
+        self.assertIsInstance(self.backend, SQLiteFTS5Backend)
+
+    @override_settings(SEARCH_BACKEND="core.search.SearchBackend")
+    def test_setting_chooses_backend(self):
+        get_search_backend.cache_clear()
+        self.assertIs(type(get_search_backend()), SearchBackend)
+
+    def test_terms_fold_plurals_and_match_substrings(self):
+        self.assertEqual(search_terms("Bananas  PEAS glass"), ["banana", "pea", "glass"])
+        self.assertEqual(set(self.names("nan")), {"Banana", "Bananas, dried", "Plantain (green banana)"})
+        self.assertEqual(set(self.names("bananas")), set(self.names("banana")))
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.names("banana dried"), ["Bananas, dried"])
+        self.assertEqual(self.names("banana kiwi"), [])
+
+    def test_ranked_best_match_first(self):
+        names = self.names("banana")
+        self.assertEqual(names[-1], "Plantain (green banana)")
+        ranks = list(self.backend.ranked(CatalogFood.objects.all(), "banana").values_list("search_rank", flat=True))
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_short_terms_fall_back_to_like(self):
+        self.assertEqual(set(self.names("pe")), {"Pear", "Pea soup"})
+        self.assertEqual(self.names("pe soup"), ["Pea soup"])
+
+    def test_fts_operators_are_plain_text(self):
+        expected = self.names("banana")
+        for query in ('"banana', 'banana"', "banana*", "-banana", "(banana)", "^banana", "banana:"):
+            with self.subTest(query=query):
+                self.assertEqual(self.names(query), expected)
+        # Operator words are ordinary terms that must occur in the name.
+        for query in ("banana OR kiwi", "banana NEAR pear", "banana AND", "name:banana"):
+            with self.subTest(query=query):
+                self.assertEqual(self.names(query), [])
+        self.assertEqual(len(self.names('"*-()')), CatalogFood.objects.count())
+
+    def test_index_follows_renames_and_deletes(self):
+        food = FoodItem.objects.create(name="Apple")
+        self.assertEqual(self.names("apple", FoodItem), ["Apple"])
+        food.name = "Apricot"
+        food.save()
+        self.assertEqual(self.names("apple", FoodItem), [])
+        self.assertEqual(self.names("apric", FoodItem), ["Apricot"])
+        food.delete()
+        self.assertEqual(self.names("apric", FoodItem), [])
+
+    def test_catalog_search_view(self):
+        self.client.force_login(User.objects.create_user("parent", password="secret"))
+        response = self.client.get(
+            reverse("catalog_category_foods", args=[self.fruits.id]), {"q": 'banana"', "format": "json"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["name"] for row in response.json()["results"]][-1], "Plantain (green banana)"
+        )
+        self.assertEqual(len(response.json()["results"]), 3)
+
+
+class BulkPromoteTests(TestCase):
+    def setUp(self):
+        category_registry.clear()
+        self.addCleanup(category_registry.clear)
+        self.staff = User.objects.create_user("admin", password="secret", is_staff=True)
+        self.client.force_login(self.staff)
+        self.url = reverse("bulk_promote_fooditems")
+        self.pear = FoodItem.objects.create(name="Pear")
+        self.carrot = FoodItem.objects.create(name="Carrot", category="Vegetables")
+        self.mash = FoodItem.objects.create(name="Mystery mash")
+
+    def test_promotes_ticked_items(self):
+        response = self.client.post(self.url, {"item_ids": [self.pear.id, self.carrot.id]})
+        self.assertRedirects(response, reverse("food_list"), fetch_redirect_response=False)
+        self.pear.refresh_from_db()
+        self.carrot.refresh_from_db()
+        self.mash.refresh_from_db()
+        self.assertEqual(self.pear.catalog_food.category.name, "Fruits")
+        self.assertEqual(self.carrot.catalog_food.category.name, "Vegetables")
+        self.assertEqual(self.pear.catalog_food.data_type, "Custom/Manual")
+        self.assertIsNone(self.mash.catalog_food)
+
+    def test_chosen_category_and_existing_catalog_food(self):
+        dairy = FoodCategory.objects.get(name="Dairy")
+        existing = CatalogFood.objects.create(category=dairy, name="Mystery mash")
+        self.client.post(self.url, {"item_ids": [self.mash.id, self.pear.id], "category_id": dairy.id})
+        self.mash.refresh_from_db()
+        self.pear.refresh_from_db()
+        self.assertEqual(self.mash.catalog_food, existing)
+        self.assertEqual(self.pear.catalog_food.category, dairy)
+        self.assertEqual(CatalogFood.objects.filter(name="Mystery mash").count(), 1)
+
+    def test_already_linked_items_are_skipped(self):
+        self.client.post(self.url, {"item_ids": [self.pear.id]})
+        first = FoodItem.objects.get(pk=self.pear.pk).catalog_food
+        self.client.post(self.url, {"item_ids": [self.pear.id], "category_id": FoodCategory.objects.get(name="Dairy").id})
+        self.assertEqual(FoodItem.objects.get(pk=self.pear.pk).catalog_food, first)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        items = [FoodItem.objects.create(name=f"Food {i}") for i in range(20)]
+        fruits = FoodCategory.objects.get(name="Fruits")
+        with self.assertNumQueries(9):
+            self.client.post(self.url, {"item_ids": [items[0].id], "category_id": fruits.id})
+        with self.assertNumQueries(9):
+            self.client.post(self.url, {"item_ids": [i.id for i in items[1:]], "category_id": fruits.id})
+
+    def test_limit(self):
+        with mock.patch("core.views.MAX_BULK_PROMOTE", 2):
+            response = self.client.post(self.url, {"item_ids": [self.pear.id, self.carrot.id, self.mash.id]}, follow=True)
+        self.assertContains(response, "Promote at most 2 foods at a time.")
+        self.assertFalse(FoodItem.objects.filter(catalog_food__isnull=False).exists())
+
+    def test_invalid_or_empty_selection(self):
+        self.assertEqual(self.client.post(self.url, {"item_ids": ["x"]}).status_code, 400)
+        response = self.client.post(self.url, {}, follow=True)
+        self.assertContains(response, "Select at least one food to promote.")
+
+    def test_next_must_be_local(self):
+        response = self.client.post(self.url, {"item_ids": [self.pear.id], "next": "https://evil.example/"})
+        self.assertRedirects(response, reverse("food_list"), fetch_redirect_response=False)
+        response = self.client.post(self.url, {"item_ids": [self.carrot.id], "next": "/food/?q=car"})
+        self.assertEqual(response["Location"], "/food/?q=car")
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user("parent", password="secret"))
+        response = self.client.post(self.url, {"item_ids": [self.pear.id]})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("admin:login"), response["Location"])
+        self.assertFalse(FoodItem.objects.filter(catalog_food__isnull=False).exists())
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
+class KeysetPaginationTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ["Pear", "apple", "Banana", "banana split", "Carrot", "Kiwi", "Avocado"]:
+            FoodItem.objects.create(name=name)
+
+    def test_cursor_round_trip(self):
+        values = ("Apple", 3)
+        self.assertEqual(decode_cursor(encode_cursor(values), (str, int)), values)
+        day, at = datetime.date(2026, 10, 18), datetime.time(7, 30)
+        self.assertEqual(decode_cursor(encode_cursor([day, at, 9]), (datetime.date, datetime.time, int)), (day, at, 9))
+
+    def test_pages_cover_every_row_once(self):
+        expected = list(FoodItem.objects.order_by("name", "id").values_list("id", flat=True))
+        seen, after = [], None
+        while True:
+            rows, cursor = keyset_page(FoodItem.objects.values("id", "name"), ("name", "id"), after=after, limit=2)
+            seen += [row["id"] for row in rows]
+            if cursor is None:
+                break
+            after = decode_cursor(cursor, (str, int))
+        self.assertEqual(seen, expected)
+
+    def test_descending_ordering(self):
+        expected = list(FoodItem.objects.order_by("-name", "-id").values_list("id", flat=True))
+        rows, cursor = keyset_page(FoodItem.objects.all(), ("-name", "-id"), limit=3)
+        rest, _ = keyset_page(FoodItem.objects.all(), ("-name", "-id"), after=decode_cursor(cursor, (str, int)), limit=10)
+        self.assertEqual([f.id for f in rows + rest], expected)
+
+    def test_api_follows_next_links(self):
+        expected = list(FoodItem.objects.order_by("name", "id").values_list("id", flat=True))
+        seen, url = [], reverse("api_foods")
+        with mock.patch("core.api.API_PAGE_SIZE", 3):
+            while url:
+                body = self.client.get(url).json()
+                seen += [row["id"] for row in body["results"]]
+                url = body["next"]
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursors_are_rejected(self):
+        bad = [
+            "!!!",
+            "bm90IGpzb24",  # base64, not JSON
+            encode_cursor(["Apple"]),  # wrong length
+            encode_cursor({"a": 1}),
+            encode_cursor(["Apple", None]),
+            encode_cursor(["Apple", [1]]),
+            encode_cursor(["Apple", {"id": 1}]),
+            encode_cursor(["Apple", 1e400]),
+        ]
+        for token in bad:
+            with self.subTest(token=token):
+                with self.assertRaises(ValueError):
+                    decode_cursor(token, (str, int))
+                response = self.client.get(reverse("api_foods"), {"after": token})
+                self.assertEqual(response.status_code, 400)
+
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([42, "7:00", 1]), (datetime.date, datetime.time, int))
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor(["nan", "Apple", 1]), (float, str, int))
+
+
+class FeedingHistoryTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        pear = FoodItem.objects.create(name="Pear")
+        self.start = datetime.date(2026, 10, 1)
+        for day in range(5):
+            for hour in (8, 12):
+                entry = FoodEntry.objects.create(baby=self.baby, food=pear, portion_size=20)
+                FoodEntry.objects.filter(pk=entry.pk).update(
+                    date=self.start + datetime.timedelta(days=day), time=datetime.time(hour)
+                )
+        other = Baby.objects.create(owner=self.user, name="Bo", date_of_birth=timezone.now())
+        FoodEntry.objects.create(baby=other, food=pear, portion_size=5)
+        self.url = reverse("feeding_history")
+
+    def follow_pages(self, params):
+        seen, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, 200)
+            seen += [entry.pk for entry in response.context["entries"]]
+            url = response.context["next_url"]
+            pages += 1
+        return seen, pages
+
+    def test_newest_first_in_pages(self):
+        expected = list(
+            FoodEntry.objects.filter(baby=self.baby).order_by("-date", "-time", "-id").values_list("pk", flat=True)
+        )
+        with mock.patch("core.views.HISTORY_PAGE_SIZE", 3):
+            seen, pages = self.follow_pages({})
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 4)
+
+    def test_older_entries_link_keeps_date_range(self):
+        with mock.patch("core.views.HISTORY_PAGE_SIZE", 3):
+            response = self.client.get(self.url, {"start": "2026-10-02", "end": "2026-10-04"})
+            self.assertContains(response, "Older entries")
+            self.assertNotContains(response, "Newest")
+            next_url = response.context["next_url"]
+            self.assertIn("start=2026-10-02", next_url)
+            self.assertIn("end=2026-10-04", next_url)
+
+            response = self.client.get(next_url)
+            self.assertContains(response, "Newest")
+            self.assertEqual(response.context["first_page_url"], f"{self.url}?start=2026-10-02&end=2026-10-04")
+            self.assertNotContains(response, "Older entries")
+            self.assertEqual(
+                [entry.date for entry in response.context["entries"]],
+                [datetime.date(2026, 10, 3), datetime.date(2026, 10, 2), datetime.date(2026, 10, 2)],
+            )
+
+    def test_date_filtering(self):
+        response = self.client.get(self.url, {"start": "2026-10-04"})
+        self.assertEqual({entry.date for entry in response.context["entries"]},
+                         {datetime.date(2026, 10, 4), datetime.date(2026, 10, 5)})
+        response = self.client.get(self.url, {"end": "2026-10-01"})
+        self.assertEqual(len(response.context["entries"]), 2)
+        self.assertIsNone(response.context["next_url"])
+        response = self.client.get(self.url, {"start": "2026-11-01"})
+        self.assertContains(response, "No entries in this date range.")
+
+    def test_invalid_parameters(self):
+        for params in ({"start": "yesterday"}, {"end": "2026-13-01"}, {"after": "!!!"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class NutritionSummaryTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        fruits = FoodCategory.objects.get(name="Fruits")
+        banana = CatalogFood.objects.create(category=fruits, name="Banana", calories_100g=89, protein_100g=1,
+                                            carbs_100g=23, fats_100g=0.5)
+        self.banana = FoodItem.objects.create(name="Banana", catalog_food=banana)
+        self.mystery = FoodItem.objects.create(name="Mystery mash")
+        self.today = timezone.localdate()
+        self.yesterday = self.today - datetime.timedelta(days=1)
+
+    def summary(self, day):
+        return DailyNutritionSummary.objects.filter(baby=self.baby, date=day).first()
+
+    def test_entries_keep_their_day_current(self):
+        first = FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=100)
+        FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=1, portion_unit="whole")
+        FoodEntry.objects.create(baby=self.baby, food=self.mystery, portion_size=1, portion_unit="cup")
+        summary = self.summary(self.today)
+        self.assertEqual((summary.entry_count, summary.skipped_entries), (3, 1))
+        self.assertAlmostEqual(summary.grams, 218)
+        self.assertAlmostEqual(summary.calories, 89 * 2.18)
+
+        first.portion_size = 50
+        first.save()
+        self.assertAlmostEqual(self.summary(self.today).grams, 168)
+
+        first.delete()
+        self.assertEqual(self.summary(self.today).entry_count, 2)
+        FoodEntry.objects.filter(baby=self.baby).delete()
+        self.assertIsNone(self.summary(self.today))
+
+    def test_moving_an_entry_refreshes_both_days(self):
+        stay = FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=30)
+        move = FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=70)
+        move.date = self.yesterday
+        move.save()
+        self.assertAlmostEqual(self.summary(self.today).grams, 30)
+        self.assertAlmostEqual(self.summary(self.yesterday).grams, 70)
+
+        stay.date = self.yesterday
+        stay.save()
+        self.assertIsNone(self.summary(self.today))
+        self.assertEqual(self.summary(self.yesterday).entry_count, 2)
+
+    def test_moving_an_entry_to_another_baby(self):
+        other = Baby.objects.create(owner=self.user, name="Bo", date_of_birth=timezone.now())
+        entry = FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=30)
+        entry.baby = other
+        entry.save()
+        self.assertIsNone(self.summary(self.today))
+        self.assertEqual(DailyNutritionSummary.objects.get(baby=other, date=self.today).entry_count, 1)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        other = Baby.objects.create(owner=self.user, name="Bo", date_of_birth=timezone.now())
+        for baby, food, size in [(self.baby, self.banana, 40), (self.baby, self.mystery, 10),
+                                 (other, self.banana, 25), (self.baby, self.banana, 60)]:
+            FoodEntry.objects.create(baby=baby, food=food, portion_size=size)
+        FoodEntry.objects.filter(portion_size=60).update(date=self.yesterday)
+        fields = ("baby_id", "date", "calories", "grams", "entry_count", "skipped_entries")
+        # update() skips the signals: the incremental rows are now stale.
+        self.assertEqual(self.summary(self.today).grams, 100)
+
+        self.assertEqual(rebuild_summaries(batch_size=1), 3)
+        rebuilt = set(DailyNutritionSummary.objects.values_list(*fields))
+        DailyNutritionSummary.objects.all().delete()
+        for entry in FoodEntry.objects.all():
+            entry.save()
+        self.assertEqual(set(DailyNutritionSummary.objects.values_list(*fields)), rebuilt)
+        self.assertAlmostEqual(self.summary(self.today).grams, 40)
+
+    def test_rebuild_limited_to_babies_and_dates(self):
+        other = Baby.objects.create(owner=self.user, name="Bo", date_of_birth=timezone.now())
+        FoodEntry.objects.create(baby=self.baby, food=self.banana, portion_size=40)
+        FoodEntry.objects.create(baby=other, food=self.banana, portion_size=25)
+        FoodEntry.objects.update(portion_size=1)
+
+        call_command("rebuild_nutrition_summaries", "--baby", str(other.id), stdout=io.StringIO())
+        self.assertEqual(self.summary(self.today).grams, 40)
+        self.assertEqual(DailyNutritionSummary.objects.get(baby=other).grams, 1)
+
+        self.assertEqual(rebuild_summaries(since=self.today + datetime.timedelta(days=1)), 0)
+        self.assertEqual(DailyNutritionSummary.objects.count(), 2)
+        rebuild_summaries(since=self.today)
+        self.assertEqual(self.summary(self.today).grams, 1)
+
+
+class BackfillNutritionSummariesMigrationTests(TransactionTestCase):
+    migrate_from = [("core", "0028_fooditem_name_id_index")]
+    migrate_to = [("core", "0029_backfill_daily_nutrition_summaries")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+
+        User = old_apps.get_model("auth", "User")
+        Baby = old_apps.get_model("core", "Baby")
+        FoodItem = old_apps.get_model("core", "FoodItem")
+        FoodEntry = old_apps.get_model("core", "FoodEntry")
+
+        self.baby = Baby.objects.create(owner=User.objects.create(username="parent"), name="Ada",
+                                        date_of_birth=timezone.now())
+        pear = FoodItem.objects.create(name="Pear", normalized_name="pear")
+        for size in (20, 30):
+            FoodEntry.objects.create(baby=self.baby, food=pear, portion_size=size)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_entries_are_summarized(self):
+        DailyNutritionSummary = self.apps.get_model("core", "DailyNutritionSummary")
+        summary = DailyNutritionSummary.objects.get(baby_id=self.baby.id)
+        self.assertEqual((summary.entry_count, summary.skipped_entries), (2, 2))
+        self.assertEqual(summary.grams, 0)
+
+
+class PortionTests(TestCase):
+    def test_mass_units(self):
+        self.assertEqual(grams_per_unit("Anything", "g"), 1.0)
+        self.assertAlmostEqual(to_grams(["Rice"], [2], ["oz"])[0], 56.699, places=3)
+
+    def test_volume_uses_density(self):
+        self.assertAlmostEqual(grams_per_unit("Whole milk", "ml"), 1.03)
+        self.assertAlmostEqual(grams_per_unit("Apple purée", "cup"), 236.5882365 * 1.04)
+        # Longest phrase wins.
+        self.assertAlmostEqual(grams_per_unit("Peanut butter", "tbsp"), 14.78676478125 * 1.08)
+
+    def test_count_units(self):
+        self.assertEqual(grams_per_unit("Banana", "whole"), 118)
+        self.assertEqual(grams_per_unit("Bananas", "slice"), 8)
+        self.assertEqual(grams_per_unit("Banana", "half"), 59)
+
+    def test_unknown_conversions_are_nan(self):
+        self.assertTrue(math.isnan(grams_per_unit("Puffs", "cup")))
+        self.assertTrue(math.isnan(grams_per_unit("Broccoli", "whole")))
+        self.assertTrue(math.isnan(grams_per_unit("Banana", "bucket")))
+
+    def test_to_grams_columns(self):
+        grams = to_grams(["Banana", "Puffs", "Banana", "Milk"], [2, 1, None, 100], ["whole", "cup", "g", "ml"])
+        self.assertEqual(grams[0], 236)
+        self.assertTrue(math.isnan(grams[1]))
+        self.assertTrue(math.isnan(grams[2]))
+        self.assertAlmostEqual(grams[3], 103)
+
+
+class BulkEntryAPITests(BabyBitesTestCase):
+    def post(self, entries):
+        return self.client.post(
+            reverse("api_entries_bulk", args=[self.baby.id]),
+            {"entries": entries},
+            content_type="application/json",
+        )
+
+    def test_creates_all_entries(self):
+        apple = FoodItem.objects.create(name="Apple")
+        response = self.post([
+            {"food": apple.id, "portion_size": 30},
+            {"food_name": "Pear", "portion_size": 1, "portion_unit": "whole", "reaction": "love"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        ids = response.json()["ids"]
+        self.assertEqual(
+            list(FoodEntry.objects.filter(id__in=ids).order_by("id").values_list("food__name", flat=True)),
+            ["Apple", "Pear"],
+        )
+
+    def test_invalid_item_rolls_back_everything(self):
+        apple = FoodItem.objects.create(name="Apple")
+        response = self.post([
+            {"food": apple.id, "portion_size": 30},
+            {"food_name": "Kiwi", "portion_size": 10, "portion_unit": "bucket"},
+            {"food": 999999, "portion_size": 5},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual(set(errors), {"1", "2"})
+        self.assertIn("portion_unit", errors["1"])
+        self.assertIn("food", errors["2"])
+
+        self.assertFalse(FoodEntry.objects.exists())
+        # The food created by name for item 1 went with the rollback.
+        self.assertFalse(FoodItem.objects.filter(normalized_name="kiwi").exists())
+
+    def test_rejects_another_users_baby(self):
+        other = User.objects.create_user("other")
+        baby = Baby.objects.create(owner=other, name="Bo", date_of_birth=timezone.now())
+        response = self.client.post(
+            reverse("api_entries_bulk", args=[baby.id]),
+            {"entries": [{"food_name": "Apple", "portion_size": 1}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_overlong_category_is_rejected(self):
+        response = self.post([
+            {"food_name": "Kiwi", "category": "x" * 128, "portion_size": 10},
+            {"food_name": "Pear", "category": "x" * 127, "portion_size": 10},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()["errors"]), ["0"])
+        self.assertEqual(list(response.json()["errors"]["0"]), ["category"])
+        self.assertFalse(FoodItem.objects.exists())
+
+    def test_create_food(self):
+        url = reverse("api_foods")
+        response = self.client.post(url, {"name": "  Sweet   potato ", "category": " Vegetables "},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["category"], "Vegetables")
+        response = self.client.post(url, {"name": "sweet potato"}, content_type="application/json")
+        self.assertEqual((response.status_code, response.json()["created"]), (200, False))
+
+        response = self.client.post(url, {"name": "Kiwi", "category": "x" * 128}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "category is too long."})
+        self.assertFalse(FoodItem.objects.filter(name="Kiwi").exists())
+
+    def test_date_of_birth_is_the_local_date(self):
+        # 02:00 UTC is still the previous evening in New York.
+        Baby.objects.filter(pk=self.baby.pk).update(
+            date_of_birth=datetime.datetime(2026, 3, 2, 2, 0, tzinfo=datetime.timezone.utc)
+        )
+        with self.settings(TIME_ZONE="America/New_York"):
+            babies = self.client.get(reverse("api_babies")).json()["results"]
+        self.assertEqual(babies[0]["date_of_birth"], "2026-03-01")
+
+
+class SyncTombstoneTests(BabyBitesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.food = FoodItem.objects.create(name="Banana")
+        self.entry = FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=40)
+
+    def full_sync(self):
+        page = sync_page(self.user)
+        self.assertFalse(page["has_more"])
+        return page
+
+    def test_deleted_entry_is_reported(self):
+        token = self.full_sync()["sync_token"]
+        entry_id = self.entry.id
+        self.entry.delete()
+
+        page = sync_page(self.user, token)
+        self.assertFalse(page["full"])
+        self.assertEqual(page["deleted"]["entries"], [entry_id])
+        self.assertEqual(page["entries"], [])
+
+    def test_deleted_baby_is_reported_without_entry_tombstones(self):
+        token = self.full_sync()["sync_token"]
+        baby_id = str(self.baby.id)
+        self.baby.delete()
+
+        page = sync_page(self.user, token)
+        self.assertEqual(page["deleted"]["babies"], [baby_id])
+        self.assertEqual(page["deleted"]["entries"], [])
+
+    def test_entry_moved_away_leaves_a_tombstone(self):
+        other = User.objects.create_user("other")
+        other_baby = Baby.objects.create(owner=other, name="Bo", date_of_birth=timezone.now())
+        token = self.full_sync()["sync_token"]
+
+        self.entry.baby = other_baby
+        self.entry.save()
+
+        page = sync_page(self.user, token)
+        self.assertEqual(page["deleted"]["entries"], [self.entry.id])
+        self.assertEqual(page["entries"], [])
+        self.assertEqual([e.id for e in sync_page(other)["entries"]], [self.entry.id])
+
+    def test_other_users_tombstones_are_hidden(self):
+        token = self.full_sync()["sync_token"]
+        other = User.objects.create_user("other")
+        other_baby = Baby.objects.create(owner=other, name="Bo", date_of_birth=timezone.now())
+        FoodEntry.objects.create(baby=other_baby, food=self.food, portion_size=1).delete()
+        other_baby.delete()
+
+        page = sync_page(self.user, token)
+        self.assertEqual(page["deleted"], {"babies": [], "entries": [], "foods": []})
+
+    def test_expired_token_gets_410(self):
+        since = timezone.now() - datetime.timedelta(days=365)
+        response = self.client.get(reverse("api_sync"), {"token": encode_sync_token(since, None)})
+        self.assertEqual(response.status_code, 410)
+
+    def test_tombstones_paginate_with_the_rest(self):
+        token = self.full_sync()["sync_token"]
+        ids = [self.entry.id]
+        for _ in range(4):
+            entry = FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=1)
+            ids.append(entry.id)
+        FoodEntry.objects.filter(id__in=ids).delete()
+        self.assertEqual(Tombstone.objects.filter(kind=Tombstone.KIND_ENTRY).count(), 5)
+
+        deleted = []
+        while True:
+            page = sync_page(self.user, token, limit=2)
+            deleted += page["deleted"]["entries"]
+            token = page["sync_token"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(sorted(deleted), sorted(ids))
+
+    def test_prune_keeps_recent_tombstones(self):
+        recent_id = str(self.entry.id)
+        self.entry.delete()
+        old = FoodEntry.objects.create(baby=self.baby, food=self.food, portion_size=1)
+        old_id = str(old.id)
+        old.delete()
+        Tombstone.objects.filter(object_id=old_id).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=91)
+        )
+        call_command("prune_tombstones", stdout=io.StringIO())
+        self.assertEqual(list(Tombstone.objects.values_list("object_id", flat=True)), [recent_id])
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("parent")
+        self.ada = Baby.objects.create(owner=self.user, name="Ada", date_of_birth=timezone.now())
+        self.bo = Baby.objects.create(owner=self.user, name="Bo", date_of_birth=timezone.now())
+
+    def request(self, active=None):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.session = {"active_profile": str(active.id)} if active else {}
+        return request
+
+    def names(self):
+        return [baby.name for baby in get_profiles(self.request())]
+
+    def test_list_is_cached_across_requests(self):
+        self.assertEqual(self.names(), ["Ada", "Bo"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(), ["Ada", "Bo"])
+
+    def test_save_and_delete_invalidate(self):
+        self.names()
+        Baby.objects.filter(pk=self.ada.pk).update(name="Ann")  # no signal
+        self.assertEqual(self.names(), ["Ada", "Bo"])
+
+        self.ada.refresh_from_db()
+        self.ada.save()
+        self.assertEqual(self.names(), ["Ann", "Bo"])
+
+        Baby.objects.create(owner=self.user, name="Cy", date_of_birth=timezone.now())
+        self.assertEqual(self.names(), ["Ann", "Bo", "Cy"])
+
+        self.bo.delete()
+        self.assertEqual(self.names(), ["Ann", "Cy"])
+
+    def test_session_choice_and_default(self):
+        self.assertEqual(get_active_profile(self.request(self.bo)), self.bo)
+        request = self.request()
+        self.assertEqual(get_active_profile(request), self.ada)
+        self.assertEqual(request.session["active_profile"], str(self.ada.id))
+
+    def test_verify_sees_past_a_stale_cache(self):
+        self.names()
+        bo = Baby.objects.get(pk=self.bo.pk)
+        # Deleted by another worker whose cache this one does not share.
+        with mock.patch("core.signals.invalidate_profiles"):
+            bo.delete()
+
+        self.assertEqual(get_active_profile(self.request(self.bo)).pk, self.bo.pk)
+        self.assertEqual(get_active_profile(self.request(self.bo), verify=True), self.ada)
+        self.assertEqual(self.names(), ["Ada"])
+
+
+class MergeDuplicateFoodItemsMigrationTests(TransactionTestCase):
+    migrate_from = [("core", "0017_fooditem_normalized_name")]
+    migrate_to = [("core", "0018_merge_duplicate_fooditems")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+
+        User = old_apps.get_model("auth", "User")
+        Baby = old_apps.get_model("core", "Baby")
+        FoodItem = old_apps.get_model("core", "FoodItem")
+        FoodEntry = old_apps.get_model("core", "FoodEntry")
+
+        baby = Baby.objects.create(owner=User.objects.create(username="parent"), name="Ada",
+                                   date_of_birth=timezone.now())
+        self.keeper = FoodItem.objects.create(name="Sweet Potato")
+        self.duplicate = FoodItem.objects.create(name="  sweet   potato ", category="Vegetables")
+        self.other = FoodItem.objects.create(name="Pear")
+        self.entry = FoodEntry.objects.create(baby=baby, food=self.duplicate, portion_size=20)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        self.apps = executor.loader.project_state(self.migrate_to).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        # Rolling back rebuilt the food table without its search triggers.
+        install_search_index()
+
+    def test_duplicates_fold_into_the_oldest_item(self):
+        FoodItem = self.apps.get_model("core", "FoodItem")
+        FoodEntry = self.apps.get_model("core", "FoodEntry")
+
+        self.assertEqual(
+            sorted(FoodItem.objects.values_list("id", "normalized_name")),
+            [(self.keeper.id, "sweet potato"), (self.other.id, "pear")],
+        )
+        keeper = FoodItem.objects.get(id=self.keeper.id)
+        self.assertEqual(keeper.name, "Sweet Potato")
+        self.assertEqual(keeper.category, "Vegetables")
+        self.assertEqual(FoodEntry.objects.get(id=self.entry.id).food_id, self.keeper.id)
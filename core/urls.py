@@ -1,6 +1,6 @@
 from django.contrib.auth import views as auth_views
 from django.urls import path, reverse_lazy
-from . import views
+from . import api, views
 from .views import baby_list, baby_create, baby_edit, baby_delete, set_active_profile
 from django.conf.urls.static import static
 from django.conf import settings
@@ -19,17 +19,22 @@ urlpatterns = [
     path('babies/<uuid:baby_id>/edit', baby_edit, name='baby-edit'),
     path('babies/<uuid:baby_id>/delete/', baby_delete, name='baby-delete'),
     path('tracker/', views.tracker, name='tracker'),
+    path('foods/search/', views.food_search, name='food_search'),
+    path('allergens/<str:version>.json', views.allergen_index, name='allergen_index'),
 
     path('resources/', views.resources, name='resources'),
 
     path('add_food/', views.add_food, name='add_food'),
+    path('history/', views.feeding_history, name='feeding_history'),
     path('food_list/', views.food_list, name='food_list'),
 
     path('usda_search/', views.usda_search, name='usda_search'),
     path('add_usda_food/', views.add_usda_food, name='add_usda_food'),
 
     path('catalog/', views.catalog, name='catalog'),
+    path('catalog/category/<int:category_id>/foods/', views.catalog_category_foods, name='catalog_category_foods'),
     path('catalog/use/', views.catalog_use_in_tracker, name='catalog_use_in_tracker'),
+    path('food/promote/bulk/', views.bulk_promote_fooditems, name='bulk_promote_fooditems'),
     path('food/promote/<int:item_id>/', views.promote_fooditem_to_catalog, name='promote_fooditem_to_catalog'),
     path('food/<int:item_id>/promote/', views.promote_fooditem_to_catalog, name='promote_to_catalog'),
     path('catalog/add-custom/', views.add_custom_catalog_food, name='catalog_add_custom'),
@@ -38,6 +43,7 @@ urlpatterns = [
     path('report/', views.generate_report_view, name='generate_report_view'),
     path('report/preview/', views.report_preview, name='report_preview'),
     path('report/download/', views.report_image, name='report_image'),
+    path('report/jobs/<uuid:job_id>/', views.report_job, name='report_job'),
 
     path("babies/active/<uuid:profile_id>/", set_active_profile, name="set-active-profile"),
 
@@ -45,6 +51,12 @@ urlpatterns = [
     path("password/change/", views.change_password, name="password_change"),
     path("password/change/done/", views.password_change_done, name="password_change_done"),
 
+    path("api/babies/", api.api_babies, name="api_babies"),
+    path("api/foods/", api.api_foods, name="api_foods"),
+    path("api/babies/<uuid:baby_id>/entries/", api.api_entries, name="api_entries"),
+    path("api/babies/<uuid:baby_id>/entries/bulk/", api.api_entries_bulk, name="api_entries_bulk"),
+    path("api/sync/", api.api_sync, name="api_sync"),
+
     path("privacy/", views.privacy, name="privacy"),
     path("terms/", views.terms, name="terms"),
     path("about/", views.about, name="about"),
@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_API_URL = "https://api.nal.usda.gov/fdc/v1"
+
+
+class USDAError(Exception):
+    """The FoodData Central request failed or returned something unusable."""
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").split()).casefold()
+
+
+def parse_search_foods(data: dict) -> list[dict]:
+    """Reduce a /foods/search response to the per-100g fields the catalog uses."""
+    foods = []
+    for item in data.get("foods", []) or []:
+        name_map, num_map = {}, {}
+        for n in item.get("foodNutrients", []) or []:
+            nn = (n.get("nutrientName") or "").strip().lower()
+            if nn and n.get("value") is not None:
+                name_map[nn] = float(n["value"])
+            num = str(n.get("nutrientNumber") or "").strip()
+            if num and n.get("value") is not None:
+                num_map[num] = float(n["value"])
+
+        foods.append({
+            "description": item.get("description", "Unknown"),
+            "fdcId": item.get("fdcId"),
+            "calories": name_map.get("energy") or num_map.get("1008") or 0.0,
+            "protein": name_map.get("protein") or num_map.get("1003") or 0.0,
+            "carbs": name_map.get("carbohydrate, by difference") or num_map.get("1005") or 0.0,
+            "fats": name_map.get("total lipid (fat)") or num_map.get("1004") or 0.0,
+        })
+    return foods
+
+
+class FoodDataClient:
+    """
+    FoodData Central search client for the web process.
+
+    One pooled requests.Session keeps TLS connections alive between
+    searches. Parsed results are kept in a TTL+LRU cache keyed on the
+    normalized query and page size. Concurrent identical searches share a
+    single upstream request. Failures are never cached.
+    """
+
+    def __init__(self, api_key: str, base_url: str = DEFAULT_API_URL, timeout=(3.05, 8),
+                 cache_ttl: int = 3600, cache_size: int = 256, pool_size: int = 10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        # Retry refused connections and 502/503/504 only: a read timeout
+        # means USDA is hung, and retrying it would hold the worker for
+        # several read timeouts instead of one.
+        retry = Retry(total=2, read=0, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._cache: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def search(self, query: str, page_size: int = 5) -> list[dict]:
+        query = normalize_query(query)
+        key = (query, page_size)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                expires, foods = cached
+                if expires > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return foods
+                del self._cache[key]
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            foods = self._fetch(query, page_size)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(foods)
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, foods)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return foods
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch(self, query: str, page_size: int) -> list[dict]:
+        params = {"query": query, "pageSize": page_size, "api_key": self.api_key}
+        try:
+            resp = self.session.get(f"{self.base_url}/foods/search", params=params,
+                                    timeout=self.timeout)
+            resp.raise_for_status()
+            return parse_search_foods(resp.json())
+        except (requests.RequestException, ValueError) as exc:
+            raise USDAError(str(exc)) from exc
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+_client: FoodDataClient | None = None
+_client_config: tuple | None = None
+_client_lock = threading.Lock()
+
+
+def get_usda_client() -> FoodDataClient | None:
+    """
+    Shared client built from settings, or None without USDA_API_KEY. Rebuilt
+    if the settings change (e.g. override_settings pointing at a fake server).
+    """
+    global _client, _client_config
+
+    api_key = getattr(settings, "USDA_API_KEY", None)
+    if not api_key:
+        return None
+
+    config = (
+        api_key,
+        getattr(settings, "USDA_API_URL", DEFAULT_API_URL),
+        getattr(settings, "USDA_CACHE_TTL", 3600),
+        getattr(settings, "USDA_CACHE_SIZE", 256),
+    )
+    with _client_lock:
+        if _client is None or _client_config != config:
+            _client = FoodDataClient(api_key, base_url=config[1], cache_ttl=config[2],
+                                     cache_size=config[3])
+            _client_config = config
+        return _client
+
+
+class FakeFoodDataServer:
+    """
+    Local stand-in for the FoodData Central search API, for tests and
+    offline development. Serves /foods/search over canned foods (raw FDC
+    search items) matched by substring on description:
+
+        with FakeFoodDataServer(foods) as fake, override_settings(USDA_API_URL=fake.url):
+            ...
+
+    request_count is the number of searches it has answered.
+    """
+
+    def __init__(self, foods: list[dict], delay: float = 0.0):
+        self.foods = foods
+        self.delay = delay
+        self.request_count = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFoodDataServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip("/").endswith("/foods/search"):
+                    params = parse_qs(url.query)
+                    fake.request_count += 1
+                    if fake.delay:
+                        time.sleep(fake.delay)
+                    query = normalize_query(params.get("query", [""])[0])
+                    size = int(params.get("pageSize", ["50"])[0])
+                    hits = [f for f in fake.foods
+                            if query in normalize_query(f.get("description", ""))]
+                    body = json.dumps({"totalHits": len(hits), "foods": hits[:size]}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,24 +1,53 @@
-from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
+from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404, get_object_or_404
 from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth import login, update_session_auth_hash
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from .forms import SignUpForm, BabyForm, FoodItemForm, FoodEntryForm, AccountForm
-from .models import Baby, FoodEntry, FoodItem, FoodCategory, CatalogFood, map_usda_to_category
-from django.conf import settings
-import requests
-from django.db.models import Prefetch, Q
-from .reports import generate_report_image
+from .models import (
+    Baby,
+    CatalogFood,
+    DailyNutritionSummary,
+    FoodCategory,
+    FoodEntry,
+    FoodItem,
+    ReportJob,
+    get_or_create_food_item,
+    normalize_food_name,
+)
+from django.db.models import Count, Q
+from .reports import (
+    MAX_REPORT_RANGE_DAYS,
+    REPORT_FORMATS,
+    REPORT_SCALES,
+    generate_report_image,
+    iter_report_pages_zip,
+    iter_report_range,
+    load_report_data,
+    render_report_range,
+    report_fingerprint,
+    report_pages_to_pdf,
+)
+from .report_cache import report_cache
+from .report_jobs import enqueue_report, housekeeping as report_housekeeping
+from .avatars import delete_avatar_derivatives, refresh_avatar_derivatives
+from .profiles import get_active_profile
+from .allergens import get_allergen_index, get_allergen_scanner
+from .usda import USDAError, get_usda_client
+from .pagination import decode_cursor, keyset_page
+from .search import RANKED_ORDERING, get_search_backend
+from .catalog import promote_food_items
+from django.utils.cache import get_conditional_response
 from django.urls import reverse
-from django.utils.functional import cached_property
+from urllib.parse import urlencode
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
 import datetime
 from django.utils import timezone
 import random
-import json
-from pathlib import Path
 
 # if user is not logged in, show log in screen, otherwise redirect to dashboard
 def home(request):
@@ -36,20 +65,19 @@ def home(request):
 
     return render(request, "index.html", {"form": form})
 
-def _get_active_profile(request):
-    baby_id = request.session.get("active_profile")
-    if not baby_id or not request.user.is_authenticated:
-        return None
-    return Baby.objects.filter(id=baby_id, owner=request.user).first()
+@require_GET
+def allergen_index(request, version):
+    """
+    Compiled allergen phrases for the tracker. The URL carries the content
+    hash, so responses can be cached forever; stale hashes redirect.
+    """
+    index = get_allergen_index()
+    if version != index.version:
+        return redirect("allergen_index", version=index.version)
 
-def _load_allergen_map():
-    json_path = Path(settings.BASE_DIR) / 'core' / 'static' / 'core' / 'data' / 'allergens_map.json'
-    if json_path.exists():
-        try:
-            return json.loads(json_path.read_text(encoding='utf-8'))
-        except Exception:
-            return {}
-    return {}
+    response = JsonResponse(index.as_json())
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
 @login_required
 def dashboard(request):
@@ -87,6 +115,8 @@ def baby_create(request):
 
             baby.save()
             form.save_m2m()
+            if "image" in form.changed_data:
+                refresh_avatar_derivatives(baby)
             return redirect("baby-list")
     else:
         form = BabyForm()
@@ -106,6 +136,8 @@ def baby_edit(request, baby_id):
 
             baby.save()
             form.save_m2m()
+            if "image" in form.changed_data:
+                refresh_avatar_derivatives(baby)
             return redirect("baby-list")
     else:
         form = BabyForm(instance=baby)
@@ -117,6 +149,7 @@ def baby_delete(request, baby_id):
     baby = get_object_or_404(Baby, id=baby_id, owner=request.user)
 
     if request.method == "POST":
+        delete_avatar_derivatives(baby)
         baby.delete()
         return redirect("baby-list")
 
@@ -129,7 +162,7 @@ def baby_list(request):
 
 @login_required
 def tracker(request):
-    active = _get_active_profile(request)
+    active = get_active_profile(request, verify=True)
 
     if request.method == "POST":
         if not active:
@@ -140,25 +173,37 @@ def tracker(request):
 
         if entry_form.is_valid():
             entry = entry_form.save(commit=False)
-
-            # Handle food input to avoid duplicates (case-insensitive)
-            if food_form.is_valid() and food_form.cleaned_data.get('name'):
-                name = food_form.cleaned_data['name'].strip()
-                # Prefer case-insensitive reuse if it exists
-                existing = FoodItem.objects.filter(name__iexact=name).first()
-                if existing:
-                    entry.food = existing
-                else:
-                    entry.food = FoodItem.objects.create(name=name, category=food_form.cleaned_data.get('category', '') or '')
-            else:
-                entry.food = entry_form.cleaned_data.get('food')
-
-            # Attach the active baby and save
-            entry.baby = active
-            entry.save()
-
-            messages.success(request, f"Saved entry for {active.name}.")
-            return redirect("tracker")
+            entry.food = entry_form.cleaned_data.get('food')
+
+            # A typed-in food name is looked up or created, so only its field
+            # validation (max_length) applies, not the model's duplicate check.
+            name = (food_form['name'].value() or '').strip()
+            if name:
+                try:
+                    name = food_form.fields['name'].clean(name)
+                    category = food_form.fields['category'].clean(food_form['category'].value() or '')
+                    entry.food, _ = get_or_create_food_item(name, category=category.strip())
+                except ValidationError as e:
+                    entry_form.add_error('food', e)
+
+            if not entry_form.errors:
+                # Attach the active baby and save
+                entry.baby = active
+                entry.save()
+
+                messages.success(request, f"Saved entry for {active.name}.")
+
+                hits = get_allergen_scanner().warnings_for(
+                    entry.food.name,
+                    active.allergies.values_list('name', flat=True),
+                )
+                if hits:
+                    messages.warning(
+                        request,
+                        f"{entry.food.name} may contain {', '.join(hits)}, "
+                        f"which {active.name} is allergic to.",
+                    )
+                return redirect("tracker")
     else:
         food_form = FoodItemForm(prefix='food')
         entry_form = FoodEntryForm(prefix='entry', user=request.user)
@@ -171,19 +216,132 @@ def tracker(request):
             .order_by('-date', '-time')[:10]
         )
         baby_allergies = list(active.allergies.values_list('name', flat=True))
+        today_nutrition = (
+            DailyNutritionSummary.objects
+            .filter(baby=active, date=timezone.localdate())
+            .first()
+        )
     else:
         food_entries = FoodEntry.objects.none()
         baby_allergies = []
+        today_nutrition = None
     
+    # Re-display the picked food's name when the form comes back with errors.
+    selected_food = None
+    if entry_form.is_bound and hasattr(entry_form, 'cleaned_data'):
+        selected_food = entry_form.cleaned_data.get('food')
+
     context = {
         'food_form': food_form,
         'entry_form': entry_form,
         'food_entries': food_entries,
         'baby_allergies': baby_allergies,
+        'today_nutrition': today_nutrition,
+        'selected_food': selected_food,
+        'food_search_limit': FOOD_SEARCH_LIMIT,
+        'allergen_index_url': reverse('allergen_index', args=[get_allergen_index().version]),
     }
     return render(request, 'tracker.html', context)
 
 
+FOOD_SEARCH_LIMIT = 10
+FOOD_SEARCH_MAX_LIMIT = 25
+
+
+@login_required
+def food_search(request):
+    """
+    Typeahead for the tracker's food field: FoodItems whose name starts with
+    q, then ones that merely contain it, at most `limit` in total.
+    """
+    q = (request.GET.get("q") or "").strip()
+    try:
+        limit = int(request.GET.get("limit") or FOOD_SEARCH_LIMIT)
+    except ValueError:
+        limit = FOOD_SEARCH_LIMIT
+    limit = max(1, min(limit, FOOD_SEARCH_MAX_LIMIT))
+
+    if not q:
+        return JsonResponse({"results": []})
+
+    key = normalize_food_name(q)
+    results = list(
+        FoodItem.objects
+        .filter(normalized_name__startswith=key)
+        .order_by("name")
+        .values("id", "name")[:limit]
+    )
+    if len(results) < limit:
+        results += list(
+            FoodItem.objects
+            .filter(normalized_name__contains=key)
+            .exclude(normalized_name__startswith=key)
+            .order_by("name")
+            .values("id", "name")[:limit - len(results)]
+        )
+
+    return JsonResponse({"results": results})
+
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_ORDERING = ("-date", "-time", "-id")
+
+
+def _parse_date_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    return datetime.date.fromisoformat(value)
+
+
+@login_required
+def feeding_history(request):
+    """
+    Every entry of the active baby, newest first, a keyset page (date,
+    time, id) at a time so older pages cost the same as the first. Optional
+    ?start= / ?end= limit the date range.
+    """
+    active = get_active_profile(request)
+    if not active:
+        messages.error(request, "Select an active baby profile first.")
+        return redirect("baby-list")
+
+    try:
+        start = _parse_date_param(request, "start")
+        end = _parse_date_param(request, "end")
+        after = None
+        if request.GET.get("after"):
+            after = decode_cursor(request.GET["after"], (datetime.date, datetime.time, int))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date or cursor.")
+
+    entries = FoodEntry.objects.filter(baby=active).select_related("food")
+    if start:
+        entries = entries.filter(date__gte=start)
+    if end:
+        entries = entries.filter(date__lte=end)
+
+    entries, next_cursor = keyset_page(entries, HISTORY_ORDERING, after=after, limit=HISTORY_PAGE_SIZE)
+
+    filters = {}
+    if start:
+        filters["start"] = start.isoformat()
+    if end:
+        filters["end"] = end.isoformat()
+    next_url = None
+    if next_cursor:
+        next_url = f"{reverse('feeding_history')}?{urlencode({**filters, 'after': next_cursor})}"
+
+    return render(request, "history.html", {
+        "active_profile": active,
+        "entries": entries,
+        "start": start,
+        "end": end,
+        "next_url": next_url,
+        "first_page_url": f"{reverse('feeding_history')}?{urlencode(filters)}" if after else None,
+    })
+
+
 @login_required
 def resources(request):
     return render(request, "resources.html")
@@ -204,16 +362,54 @@ def add_food(request):
     return render(request, "add_food.html", {"form": form})
 
 
+REVIEW_PAGE_SIZE = 50
+REVIEW_ORDERING = ("name", "id")
+MAX_BULK_PROMOTE = 500
+
+
 @staff_member_required
 def food_list(request):
+    """
+    Staff page for custom foods, including the review queue: FoodItems not
+    yet linked to the catalog, a keyset page (by name, id, or by search
+    rank when searching) at a time.
+    """
     q = (request.GET.get("q") or "").strip()
-    qs = FoodItem.objects.all().order_by("name")
+    queue = FoodItem.objects.filter(catalog_food__isnull=True)
+    pages, ordering, key_types = _search_pages(queue, q, REVIEW_ORDERING)
+
+    after = None
+    if request.GET.get("after"):
+        try:
+            after = decode_cursor(request.GET["after"], key_types)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor.")
+
     if q:
-        qs = qs.filter(name__icontains=q)
-        qs = qs[:1]  # return just one row
-    foods = list(qs)
+        queue = get_search_backend().filter(queue, q)
+    foods, next_cursor = keyset_page(
+        pages.only("id", "name", "category"),
+        ordering,
+        after=after,
+        limit=REVIEW_PAGE_SIZE,
+    )
+
+    next_url = None
+    if next_cursor:
+        params = {"after": next_cursor}
+        if q:
+            params["q"] = q
+        next_url = f"{reverse('food_list')}?{urlencode(params)}"
+
     categories = FoodCategory.objects.order_by('pyramid_level', 'name')
-    return render(request, "food_list.html", {"foods": foods, "categories": categories, "q": q})
+    return render(request, "food_list.html", {
+        "foods": foods,
+        "queue_count": queue.count(),
+        "next_url": next_url,
+        "max_bulk_promote": MAX_BULK_PROMOTE,
+        "categories": categories,
+        "q": q,
+    })
 
 
 @staff_member_required
@@ -224,27 +420,38 @@ def promote_fooditem_to_catalog(request, item_id):
 
     # admin chooses a pyramid category from the form; fallback tries automatic mapping
     cat_id = request.POST.get("category_id")
-    if cat_id:
-        category = get_object_or_404(FoodCategory, id=cat_id)
-    else:
-        category = map_usda_to_category("", fi.name) or FoodCategory.objects.get_or_create(
-            name="Misc", defaults={"pyramid_level": 3}
-        )[0]
+    category = get_object_or_404(FoodCategory, id=cat_id) if cat_id else None
 
-    # We don’t know exact per-100g nutrients for custom FoodItem, so store zeros (editable later)
-    CatalogFood.objects.get_or_create(
-        name=fi.name,
-        category=category,
-        defaults={
-            "calories_100g": 0,
-            "protein_100g": 0,
-            "carbs_100g": 0,
-            "fats_100g": 0,
-            "fdc_id": None,
-            "data_type": "Custom/Manual",
-        },
-    )
-    messages.success(request, f"“{fi.name}” added to catalog under “{category.name}”.")
+    catalog_food = promote_food_items([fi], category=category)[fi.id]
+    messages.success(request, f"“{fi.name}” added to catalog under “{catalog_food.category.name}”.")
+    return redirect("food_list")
+
+
+@staff_member_required
+@require_POST
+def bulk_promote_fooditems(request):
+    """Review queue action: promote every ticked FoodItem in one transaction."""
+    try:
+        ids = {int(i) for i in request.POST.getlist("item_ids")}
+    except ValueError:
+        return HttpResponseBadRequest("Invalid item id.")
+    if not ids:
+        messages.error(request, "Select at least one food to promote.")
+        return redirect("food_list")
+    if len(ids) > MAX_BULK_PROMOTE:
+        messages.error(request, f"Promote at most {MAX_BULK_PROMOTE} foods at a time.")
+        return redirect("food_list")
+
+    cat_id = request.POST.get("category_id")
+    category = get_object_or_404(FoodCategory, id=cat_id) if cat_id else None
+
+    items = FoodItem.objects.filter(id__in=ids, catalog_food__isnull=True)
+    promoted = promote_food_items(items, category=category)
+    messages.success(request, f"Added {len(promoted)} food(s) to the catalog.")
+
+    back = request.POST.get("next")
+    if back and url_has_allowed_host_and_scheme(back, allowed_hosts={request.get_host()}):
+        return redirect(back)
     return redirect("food_list")
 
 
@@ -265,8 +472,8 @@ def usda_search(request):
             },
         )
 
-    api_key = getattr(settings, "USDA_API_KEY", None)
-    if not api_key:
+    client = get_usda_client()
+    if client is None:
         return render(
             request,
             "usda_search.html",
@@ -278,17 +485,9 @@ def usda_search(request):
             },
         )
 
-    url = "https://api.nal.usda.gov/fdc/v1/foods/search"
-    params = {
-        "query": query,
-        "pageSize": 5,   # (optional) show more than 1 result
-        "api_key": api_key,
-    }
-
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-    except requests.RequestException as e:
+        foods = client.search(query, page_size=5)  # (optional) show more than 1 result
+    except USDAError as e:
         return render(
             request,
             "usda_search.html",
@@ -300,31 +499,6 @@ def usda_search(request):
             },
         )
 
-    data = resp.json()
-    for item in data.get("foods", []) or []:
-        name_map, num_map = {}, {}
-        for n in item.get("foodNutrients", []) or []:
-            nn = (n.get("nutrientName") or "").strip().lower()
-            if nn and n.get("value") is not None:
-                name_map[nn] = float(n["value"])
-            num = str(n.get("nutrientNumber") or "").strip()
-            if num and n.get("value") is not None:
-                num_map[num] = float(n["value"])
-
-        calories = name_map.get("energy") or num_map.get("1008") or 0.0
-        protein  = name_map.get("protein") or num_map.get("1003") or 0.0
-        carbs    = name_map.get("carbohydrate, by difference") or num_map.get("1005") or 0.0
-        fats     = name_map.get("total lipid (fat)") or num_map.get("1004") or 0.0
-
-        foods.append({
-            "description": item.get("description", "Unknown"),
-            "fdcId": item.get("fdcId"),
-            "calories": calories,
-            "protein": protein,
-            "carbs": carbs,
-            "fats": fats,
-        })
-
     return render(
         request,
         "usda_search.html",
@@ -355,19 +529,27 @@ def add_usda_food(request):
 
     category = get_object_or_404(FoodCategory, id=category_id)
 
-    obj, created = CatalogFood.objects.update_or_create(
-        name=name,
-        category=category,
-        defaults={
-            "calories_100g": calories_100g,
-            "protein_100g":  protein_100g,
-            "carbs_100g":    carbs_100g,
-            "fats_100g":     fats_100g,
-            "fdc_id":        int(fdc_id) if fdc_id and fdc_id.isdigit() else None,
-            "data_type":     data_type,
-            "is_active":     True,
-        },
-    )
+    fdc_id = int(fdc_id) if fdc_id and fdc_id.isdigit() else None
+    defaults = {
+        "calories_100g": calories_100g,
+        "protein_100g":  protein_100g,
+        "carbs_100g":    carbs_100g,
+        "fats_100g":     fats_100g,
+        "data_type":     data_type,
+        "is_active":     True,
+    }
+    # fdc_id is unique: re-importing a USDA food updates it in place.
+    if fdc_id is not None:
+        obj, created = CatalogFood.objects.update_or_create(
+            fdc_id=fdc_id,
+            defaults={"name": name, "category": category, **defaults},
+        )
+    else:
+        obj, created = CatalogFood.objects.update_or_create(
+            name=name,
+            category=category,
+            defaults={"fdc_id": None, **defaults},
+        )
 
     messages.success(request, f'“{obj.name}” imported to Catalog under “{category.name}”.')
     return redirect("catalog")
@@ -381,7 +563,7 @@ def generate_report_view(request):
 
 @login_required
 def report_preview(request):
-    active = _get_active_profile(request)
+    active = get_active_profile(request, verify=True)
     if not active:
         messages.error(request, "Select an active baby profile first.")
         return redirect("baby-list")
@@ -403,6 +585,8 @@ def report_preview(request):
     context = {
         "active_profile": active,
         "report_date": report_date,
+        "range_start": report_date - datetime.timedelta(days=6),
+        "max_range_days": MAX_REPORT_RANGE_DAYS,
         "today": today,
     }
     return render(request, "report_preview.html", context)
@@ -410,10 +594,13 @@ def report_preview(request):
 
 @login_required
 def report_image(request):
-    active = _get_active_profile(request)
+    active = get_active_profile(request, verify=True)
     if not active:
         return HttpResponseBadRequest("No active baby profile selected.")
 
+    if request.GET.get("start") or request.GET.get("end"):
+        return _report_range_response(request, active)
+
     date_str = request.GET.get("date")
     if date_str:
         try:
@@ -423,12 +610,134 @@ def report_image(request):
     else:
         report_date = timezone.localdate()
 
-    png_bytes = generate_report_image(active, report_date)
-    display = "attachment" if request.GET.get("download") else "inline"
+    # Opt-in: queue the render and let the client poll report_job for it.
+    if request.GET.get("async"):
+        job = enqueue_report(active, report_date)
+        return _report_job_status(job)
+
+    try:
+        scale, fmt, quality = _parse_report_variant(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    data = load_report_data(active, report_date)
+    etag = f'"{report_fingerprint(active, report_date, data, scale, fmt, quality)}"'
+
+    def render_image():
+        image_bytes = report_cache.get(etag)
+        if image_bytes is None:
+            image_bytes = generate_report_image(active, report_date, data, scale, fmt, quality)
+            report_cache.set(etag, image_bytes)
+        return image_bytes
+
+    return _report_image_response(request, active, report_date, etag, render_image, fmt)
+
+
+def _parse_report_variant(request):
+    """(scale, format, quality) from the query string, validated."""
+    try:
+        scale = float(request.GET.get("scale") or 1)
+    except ValueError:
+        scale = None
+    if scale not in REPORT_SCALES:
+        raise ValueError(f"scale must be one of {', '.join(f'{s:g}' for s in REPORT_SCALES)}.")
+
+    fmt = (request.GET.get("format") or "png").lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(REPORT_FORMATS)}.")
+
+    quality = None
+    if REPORT_FORMATS[fmt][2] is not None and request.GET.get("quality"):
+        try:
+            quality = int(request.GET["quality"])
+        except ValueError:
+            quality = 0
+        if not 1 <= quality <= 95:
+            raise ValueError("quality must be between 1 and 95.")
+
+    return scale, fmt, quality
+
+
+def _report_image_response(request, baby, report_date, etag, render_image, fmt="png"):
+    # Same fingerprint means byte-identical output, so a matching
+    # If-None-Match can be answered without rendering anything.
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        display = "attachment" if request.GET.get("download") else "inline"
+        content_type = REPORT_FORMATS[fmt][1]
+
+        response = HttpResponse(render_image(), content_type=content_type)
+        filename = f"daily_report_{baby.name}_{report_date}.{fmt}".replace(" ", "_")
+        response["Content-Disposition"] = f'{display}; filename="{filename}"'
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _report_job_status(job):
+    payload = {
+        "id": str(job.id),
+        "status": job.status,
+        "url": reverse("report_job", args=[job.id]),
+    }
+    if job.status == ReportJob.STATUS_FAILED:
+        payload["error"] = job.error
+        return JsonResponse(payload, status=500)
+    return JsonResponse(payload, status=202)
+
+
+@login_required
+def report_job(request, job_id):
+    """Poll a queued report: JSON status until done, then the PNG itself."""
+    # Fails jobs whose worker is gone, so this poll can report it.
+    report_housekeeping()
+    job = get_object_or_404(
+        ReportJob.objects.select_related("baby").defer("result"),
+        id=job_id,
+        baby__owner=request.user,
+    )
+    if job.status != ReportJob.STATUS_DONE:
+        return _report_job_status(job)
+
+    return _report_image_response(
+        request, job.baby, job.report_date, job.etag,
+        lambda: bytes(job.result),
+    )
+
+def _report_range_response(request, active):
+    """Multi-day export of report_image: one PDF, or a ZIP of PNGs."""
+    try:
+        start = datetime.date.fromisoformat(request.GET.get("start") or "")
+        end = datetime.date.fromisoformat(request.GET.get("end") or "")
+    except ValueError:
+        return HttpResponseBadRequest("start and end must be dates (YYYY-MM-DD).")
+
+    end = min(end, timezone.localdate())
+    if start > end:
+        return HttpResponseBadRequest("start must be on or before end.")
+    if (end - start).days + 1 > MAX_REPORT_RANGE_DAYS:
+        return HttpResponseBadRequest(f"Reports are limited to {MAX_REPORT_RANGE_DAYS} days.")
+
+    fmt = (request.GET.get("format") or "pdf").lower()
+    if fmt not in ("pdf", "zip"):
+        return HttpResponseBadRequest("format must be pdf or zip.")
+
+    prefix = f"daily_report_{active.name}".replace(" ", "_")
+
+    if fmt == "zip":
+        # Each page goes out as soon as it is rendered.
+        response = StreamingHttpResponse(
+            iter_report_pages_zip(iter_report_range(active, start, end), prefix),
+            content_type="application/zip",
+        )
+    else:
+        pages = render_report_range(active, start, end)
+        response = HttpResponse(report_pages_to_pdf(pages), content_type="application/pdf")
 
-    response = HttpResponse(png_bytes, content_type="image/png")
-    filename = f"daily_report_{active.name}_{report_date}.png".replace(" ", "_")
-    response["Content-Disposition"] = f'{display}; filename="{filename}"'
+    response["Content-Disposition"] = f'attachment; filename="{prefix}_{start}_to_{end}.{fmt}"'
     response["Cache-Control"] = "no-store"
     return response
 
@@ -441,28 +750,101 @@ def set_active_profile(request, profile_id):
     return HttpResponseRedirect(request.META.get("HTTP_REFERER", reverse("dashboard")))
 
 
+CATALOG_PAGE_SIZE = 50
+CATALOG_ORDERING = ("name", "id")
+
+
+def _search_pages(queryset, q, ordering):
+    """
+    (queryset, ordering, cursor types) for keyset pages of queryset: best
+    search match first when q is set, else in `ordering` (name, id).
+    """
+    if q:
+        return get_search_backend().ranked(queryset, q), RANKED_ORDERING, (float, str, int)
+    return queryset, ordering, (str, int)
+
+
+def _catalog_foods(q):
+    qs = CatalogFood.objects.filter(is_active=True)
+    if q:
+        qs = get_search_backend().filter(qs, q)
+    return qs
+
+
 @login_required
 def catalog(request):
+    """
+    Category headers with their food counts (one aggregate query); each
+    category's foods are fetched page by page from catalog_category_foods
+    when it is expanded.
+    """
     q = (request.GET.get("q") or "").strip()
 
-    cf_qs = CatalogFood.objects.filter(is_active=True)
-    if q:
-        cf_qs = cf_qs.filter(name__icontains=q)
-
-    cats = (
-        FoodCategory.objects
-        .order_by('pyramid_level', 'name')
-        .prefetch_related(
-            Prefetch('catalog_foods', queryset=cf_qs.order_by('name'))
-        )
+    counts = dict(
+        _catalog_foods(q)
+        .order_by()
+        .values_list("category_id")
+        .annotate(n=Count("id"))
     )
+    cats = []
+    for c in FoodCategory.objects.order_by('pyramid_level', 'name'):
+        c.food_count = counts.get(c.id, 0)
+        cats.append(c)
     return render(request, "catalog.html", {"categories": cats, "q": q})
 
 
+@login_required
+@require_GET
+def catalog_category_foods(request, category_id):
+    """
+    One keyset page (by name, id, or by search rank for ?q=) of a
+    category's active foods, as the rows
+    partial for catalog.html or, with ?format=json, as JSON.
+    """
+    category = get_object_or_404(FoodCategory, id=category_id)
+    q = (request.GET.get("q") or "").strip()
+
+    foods = CatalogFood.objects.filter(is_active=True, category=category)
+    pages, ordering, key_types = _search_pages(foods, q, CATALOG_ORDERING)
+
+    after = None
+    if request.GET.get("after"):
+        try:
+            after = decode_cursor(request.GET["after"], key_types)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor.")
+
+    foods, next_cursor = keyset_page(
+        pages.only("id", "name", "data_type"),
+        ordering,
+        after=after,
+        limit=CATALOG_PAGE_SIZE,
+    )
+
+    as_json = request.GET.get("format") == "json"
+    next_url = None
+    if next_cursor:
+        params = {"after": next_cursor}
+        if q:
+            params["q"] = q
+        if as_json:
+            params["format"] = "json"
+        next_url = f"{reverse('catalog_category_foods', args=[category.id])}?{urlencode(params)}"
+
+    if as_json:
+        return JsonResponse({
+            "results": [
+                {"id": f.id, "name": f.name, "data_type": f.data_type} for f in foods
+            ],
+            "next": next_url,
+        })
+    return render(request, "catalog_food_rows.html", {"foods": foods, "next_url": next_url})
+
+
 @login_required
 @require_POST
 def catalog_use_in_tracker(request):
-    active = _get_active_profile(request)
+    active = get_active_profile(request, verify=True)
     if not active:
         messages.error(request, "Select an active baby profile first.")
         return redirect("catalog")
@@ -475,14 +857,11 @@ def catalog_use_in_tracker(request):
     cat_food = get_object_or_404(CatalogFood, id=catalog_id, is_active=True)
 
     
-    FoodItem.objects.get_or_create(
-        name=cat_food.name,
-        defaults={"category": cat_food.category.name},
-    )
+    get_or_create_food_item(cat_food.name, category=cat_food.category.name)
 
     messages.success(
         request,
-        f'"{cat_food.name}" is now available in the Food dropdown on the tracker.'
+        f'"{cat_food.name}" is now available in the Food search on the tracker.'
     )
     return redirect("tracker")
 
@@ -547,10 +926,7 @@ def add_custom_catalog_food(request):
     )
 
     # 2️⃣ Mirror into FoodItem so it appears in the Tracker dropdown
-    FoodItem.objects.get_or_create(
-        name=obj.name,
-        defaults={"category": obj.category.name},
-    )
+    get_or_create_food_item(obj.name, category=obj.category.name)
 
     if created:
         messages.success(